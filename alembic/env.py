@@ -18,6 +18,9 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
+from dayfeel_auth.db.sqlalchemy.models import login_events
+from dayfeel_auth.db.sqlalchemy.models import revoked_sessions
+from dayfeel_auth.db.sqlalchemy.models import service_clients
 from dayfeel_auth.db.sqlalchemy.models import users
 from dayfeel_auth.db.sqlalchemy.setup.base import BASE
 target_metadata = BASE.metadata
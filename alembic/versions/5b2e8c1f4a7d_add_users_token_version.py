@@ -0,0 +1,39 @@
+"""
+add users token_version
+
+Revision ID: 5b2e8c1f4a7d
+Revises: 97dda666f046
+Create Date: 2025-10-06 19:12:40.517208
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import add_column
+import sqlalchemy as sa
+
+
+# --- TYPES ---
+from typing import Union
+from typing import Sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e8c1f4a7d'
+down_revision: Union[str, Sequence[str], None] = '97dda666f046'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+    """
+
+    # Constant server default: Postgres 11+ stores it in the catalog, no table rewrite
+    add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+    """
+    raise NotImplementedError('Downgrade is disabled.')
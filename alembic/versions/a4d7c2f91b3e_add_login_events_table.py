@@ -0,0 +1,76 @@
+"""
+add login_events table
+
+Revision ID: a4d7c2f91b3e
+Revises: f1c4b8e2a9d3
+Create Date: 2025-10-13 14:02:37.381950
+"""
+
+# --- IMPORTS ---
+from alembic import op
+from datetime import datetime
+from datetime import timezone
+import sqlalchemy as sa
+
+
+# --- TYPES ---
+from typing import Union
+from typing import Sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d7c2f91b3e'
+down_revision: Union[str, Sequence[str], None] = 'f1c4b8e2a9d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created up front (the service keeps creating the next ones)
+MONTHS_AHEAD = 2
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Creates the append-only login audit table, range-partitioned by month of
+    'occurred_at' so old months can be detached or dropped instead of deleted
+    row by row. A default partition catches events of months not created yet.
+
+    Everything runs in the migration transaction rather than through the
+    online migration helpers: the table is new, so no traffic waits on its
+    locks, and a failure rolls the whole revision back.
+    """
+
+    # Create partitioned table
+    op.create_table(
+        'login_events',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('occurred_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('success', sa.Boolean(), nullable=False),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('user_agent', sa.String(length=512), nullable=True),
+        sa.PrimaryKeyConstraint('id', 'occurred_at'),
+        schema='auth',
+        postgresql_partition_by='RANGE (occurred_at)'
+    )
+
+    # Create indexes (created on every partition)
+    op.create_index('ix_auth_login_events_user_id_occurred_at',
+                    'login_events', ['user_id', 'occurred_at'], unique=False, schema='auth')
+
+    # Create partitions: default, current month and the next ones
+    op.execute('CREATE TABLE auth.login_events_default PARTITION OF auth.login_events DEFAULT')
+    now = datetime.now(timezone.utc)
+    months = [now.year * 12 + now.month - 1 + month for month in range(MONTHS_AHEAD + 2)]
+    bounds = [datetime(month // 12, month % 12 + 1, 1, tzinfo=timezone.utc) for month in months]
+    for start, end in zip(bounds, bounds[1:]):
+        op.execute(f'CREATE TABLE auth.login_events_{start:y%Ym%m} PARTITION OF auth.login_events '
+                   f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+    """
+    raise NotImplementedError('Downgrade is disabled.')
@@ -0,0 +1,53 @@
+"""
+add revoked_sessions ledger
+
+Revision ID: b8e3f5a20c71
+Revises: a4d7c2f91b3e
+Create Date: 2025-10-15 10:47:12.604418
+"""
+
+# --- IMPORTS ---
+from alembic import op
+import sqlalchemy as sa
+
+
+# --- TYPES ---
+from typing import Union
+from typing import Sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e3f5a20c71'
+down_revision: Union[str, Sequence[str], None] = 'a4d7c2f91b3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Adds the append-only revocation ledger. Sessions revoked before it keep
+    their 'revoked' flag, which is still honored, so no backfill is needed.
+    """
+
+    # Create table
+    op.create_table(
+        'revoked_sessions',
+        sa.Column('jti', sa.Uuid(), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('jti'),
+        schema='auth'
+    )
+
+    # Create indexes
+    op.create_index(op.f('ix_auth_revoked_sessions_expires_at'),
+                    'revoked_sessions', ['expires_at'], unique=False, schema='auth')
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+    """
+    raise NotImplementedError('Downgrade is disabled.')
@@ -0,0 +1,53 @@
+"""
+add service_clients table
+
+Revision ID: c3a9e6d14f27
+Revises: b8e3f5a20c71
+Create Date: 2025-10-16 09:21:37.118204
+"""
+
+# --- IMPORTS ---
+from alembic import op
+import sqlalchemy as sa
+
+
+# --- TYPES ---
+from typing import Union
+from typing import Sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9e6d14f27'
+down_revision: Union[str, Sequence[str], None] = 'b8e3f5a20c71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Adds the machine clients of the client-credentials grant. The table is
+    new and empty, so a plain create does not block any traffic.
+    """
+
+    # Create table
+    op.create_table(
+        'service_clients',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('client_id', sa.String(length=64), nullable=False),
+        sa.Column('secret_hash', sa.String(length=64), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('active', sa.Boolean(), server_default='true', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('client_id'),
+        schema='auth'
+    )
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+    """
+    raise NotImplementedError('Downgrade is disabled.')
@@ -0,0 +1,95 @@
+"""
+store auth_sessions jti as uuid
+
+Revision ID: c3d91a6e2f58
+Revises: 5b2e8c1f4a7d
+Create Date: 2025-10-08 10:03:27.182954
+"""
+
+# --- IMPORTS ---
+from alembic import op
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import add_column
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import backfill_in_batches
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import create_index_concurrently
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import get_column_type
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import run_with_lock_timeout
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import set_not_null
+import sqlalchemy as sa
+
+
+# --- TYPES ---
+from typing import Union
+from typing import Sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3d91a6e2f58'
+down_revision: Union[str, Sequence[str], None] = '5b2e8c1f4a7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Converts jti from text to a native 16-byte uuid without rewriting the table
+    under an exclusive lock: a shadow column is kept in sync by a trigger while
+    existing rows are backfilled in small batches, its unique index is built
+    concurrently, and only the final swap takes a brief exclusive lock.
+
+    Every step commits on its own and is idempotent, so a run that failed
+    halfway (e.g. the swap timed out on its lock) can simply be rerun.
+    """
+
+    # A rerun after the swap committed has nothing left to do
+    if get_column_type('auth_sessions', 'jti') == 'uuid':
+        return
+
+    # Add nullable shadow column (catalog-only change)
+    add_column('auth_sessions', sa.Column('jti_uuid', sa.Uuid(), nullable=True))
+
+    # Keep the shadow column in sync for rows written while the migration runs
+    def create_sync_trigger() -> None:
+        op.execute('''
+            CREATE OR REPLACE FUNCTION auth.auth_sessions_sync_jti_uuid() RETURNS trigger AS $$
+            BEGIN
+                NEW.jti_uuid := NEW.jti::uuid;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        ''')
+        op.execute('DROP TRIGGER IF EXISTS auth_sessions_sync_jti_uuid ON auth.auth_sessions')
+        op.execute('''
+            CREATE TRIGGER auth_sessions_sync_jti_uuid
+            BEFORE INSERT OR UPDATE OF jti ON auth.auth_sessions
+            FOR EACH ROW EXECUTE FUNCTION auth.auth_sessions_sync_jti_uuid()
+        ''')
+
+    run_with_lock_timeout(create_sync_trigger, atomic=True)
+
+    # Backfill existing rows, one short transaction per batch
+    backfill_in_batches('auth_sessions', 'jti_uuid = jti::uuid', where='jti_uuid IS NULL')
+
+    # Build the unique index without blocking writes (an invalid one left by a failed run is rebuilt)
+    create_index_concurrently('ix_auth_auth_sessions_jti_uuid', 'auth_sessions', 'jti_uuid', unique=True)
+
+    # Prove NOT NULL with a validated check, so SET NOT NULL skips the table scan
+    set_not_null('auth_sessions', 'jti_uuid')
+
+    # Swap columns in one short transaction, giving up instead of queueing behind long transactions
+    def swap_columns() -> None:
+        op.execute('DROP TRIGGER IF EXISTS auth_sessions_sync_jti_uuid ON auth.auth_sessions')
+        op.execute('DROP FUNCTION IF EXISTS auth.auth_sessions_sync_jti_uuid()')
+        op.drop_column('auth_sessions', 'jti', schema='auth')
+        op.alter_column('auth_sessions', 'jti_uuid', new_column_name='jti', schema='auth')
+        op.execute('ALTER TABLE auth.auth_sessions '
+                   'ADD CONSTRAINT auth_sessions_jti_key UNIQUE USING INDEX ix_auth_auth_sessions_jti_uuid')
+
+    run_with_lock_timeout(swap_columns, atomic=True)
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+    """
+    raise NotImplementedError('Downgrade is disabled.')
@@ -0,0 +1,53 @@
+"""
+index users lower email
+
+Revision ID: e7a2f0d4b619
+Revises: c3d91a6e2f58
+Create Date: 2025-10-09 14:41:05.330912
+"""
+
+# --- IMPORTS ---
+from alembic import op
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import create_index_concurrently
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import is_invalid_index
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import run_with_lock_timeout
+
+
+# --- TYPES ---
+from typing import Union
+from typing import Sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a2f0d4b619'
+down_revision: Union[str, Sequence[str], None] = 'c3d91a6e2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Replaces the case-sensitive unique constraint on email with a unique index
+    on lower(email). Fails if existing emails only differ by case; those users
+    must be merged first.
+    """
+
+    # Build the functional index without blocking writes (an invalid one left by a failed run is rebuilt)
+    create_index_concurrently('ix_auth_users_email_lower', 'users', 'lower(email)', unique=True)
+
+    # Never drop the constraint unless the index really enforces uniqueness
+    if is_invalid_index('ix_auth_users_email_lower'):
+        raise RuntimeError('Index auth.ix_auth_users_email_lower is invalid, keeping users_email_key')
+
+    # The functional index now enforces uniqueness (catalog-only change)
+    run_with_lock_timeout(lambda: op.drop_constraint('users_email_key', 'users', type_='unique',
+                                                     schema='auth', if_exists=True))
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+    """
+    raise NotImplementedError('Downgrade is disabled.')
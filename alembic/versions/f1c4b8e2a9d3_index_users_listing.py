@@ -0,0 +1,43 @@
+"""
+index users listing
+
+Revision ID: f1c4b8e2a9d3
+Revises: e7a2f0d4b619
+Create Date: 2025-10-10 09:26:48.517203
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.setup.online_migrations import create_index_concurrently
+
+
+# --- TYPES ---
+from typing import Union
+from typing import Sequence
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c4b8e2a9d3'
+down_revision: Union[str, Sequence[str], None] = 'e7a2f0d4b619'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Adds the indexes behind the admin user listing: keyset pagination on
+    (created_at, id), role filtering paginated on id, and last-login ranges.
+    """
+
+    # Build the indexes without blocking writes
+    create_index_concurrently('ix_auth_users_created_at_id', 'users', 'created_at, id')
+    create_index_concurrently('ix_auth_users_role_id', 'users', 'role, id')
+    create_index_concurrently('ix_auth_users_last_login', 'users', 'last_login')
+
+
+def downgrade() -> None:
+    """
+    Downgrade schema.
+    """
+    raise NotImplementedError('Downgrade is disabled.')
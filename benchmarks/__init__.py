@@ -0,0 +1,5 @@
+"""
+Benchmarks.
+
+Run with 'scripts/bench <name>', e.g. 'scripts/bench jti_index'.
+"""
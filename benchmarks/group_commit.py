@@ -0,0 +1,120 @@
+"""
+Session insert benchmark: one commit per insert vs group commit.
+
+Concurrent threads insert sessions the way logins and refreshes do, first
+through AuthSessionsRepository (one transaction and commit per insert), then
+through GroupCommitAuthSessionsRepository (concurrent inserts share a commit),
+reporting inserts per second and commits issued. Uses a SQLite file with
+synchronous=FULL by default (the 'auth' schema is mapped away), so each commit
+pays a real fsync; pass a Postgres --url to measure WAL flushes directly.
+"""
+
+# --- IMPORTS ---
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.db.sqlalchemy.models.users import Users  # pylint: disable=W0611
+from dayfeel_auth.db.sqlalchemy.repository.auth_sessions import AuthSessionsRepository
+from dayfeel_auth.db.sqlalchemy.repository.group_commit_auth_sessions import GroupCommitAuthSessionsRepository
+from dayfeel_auth.db.sqlalchemy.setup.base import BASE
+from sqlalchemy import Engine
+from sqlalchemy import create_engine
+from sqlalchemy import delete
+from sqlalchemy import event
+from uuid import uuid4
+
+import argparse
+import os
+import tempfile
+import time
+
+
+# --- CODE ---
+def count_commits(engine: Engine) -> list:
+    """
+    Count commits issued on an engine.
+
+    :param engine: SQLAlchemy engine.
+
+    :returns: Single-item list holding the running count.
+    """
+    commits = [0]
+
+    def on_commit(connection) -> None:  # pylint: disable=W0613
+        commits[0] += 1
+
+    event.listen(engine, 'commit', on_commit)
+    return commits
+
+
+def run(name: str, repository: AuthSessionsRepository, engine: Engine, threads: int, inserts: int) -> None:
+    """
+    Insert sessions from concurrent threads and report throughput.
+
+    :param name: Label printed with the results.
+    :param repository: Repository under test.
+    :param engine: SQLAlchemy engine of the repository.
+    :param threads: Concurrent inserting threads.
+    :param inserts: Total sessions inserted.
+
+    :returns: None.
+    """
+    # Empty table
+    with engine.begin() as connection:
+        connection.execute(delete(AuthSessions))
+
+    # Insert sessions concurrently
+    expires_at = datetime.now(timezone.utc) + timedelta(days=15)
+    commits = count_commits(engine)
+    repository.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda i: repository.insert_session(AuthSessions(user_id=i % 1000 + 1,
+                                                                           jti=uuid4(),
+                                                                           expires_at=expires_at)),
+                          range(inserts)))
+    elapsed = time.perf_counter() - start
+    repository.stop()
+
+    # Report
+    print(f'{name:>13}: {inserts / elapsed:,.0f} inserts/s  commits={commits[0]}')
+
+
+def main() -> None:
+    """
+    Compare both insert strategies.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default=None, help='database URL (defaults to a temporary SQLite file)')
+    parser.add_argument('--threads', type=int, default=32, help='concurrent inserting threads')
+    parser.add_argument('--inserts', type=int, default=5_000, help='sessions inserted per strategy')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help='group commit max batch wait')
+    parser.add_argument('--max-batch', type=int, default=64, help='group commit max batch size')
+    args = parser.parse_args()
+
+    # Create engine, mapping the 'auth' schema away and forcing an fsync per commit on SQLite
+    url = args.url or f'sqlite:///{os.path.join(tempfile.mkdtemp(), "bench.db")}'
+    engine = create_engine(url, pool_size=args.threads,
+                           connect_args={'timeout': 60} if url.startswith('sqlite') else {})
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', lambda connection, _: connection.execute('PRAGMA synchronous=FULL'))
+        engine = engine.execution_options(schema_translate_map={'auth': None})
+
+    # Create tables
+    BASE.metadata.create_all(engine)
+
+    # Compare strategies
+    run('per-request', AuthSessionsRepository(engine=engine), engine, args.threads, args.inserts)
+    run('group commit', GroupCommitAuthSessionsRepository(engine=engine,
+                                                          max_wait_ms=args.max_wait_ms,
+                                                          max_batch=args.max_batch),
+        engine, args.threads, args.inserts)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Session identifier storage benchmark: text jti vs native uuid jti.
+
+Builds two scratch tables shaped like auth.auth_sessions (one with a text jti,
+one with a uuid jti), each with a unique index on jti, then reports index size
+and point lookup latency. Requires Postgres 13+ (gen_random_uuid) reachable
+through POSTGRES_URL; the real tables are never touched.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.setup.database_engine import create_database_engine
+from sqlalchemy import text
+
+import argparse
+import statistics
+import time
+
+
+# --- GLOBALS ---
+SCHEMA = 'bench_jti'
+JTI_TYPES = {'text': 'text', 'uuid': 'uuid'}
+
+
+# --- CODE ---
+def main() -> None:
+    """
+    Run the benchmark and print one line per jti type.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5_000_000, help='rows per table')
+    parser.add_argument('--lookups', type=int, default=10_000, help='point lookups per table')
+    args = parser.parse_args()
+
+    # Create database engine
+    engine = create_database_engine(url=container['config'].POSTGRES_URL)
+
+    with engine.connect() as connection:
+
+        # Recreate scratch schema
+        connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+
+        for name, column_type in JTI_TYPES.items():
+
+            # Create and fill table
+            connection.execute(text(f'''
+                CREATE TABLE {SCHEMA}.sessions_{name} (
+                    id serial PRIMARY KEY,
+                    user_id integer NOT NULL,
+                    jti {column_type} NOT NULL UNIQUE,
+                    expires_at timestamptz NOT NULL,
+                    revoked boolean NOT NULL DEFAULT false
+                )
+            '''))
+            connection.execute(text(f'''
+                INSERT INTO {SCHEMA}.sessions_{name} (user_id, jti, expires_at)
+                SELECT n % 100000, gen_random_uuid()::{column_type}, now() + interval '15 days'
+                FROM generate_series(1, :rows) AS n
+            '''), {'rows': args.rows})
+            connection.commit()
+
+            # Vacuum and analyze (VACUUM cannot run inside a transaction)
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as maintenance:
+                maintenance.execute(text(f'VACUUM ANALYZE {SCHEMA}.sessions_{name}'))
+
+            # Measure unique index size
+            index_size = connection.execute(text(f'''
+                SELECT pg_size_pretty(pg_relation_size(indexrelid))
+                FROM pg_index WHERE indrelid = '{SCHEMA}.sessions_{name}'::regclass AND indisunique AND NOT indisprimary
+            ''')).scalar_one()
+
+            # Sample existing jtis and time point lookups
+            jtis = connection.execute(text(f'''
+                SELECT jti FROM {SCHEMA}.sessions_{name} TABLESAMPLE SYSTEM (1) LIMIT :lookups
+            '''), {'lookups': args.lookups}).scalars().all()
+            latencies = []
+            for jti in jtis:
+                start = time.perf_counter()
+                connection.execute(text(f'SELECT id, revoked FROM {SCHEMA}.sessions_{name} WHERE jti = :jti'),
+                                   {'jti': jti}).one()
+                latencies.append((time.perf_counter() - start) * 1_000_000)
+
+            # Report
+            print(f'{name:>5}: index={index_size:>8}  lookups={len(latencies)}  '
+                  f'p50={statistics.median(latencies):.0f}us  '
+                  f'p99={statistics.quantiles(latencies, n=100)[98]:.0f}us')
+
+        # Drop scratch schema
+        connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+        connection.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+Online migration benchmark: lock waits seen by traffic while the schema changes.
+
+Migrates a scratch database up to the auth_sessions table, seeds it with
+millions of sessions, then keeps login-like traffic running (session insert,
+session lookup by jti, last-login update) while it:
+
+- runs the rest of the Alembic migration chain ('alembic upgrade head');
+- builds an index and adds and backfills a column the blocking way
+  (plain CREATE INDEX, ADD COLUMN with a volatile default, single UPDATE);
+- does the same through 'dayfeel_auth.db.sqlalchemy.setup.online_migrations'.
+
+For each phase it reports its duration, traffic latency (p50, p99, max) and
+the longest lock wait sampled from pg_stat_activity. Requires Postgres 13+
+(gen_random_uuid) and a scratch database passed with --url: its 'auth'
+schema is dropped and recreated.
+"""
+
+# --- IMPORTS ---
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from dayfeel_auth.db.sqlalchemy.setup import online_migrations
+from sqlalchemy import Boolean
+from sqlalchemy import Column
+from sqlalchemy import Engine
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from threading import Event
+from threading import Thread
+from uuid import uuid4
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+# --- TYPES ---
+from typing import Callable
+from typing import List
+
+
+# --- GLOBALS ---
+# Revision that creates auth.auth_sessions: the database is seeded right after it
+SEED_REVISION = '97dda666f046'
+
+# Seconds between lock wait samples
+SAMPLE_INTERVAL_SEC = 0.02
+
+# Repository root, where alembic.ini lives
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --- CODE ---
+class Traffic:
+    """
+    Login-like traffic from background threads, with per-request latencies.
+    """
+
+    def __init__(self, engine: Engine, threads: int, users: int) -> None:
+        """
+        Initializes the traffic.
+
+        :param engine: SQLAlchemy engine.
+        :param threads: Concurrent clients.
+        :param users: Number of seeded users.
+
+        :returns: None.
+        """
+        self.__engine = engine
+        self.__threads = threads
+        self.__users = users
+        self.__stop = Event()
+        self.__workers: List[Thread] = []
+
+        # Request latencies (ms), failed requests and longest sampled lock wait (ms) since the last reset
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.max_lock_wait_ms = 0.0
+
+
+    def start(self) -> None:
+        """
+        Start the clients and the lock wait sampler.
+
+        :returns: None.
+        """
+        self.__workers = [Thread(target=self.__client, args=(i,), daemon=True) for i in range(self.__threads)]
+        self.__workers.append(Thread(target=self.__sample_lock_waits, daemon=True))
+        for worker in self.__workers:
+            worker.start()
+
+
+    def stop(self) -> None:
+        """
+        Stop the clients and the sampler.
+
+        :returns: None.
+        """
+        self.__stop.set()
+        for worker in self.__workers:
+            worker.join()
+
+
+    def reset(self) -> None:
+        """
+        Forget measurements taken so far.
+
+        :returns: None.
+        """
+        self.latencies = []
+        self.errors = 0
+        self.max_lock_wait_ms = 0.0
+
+
+# --- Private helpers ---
+    def __client(self, number: int) -> None:
+        """
+        Client loop: one login-like request after another.
+
+        :param number: Client number, used to spread users.
+
+        :returns: None.
+        """
+        user_id = number % self.__users + 1
+        with self.__engine.connect() as connection:
+            while not self.__stop.is_set():
+                jti = str(uuid4())
+                start = time.perf_counter()
+                try:
+                    connection.execute(text('INSERT INTO auth.auth_sessions (user_id, jti, expires_at, revoked) '
+                                            "VALUES (:user_id, :jti, now() + interval '15 days', false)"),
+                                       {'user_id': user_id, 'jti': jti})
+                    connection.commit()
+                    connection.execute(text('SELECT revoked FROM auth.auth_sessions WHERE jti = :jti'),
+                                       {'jti': jti})
+                    connection.execute(text('UPDATE auth.users SET last_login = now() WHERE id = :user_id'),
+                                       {'user_id': user_id})
+                    connection.commit()
+
+                # If the schema changed under the request: count it as failed and go on
+                except Exception:  # pylint: disable=W0718
+                    connection.rollback()
+                    self.errors += 1
+                    continue
+
+                self.latencies.append((time.perf_counter() - start) * 1000)
+
+
+    def __sample_lock_waits(self) -> None:
+        """
+        Sampler loop: record the longest wait of any backend blocked on a lock.
+
+        :returns: None.
+        """
+        with self.__engine.connect() as connection:
+            while not self.__stop.wait(SAMPLE_INTERVAL_SEC):
+                waited = connection.execute(text('''
+                    SELECT coalesce(max(extract(epoch FROM now() - state_change)) * 1000, 0)
+                    FROM pg_stat_activity WHERE wait_event_type = 'Lock'
+                ''')).scalar_one()
+                connection.commit()
+                self.max_lock_wait_ms = max(self.max_lock_wait_ms, float(waited))
+
+
+def alembic_upgrade(url: str, revision: str) -> None:
+    """
+    Run 'alembic upgrade' against the scratch database.
+
+    :param url: Database URL.
+    :param revision: Target revision.
+
+    :returns: None.
+    """
+    subprocess.run([sys.executable, '-m', 'alembic', 'upgrade', revision], cwd=ROOT, check=True,
+                   env={**os.environ, 'POSTGRES_URL': url}, stdout=subprocess.DEVNULL)
+
+
+def run_online(engine: Engine, steps: Callable[[], None]) -> None:
+    """
+    Run helper-based steps inside an Alembic migration context, as env.py does.
+
+    :param engine: SQLAlchemy engine.
+    :param steps: Function calling the online migration helpers.
+
+    :returns: None.
+    """
+    with engine.connect() as connection:
+        context = MigrationContext.configure(connection)
+        with Operations.context(context), context.begin_transaction():
+            steps()
+
+
+def run_blocking(engine: Engine) -> None:
+    """
+    Index, add and backfill a column the blocking way.
+
+    :param engine: SQLAlchemy engine.
+
+    :returns: None.
+    """
+    with engine.begin() as connection:
+        connection.execute(text('CREATE INDEX ix_bench_auth_sessions_created_at ON auth.auth_sessions (created_at)'))
+    with engine.begin() as connection:
+        connection.execute(text('ALTER TABLE auth.auth_sessions ADD COLUMN bench_flag boolean DEFAULT random() > 2'))
+    with engine.begin() as connection:
+        connection.execute(text('UPDATE auth.auth_sessions SET bench_flag = revoked'))
+
+
+def online_steps() -> None:
+    """
+    Index, add and backfill a column through the online helpers.
+
+    :returns: None.
+    """
+    online_migrations.create_index_concurrently('ix_bench_auth_sessions_created_at', 'auth_sessions', 'created_at')
+    online_migrations.add_column('auth_sessions', Column('bench_flag', Boolean(), nullable=True))
+    online_migrations.backfill_in_batches('auth_sessions', 'bench_flag = revoked', where='bench_flag IS NULL')
+
+
+def undo_steps(engine: Engine) -> None:
+    """
+    Drop what the blocking and online phases added.
+
+    :param engine: SQLAlchemy engine.
+
+    :returns: None.
+    """
+    with engine.begin() as connection:
+        connection.execute(text('DROP INDEX IF EXISTS auth.ix_bench_auth_sessions_created_at'))
+        connection.execute(text('ALTER TABLE auth.auth_sessions DROP COLUMN IF EXISTS bench_flag'))
+
+
+def measure(name: str, traffic: Traffic, phase: Callable[[], None]) -> None:
+    """
+    Run a phase under traffic and report what the traffic saw.
+
+    :param name: Label printed with the results.
+    :param traffic: Running traffic.
+    :param phase: Schema change to run.
+
+    :returns: None.
+    """
+    # Run phase
+    traffic.reset()
+    start = time.perf_counter()
+    phase()
+    elapsed = time.perf_counter() - start
+
+    # Report
+    latencies = traffic.latencies or [0.0]
+    p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+    print(f'{name:>8}: {elapsed:6.1f}s  requests={len(traffic.latencies):,}  errors={traffic.errors}  '
+          f'p50={statistics.median(latencies):.1f}ms  p99={p99:.1f}ms  max={max(latencies):.0f}ms  '
+          f'max_lock_wait={traffic.max_lock_wait_ms:.0f}ms')
+
+
+def main() -> None:
+    """
+    Seed the scratch database and compare schema change strategies under traffic.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', required=True, help='scratch Postgres database URL (its auth schema is dropped)')
+    parser.add_argument('--rows', type=int, default=5_000_000, help='seeded sessions')
+    parser.add_argument('--users', type=int, default=100_000, help='seeded users')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent traffic clients')
+    args = parser.parse_args()
+
+    # Create engine
+    engine = create_engine(args.url, pool_size=args.threads + 4)
+
+    # Recreate schema up to the sessions table
+    with engine.begin() as connection:
+        connection.execute(text('DROP SCHEMA IF EXISTS auth CASCADE'))
+        connection.execute(text('DROP TABLE IF EXISTS auth_alembic_version'))
+    alembic_upgrade(args.url, SEED_REVISION)
+
+    # Seed users and sessions
+    with engine.begin() as connection:
+        connection.execute(text('''
+            INSERT INTO auth.users (email, password_hash, name, role)
+            SELECT 'user' || n || '@example.com', 'hash', 'User', 'USER' FROM generate_series(1, :users) AS n
+        '''), {'users': args.users})
+        connection.execute(text('''
+            INSERT INTO auth.auth_sessions (user_id, jti, expires_at, revoked)
+            SELECT n % :users + 1, gen_random_uuid()::text, now() + interval '15 days', false
+            FROM generate_series(1, :rows) AS n
+        '''), {'rows': args.rows, 'users': args.users})
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text('VACUUM ANALYZE auth.users, auth.auth_sessions'))
+
+    # Run each phase under traffic
+    traffic = Traffic(engine, threads=args.threads, users=args.users)
+    traffic.start()
+    try:
+        measure('idle', traffic, lambda: time.sleep(5))
+        measure('chain', traffic, lambda: alembic_upgrade(args.url, 'head'))
+        measure('blocking', traffic, lambda: run_blocking(engine))
+        undo_steps(engine)
+        measure('online', traffic, lambda: run_online(engine, online_steps))
+        undo_steps(engine)
+    finally:
+        traffic.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Read path benchmark: full ORM entities vs column projections.
+
+Compares the previous 'session.query(Users)' lookups against the repository's
+column projections returning UserRecord, reporting per-lookup CPU time and
+allocated memory. Uses an in-memory SQLite database by default (the 'auth'
+schema is mapped away), or any database passed with --url.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions  # pylint: disable=W0611
+from dayfeel_auth.db.sqlalchemy.models.users import Users
+from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
+from dayfeel_auth.db.sqlalchemy.setup.base import BASE
+from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import DbConnectionHandler
+from sqlalchemy import Engine
+from sqlalchemy import create_engine
+from sqlalchemy import insert
+
+import argparse
+import time
+import tracemalloc
+
+
+# --- TYPES ---
+from typing import Callable
+
+
+# --- CODE ---
+def orm_lookup(engine: Engine, user_id: int) -> None:
+    """
+    Lookup as done before: a fully tracked ORM entity.
+
+    :param engine: SQLAlchemy engine.
+    :param user_id: Id of the user to load.
+
+    :returns: None.
+    """
+    with DbConnectionHandler(engine) as db:
+        user = db.session.query(Users).filter(Users.id == user_id).one_or_none()
+        _ = (user.id, user.email, user.password_hash, user.name, user.role)
+
+
+def measure(name: str, lookup: Callable[[int], None], lookups: int, users: int) -> None:
+    """
+    Time a lookup function and measure the memory it allocates.
+
+    :param name: Label printed with the results.
+    :param lookup: Function loading one user by id.
+    :param lookups: Number of lookups.
+    :param users: Number of seeded users.
+
+    :returns: None.
+    """
+    # Warm up statement caches
+    for user_id in range(1, min(users, 100) + 1):
+        lookup(user_id)
+
+    # Measure CPU time
+    start = time.process_time()
+    for i in range(lookups):
+        lookup(i % users + 1)
+    cpu_us = (time.process_time() - start) / lookups * 1_000_000
+
+    # Measure peak memory allocated by a single lookup
+    tracemalloc.start()
+    peaks = []
+    for i in range(1_000):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        lookup(i % users + 1)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    # Report
+    print(f'{name:>10}: cpu={cpu_us:.1f}us/lookup  peak_alloc={sum(peaks) / len(peaks) / 1024:.1f}KiB/lookup')
+
+
+def main() -> None:
+    """
+    Seed users and compare both lookup styles.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default='sqlite://', help='database URL (defaults to in-memory SQLite)')
+    parser.add_argument('--users', type=int, default=10_000, help='users to seed')
+    parser.add_argument('--lookups', type=int, default=20_000, help='lookups per variant')
+    args = parser.parse_args()
+
+    # Create engine, mapping the 'auth' schema away on SQLite
+    engine = create_engine(args.url)
+    if engine.dialect.name == 'sqlite':
+        engine = engine.execution_options(schema_translate_map={'auth': None})
+
+    # Create tables and seed users
+    BASE.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Users), [
+            {'email': f'user{i}@example.com', 'password_hash': 'x' * 97, 'name': f'User {i}'}
+            for i in range(args.users)
+        ])
+
+    # Compare lookups
+    repository = UsersRepository(engine=engine)
+    measure('orm', lambda user_id: orm_lookup(engine, user_id), args.lookups, args.users)
+    measure('projection', repository.get_by_id, args.lookups, args.users)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+"""
+Refresh rotation benchmark: in-place revocation vs insert-only revocation ledger.
+
+Builds two scratch copies of auth.auth_sessions, seeded with live sessions,
+and runs a sustained refresh workload against each (look up the session,
+revoke it, insert its successor) from concurrent threads:
+
+- 'update' revokes by setting 'revoked = true' on the session row, as before;
+- 'ledger' revokes by inserting the jti into a revoked_sessions ledger and
+  looks sessions up with a join on it, as 'AuthSessionsRepository' does now.
+
+Reports refreshes per second, refresh latency (p50, p99), dead tuples and
+updates left on the sessions table, and how much the tables and their indexes
+grew. Autovacuum is disabled on the scratch tables unless --autovacuum is
+passed, so the dead tuples each strategy leaves behind are visible. Requires
+Postgres 13+ (gen_random_uuid) reachable through POSTGRES_URL; the real tables
+are never touched.
+"""
+
+# --- IMPORTS ---
+from concurrent.futures import ThreadPoolExecutor
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.setup.database_engine import create_database_engine
+from sqlalchemy import Engine
+from sqlalchemy import text
+from uuid import uuid4
+
+import argparse
+import statistics
+import time
+
+
+# --- TYPES ---
+from typing import Dict
+from typing import List
+
+
+# --- GLOBALS ---
+SCHEMA = 'bench_revocations'
+
+# Statements of each strategy: session lookup and revocation
+STRATEGIES: Dict[str, Dict[str, str]] = {
+    'update': {
+        'lookup': f'SELECT user_id, expires_at, revoked FROM {SCHEMA}.sessions_update WHERE jti = :jti',
+        'revoke': f'UPDATE {SCHEMA}.sessions_update SET revoked = true WHERE jti = :jti',
+    },
+    'ledger': {
+        'lookup': f'SELECT s.user_id, s.expires_at, r.jti IS NOT NULL FROM {SCHEMA}.sessions_ledger s '
+                  f'LEFT JOIN {SCHEMA}.revoked_ledger r ON r.jti = s.jti WHERE s.jti = :jti',
+        'revoke': f'INSERT INTO {SCHEMA}.revoked_ledger (jti, expires_at) '
+                  f'SELECT jti, expires_at FROM {SCHEMA}.sessions_ledger WHERE jti = :jti',
+    },
+}
+
+
+# --- CODE ---
+def create_tables(engine: Engine, name: str, sessions: int, autovacuum: bool) -> None:
+    """
+    Create and seed the scratch tables of a strategy.
+
+    :param engine: SQLAlchemy engine.
+    :param name: Strategy name.
+    :param sessions: Live sessions to seed.
+    :param autovacuum: Whether autovacuum may run on the tables.
+
+    :returns: None.
+    """
+    with engine.begin() as connection:
+
+        # Sessions table shaped like auth.auth_sessions
+        connection.execute(text(f'''
+            CREATE TABLE {SCHEMA}.sessions_{name} (
+                id serial PRIMARY KEY,
+                user_id integer NOT NULL,
+                jti uuid NOT NULL UNIQUE,
+                expires_at timestamptz NOT NULL,
+                revoked boolean NOT NULL DEFAULT false,
+                created_at timestamptz DEFAULT now()
+            ) WITH (autovacuum_enabled = {str(autovacuum).lower()})
+        '''))
+        connection.execute(text(f'CREATE INDEX ON {SCHEMA}.sessions_{name} (user_id)'))
+        connection.execute(text(f'CREATE INDEX ON {SCHEMA}.sessions_{name} (expires_at)'))
+        connection.execute(text(f'''
+            INSERT INTO {SCHEMA}.sessions_{name} (user_id, jti, expires_at)
+            SELECT n % 100000, gen_random_uuid(), now() + interval '15 days' FROM generate_series(1, :sessions) AS n
+        '''), {'sessions': sessions})
+
+        # Revocation ledger shaped like auth.revoked_sessions
+        if name == 'ledger':
+            connection.execute(text(f'''
+                CREATE TABLE {SCHEMA}.revoked_ledger (
+                    jti uuid PRIMARY KEY,
+                    revoked_at timestamptz NOT NULL DEFAULT now(),
+                    expires_at timestamptz NOT NULL
+                ) WITH (autovacuum_enabled = {str(autovacuum).lower()})
+            '''))
+            connection.execute(text(f'CREATE INDEX ON {SCHEMA}.revoked_ledger (expires_at)'))
+
+    # Start from clean statistics
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        connection.execute(text(f'VACUUM ANALYZE {SCHEMA}.sessions_{name}'))
+
+
+def total_size(engine: Engine) -> Dict[str, int]:
+    """
+    Measure the scratch tables, indexes included.
+
+    :param engine: SQLAlchemy engine.
+
+    :returns: Bytes per table.
+    """
+    with engine.connect() as connection:
+        rows = connection.execute(text('''
+            SELECT relname, pg_total_relation_size(relid) FROM pg_stat_user_tables WHERE schemaname = :schema
+        '''), {'schema': SCHEMA}).all()
+    return dict(rows)
+
+
+def rotate(engine: Engine, name: str, refreshes: int) -> List[float]:
+    """
+    Run a chain of refresh rotations, starting from a new session.
+
+    :param engine: SQLAlchemy engine.
+    :param name: Strategy name.
+    :param refreshes: Rotations in the chain.
+
+    :returns: Latency of each rotation (ms).
+    """
+    statements = STRATEGIES[name]
+    latencies = []
+    with engine.connect() as connection:
+
+        # Start the chain with a login
+        jti = uuid4()
+        connection.execute(text(f"INSERT INTO {SCHEMA}.sessions_{name} (user_id, jti, expires_at) "
+                                f"VALUES (1, :jti, now() + interval '15 days')"), {'jti': jti})
+        connection.commit()
+
+        for _ in range(refreshes):
+            start = time.perf_counter()
+
+            # Look up, revoke and replace the session, as a refresh does
+            connection.execute(text(statements['lookup']), {'jti': jti}).one()
+            connection.execute(text(statements['revoke']), {'jti': jti})
+            connection.commit()
+            jti = uuid4()
+            connection.execute(text(f"INSERT INTO {SCHEMA}.sessions_{name} (user_id, jti, expires_at) "
+                                    f"VALUES (1, :jti, now() + interval '15 days')"), {'jti': jti})
+            connection.commit()
+
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    return latencies
+
+
+def run(engine: Engine, name: str, threads: int, refreshes: int) -> None:
+    """
+    Run the refresh workload of a strategy and report.
+
+    :param engine: SQLAlchemy engine.
+    :param name: Strategy name.
+    :param threads: Concurrent refreshing clients.
+    :param refreshes: Total rotations.
+
+    :returns: None.
+    """
+    # Run workload
+    size_before = total_size(engine)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        chains = list(executor.map(lambda _: rotate(engine, name, refreshes // threads), range(threads)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for chain in chains for latency in chain]
+
+    # Let the statistics collector catch up, then read table statistics
+    time.sleep(1)
+    size_after = total_size(engine)
+    with engine.connect() as connection:
+        dead, updated = connection.execute(text('''
+            SELECT n_dead_tup, n_tup_upd FROM pg_stat_user_tables WHERE schemaname = :schema AND relname = :table
+        '''), {'schema': SCHEMA, 'table': f'sessions_{name}'}).one()
+    tables = [table for table in size_after if table.endswith(name)]
+    growth = sum(size_after[table] - size_before.get(table, 0) for table in tables)
+
+    # Report
+    print(f'{name:>6}: {len(latencies) / elapsed:,.0f} refreshes/s  '
+          f'p50={statistics.median(latencies):.2f}ms  p99={statistics.quantiles(latencies, n=100)[98]:.2f}ms  '
+          f'dead_tuples={dead:,}  updates={updated:,}  growth={growth / 1024 / 1024:,.1f}MiB')
+
+
+def main() -> None:
+    """
+    Compare both revocation strategies.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=1_000_000, help='live sessions seeded per table')
+    parser.add_argument('--refreshes', type=int, default=200_000, help='rotations per strategy')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent refreshing clients')
+    parser.add_argument('--autovacuum', action='store_true', help='let autovacuum run on the scratch tables')
+    args = parser.parse_args()
+
+    # Create database engine
+    engine = create_database_engine(url=container['config'].POSTGRES_URL, pool_size=args.threads)
+
+    # Recreate scratch schema
+    with engine.begin() as connection:
+        connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+
+    try:
+        for name in STRATEGIES:
+            create_tables(engine, name, args.sessions, args.autovacuum)
+            run(engine, name, args.threads, args.refreshes)
+
+    # Drop scratch schema
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Statement construction benchmark: rebuilt queries vs prebuilt statements.
+
+Compares the previous per-call 'session.query(...).filter(...)' lookups against
+the repositories' prebuilt statements with bound parameters, reporting the
+Python time spent per call. Uses an in-memory SQLite database by default (the
+'auth' schema is mapped away), so the database round trip is negligible and
+the difference is statement construction and cache key generation.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions  # pylint: disable=W0611
+from dayfeel_auth.db.sqlalchemy.models.users import Users
+from dayfeel_auth.db.sqlalchemy.repository.users import SELECT_USER_BY_ID
+from dayfeel_auth.db.sqlalchemy.repository.users import USER_RECORD_COLUMNS
+from dayfeel_auth.db.sqlalchemy.setup.base import BASE
+from sqlalchemy import create_engine
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import argparse
+import time
+
+
+# --- TYPES ---
+from typing import Callable
+
+
+# --- CODE ---
+def measure(name: str, lookup: Callable[[int], None], lookups: int, users: int) -> None:
+    """
+    Time a lookup function.
+
+    :param name: Label printed with the results.
+    :param lookup: Function loading one user by id.
+    :param lookups: Number of lookups.
+    :param users: Number of seeded users.
+
+    :returns: None.
+    """
+    # Warm up statement caches
+    for user_id in range(1, min(users, 100) + 1):
+        lookup(user_id)
+
+    # Measure CPU time
+    start = time.process_time()
+    for i in range(lookups):
+        lookup(i % users + 1)
+    cpu_us = (time.process_time() - start) / lookups * 1_000_000
+
+    # Report
+    print(f'{name:>9}: {cpu_us:.1f}us/call')
+
+
+def main() -> None:
+    """
+    Seed users and compare both statement styles on the same session.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--url', default='sqlite://', help='database URL (defaults to in-memory SQLite)')
+    parser.add_argument('--users', type=int, default=10_000, help='users to seed')
+    parser.add_argument('--lookups', type=int, default=50_000, help='lookups per variant')
+    args = parser.parse_args()
+
+    # Create engine, mapping the 'auth' schema away on SQLite
+    engine = create_engine(args.url)
+    if engine.dialect.name == 'sqlite':
+        engine = engine.execution_options(schema_translate_map={'auth': None})
+
+    # Create tables and seed users
+    BASE.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Users), [
+            {'email': f'user{i}@example.com', 'password_hash': 'x' * 97, 'name': f'User {i}'}
+            for i in range(args.users)
+        ])
+
+    with Session(engine) as session:
+
+        # Previous style: build the query on every call
+        measure('rebuilt',
+                lambda user_id: session.query(*USER_RECORD_COLUMNS).filter(Users.id == user_id).one_or_none(),
+                args.lookups, args.users)
+
+        # Current style: execute the prebuilt statement
+        measure('prebuilt',
+                lambda user_id: session.execute(SELECT_USER_BY_ID, {'user_id': user_id}).one_or_none(),
+                args.lookups, args.users)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Token codec benchmark: generic PyJWT vs the HS256 fast path.
+
+Compares the previous way tokens were built and checked (datetime claims,
+'jwt.encode' and 'jwt.decode' with full option processing) against the
+HS256Codec used by 'dayfeel_auth.utils.auth', reporting CPU time per encode and
+per decode of an access token. Also checks that both produce the same token.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from dayfeel_auth.utils.hs256 import HS256Codec
+from uuid import uuid4
+
+import argparse
+import jwt
+import time
+
+
+# --- TYPES ---
+from typing import Callable
+
+
+# --- GLOBALS ---
+SECRET = 'benchmark-secret-key-of-32-bytes'
+ISSUER = 'dayfeel-auth'
+REQUIRED_CLAIMS = ('exp', 'iat', 'jti')
+
+
+# --- CODE ---
+def pyjwt_encode() -> str:
+    """
+    Encode an access token as done before.
+
+    :returns: Encoded token.
+    """
+    now = datetime.now(timezone.utc)
+    return jwt.encode({'iss': ISSUER, 'sub': '1', 'exp': now + timedelta(minutes=15), 'iat': now, 'nbf': now,
+                       'jti': str(uuid4()), 'name': 'User', 'email': 'user@example.com', 'role': 'user', 'ver': 0},
+                      SECRET, algorithm='HS256')
+
+
+def codec_encode(codec: HS256Codec) -> str:
+    """
+    Encode an access token on the fast path.
+
+    :param codec: HS256 codec.
+
+    :returns: Encoded token.
+    """
+    now = int(time.time())
+    return codec.encode({'iss': ISSUER, 'sub': '1', 'exp': now + 15 * 60, 'iat': now, 'nbf': now,
+                         'jti': str(uuid4()), 'name': 'User', 'email': 'user@example.com', 'role': 'user', 'ver': 0})
+
+
+def measure(name: str, operation: Callable[[], object], iterations: int) -> None:
+    """
+    Time an operation.
+
+    :param name: Label printed with the results.
+    :param operation: Function to time.
+    :param iterations: Number of calls.
+
+    :returns: None.
+    """
+    # Warm up
+    for _ in range(100):
+        operation()
+
+    # Measure CPU time
+    start = time.process_time()
+    for _ in range(iterations):
+        operation()
+    cpu_us = (time.process_time() - start) / iterations * 1_000_000
+
+    # Report
+    print(f'{name:>13}: {cpu_us:.1f}us/call')
+
+
+def main() -> None:
+    """
+    Compare both codecs.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=50_000, help='calls per operation')
+    args = parser.parse_args()
+
+    # Create codec and a token to decode
+    codec = HS256Codec(SECRET)
+    token = codec_encode(codec)
+
+    # Check both paths agree
+    claims = jwt.decode(token, SECRET, algorithms=['HS256'], issuer=ISSUER)
+    assert codec.encode(claims) == jwt.encode(claims, SECRET, algorithm='HS256'), 'tokens differ'
+    assert codec.decode(token, issuer=ISSUER, required=REQUIRED_CLAIMS, leeway=5) == claims, 'claims differ'
+
+    # Compare encoding
+    measure('pyjwt encode', pyjwt_encode, args.iterations)
+    measure('codec encode', lambda: codec_encode(codec), args.iterations)
+
+    # Compare decoding
+    measure('pyjwt decode', lambda: jwt.decode(token, SECRET, algorithms=['HS256'],
+                                               options={'require': list(REQUIRED_CLAIMS)},
+                                               issuer=ISSUER, leeway=5), args.iterations)
+    measure('codec decode', lambda: codec.decode(token, issuer=ISSUER, required=REQUIRED_CLAIMS, leeway=5),
+            args.iterations)
+
+
+if __name__ == '__main__':
+    main()
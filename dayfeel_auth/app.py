@@ -6,6 +6,7 @@ Global service objects.
 from dayfeel_auth.models import Config
 from dayfeel_auth.models import Health
 from dayfeel_auth.models import Info
+from dayfeel_auth.models import Readiness
 from dayfeel_auth.schemas.container import Container
 from fastapi import FastAPI
 from loguru import logger
@@ -34,6 +35,9 @@ info = Info(
 # System health
 health = Health()
 
+# System readiness (set once warmup completes)
+readiness = Readiness()
+
 # Initialize logger
 logger.remove()
 logger.add(
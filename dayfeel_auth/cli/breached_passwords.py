@@ -0,0 +1,142 @@
+"""
+Build the breached-password prefix file.
+
+Reads a HIBP SHA-1 dataset ('HASH:COUNT' lines, in any order) and writes the
+sorted, deduplicated binary prefix file used by registration:
+
+    python -m dayfeel_auth.cli.breached_passwords pwned-passwords-sha1-ordered-by-hash.txt breached.bin
+
+Prefixes are sorted in runs that fit in memory, written next to the target,
+then merged, so inputs larger than memory can be converted.
+"""
+
+# --- IMPORTS ---
+import argparse
+import heapq
+import os
+import shutil
+import sys
+import tempfile
+
+
+# --- TYPES ---
+from typing import Iterator
+from typing import List
+
+
+# --- GLOBALS ---
+# Prefixes sorted in memory at once (about 300 MB of 10-byte prefixes)
+RUN_SIZE = 10_000_000
+
+# Prefixes read at once from a run
+READ_BATCH = 65_536
+
+
+# --- CODE ---
+def build(source: str, target: str, prefix_bytes: int, min_count: int, run_size: int = RUN_SIZE) -> int:
+    """
+    Convert a 'HASH:COUNT' text file into a sorted binary prefix file.
+
+    :param source: HIBP text file.
+    :param target: Output file (written next to it, then renamed over it).
+    :param prefix_bytes: Bytes of SHA-1 kept per password.
+    :param min_count: Skip hashes seen in fewer breaches.
+    :param run_size: Prefixes sorted in memory at once.
+
+    :returns: Number of prefixes written.
+    """
+    written = 0
+    previous = None
+    temporary_path = f'{target}.tmp'
+    runs_directory = tempfile.mkdtemp(prefix='breached-runs-', dir=os.path.dirname(os.path.abspath(target)))
+
+    try:
+        # Sort the input in runs
+        runs: List[str] = []
+        prefixes: List[bytes] = []
+        with open(source, encoding='ascii') as lines:
+            for line in lines:
+
+                # Parse line
+                digest, _, count = line.strip().partition(':')
+                if not digest or int(count or 1) < min_count:
+                    continue
+                prefixes.append(bytes.fromhex(digest)[:prefix_bytes])
+
+                # If the run is full: write it out
+                if len(prefixes) >= run_size:
+                    runs.append(write_run(prefixes, runs_directory))
+                    prefixes = []
+
+        if prefixes:
+            runs.append(write_run(prefixes, runs_directory))
+
+        # Merge the runs; equal prefixes are written once
+        with open(temporary_path, 'wb') as output:
+            for prefix in heapq.merge(*(read_run(run, prefix_bytes) for run in runs)):
+                if prefix != previous:
+                    output.write(prefix)
+                    previous = prefix
+                    written += 1
+
+    finally:
+        shutil.rmtree(runs_directory)
+
+    os.replace(temporary_path, target)
+    return written
+
+
+def write_run(prefixes: List[bytes], directory: str) -> str:
+    """
+    Sort prefixes and write them to a run file.
+
+    :param prefixes: Prefixes of the run (sorted in place).
+    :param directory: Directory of the run files.
+
+    :returns: Path of the run file.
+    """
+    prefixes.sort()
+    with tempfile.NamedTemporaryFile(dir=directory, delete=False) as run:
+        run.write(b''.join(prefixes))
+    return run.name
+
+
+def read_run(path: str, prefix_bytes: int) -> Iterator[bytes]:
+    """
+    Read the prefixes of a run file in order.
+
+    :param path: Path of the run file.
+    :param prefix_bytes: Bytes per prefix.
+
+    :returns: Prefixes.
+    """
+    with open(path, 'rb') as run:
+        while block := run.read(READ_BATCH * prefix_bytes):
+            for offset in range(0, len(block), prefix_bytes):
+                yield block[offset:offset + prefix_bytes]
+
+
+def main() -> None:
+    """
+    Command line entry point.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help='HIBP SHA-1 text file')
+    parser.add_argument('target', help='binary prefix file to write')
+    parser.add_argument('--prefix-bytes', type=int, default=10, help='SHA-1 bytes kept per password '
+                                                                      '(must match BREACHED_PASSWORDS_PREFIX_BYTES)')
+    parser.add_argument('--min-count', type=int, default=1, help='skip hashes seen in fewer breaches')
+    args = parser.parse_args()
+
+    # Build file
+    written = build(args.source, args.target, args.prefix_bytes, args.min_count)
+
+    # Report
+    print(f'Wrote {written:,} prefixes ({written * args.prefix_bytes:,} bytes) to {args.target}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
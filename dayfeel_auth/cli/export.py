@@ -0,0 +1,71 @@
+"""
+Export a table as NDJSON or CSV.
+
+Streams every row of auth.users (without password hashes) or
+auth.auth_sessions through a server-side cursor, one batch at a time:
+
+    python -m dayfeel_auth.cli.export users --format csv --output users.csv
+
+Throughput is reported on stderr once the export is done.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.repository.exports import EXPORT_COLUMNS
+from dayfeel_auth.db.sqlalchemy.repository.exports import ExportsRepository
+from dayfeel_auth.db.sqlalchemy.setup.database_engine import create_database_engine
+from dayfeel_auth.utils.exports import MEDIA_TYPES
+from dayfeel_auth.utils.exports import format_batches
+
+import argparse
+import sys
+
+
+# --- TYPES ---
+from typing import TextIO
+
+
+# --- CODE ---
+def main() -> None:
+    """
+    Command line entry point.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('table', choices=list(EXPORT_COLUMNS), help='table to export')
+    parser.add_argument('--format', dest='export_format', choices=list(MEDIA_TYPES), default='ndjson',
+                        help='output format')
+    parser.add_argument('--output', default='-', help='output file (defaults to stdout)')
+    parser.add_argument('--url', default=None, help='database URL (defaults to POSTGRES_URL; a replica is fine)')
+    parser.add_argument('--batch-size', type=int, default=container['config'].EXPORT_BATCH_SIZE,
+                        help='rows fetched per round trip')
+    args = parser.parse_args()
+
+    # Create exports repository
+    db = ExportsRepository(engine=create_database_engine(url=args.url or container['config'].POSTGRES_URL))
+
+    # Report throughput on stderr
+    def on_done(rows: int, elapsed: float) -> None:
+        print(f'Exported {rows:,} {args.table} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)',
+              file=sys.stderr)
+
+    # Stream rows to output
+    def export(output: TextIO) -> None:
+        for chunk in format_batches(db.stream(args.table, batch_size=args.batch_size),
+                                    columns=db.columns(args.table),
+                                    export_format=args.export_format,
+                                    on_done=on_done):
+            output.write(chunk)
+
+    # Close the output file, but never the process's stdout
+    if args.output == '-':
+        export(sys.stdout)
+    else:
+        with open(args.output, 'w', encoding='utf-8', newline='') as output:
+            export(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Manage the service clients of the client-credentials grant.
+
+Registers a client and prints its id and secret once (only a keyed hash of
+the secret is stored, so it cannot be shown again), or disables and enables
+an existing client:
+
+    python -m dayfeel_auth.cli.service_clients create reports-worker
+    python -m dayfeel_auth.cli.service_clients disable svc_0123456789abcdef
+
+Clients then get access tokens from 'POST /auth/token'.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.models.service_clients import ServiceClients
+from dayfeel_auth.db.sqlalchemy.repository.service_clients import ServiceClientsRepository
+from dayfeel_auth.db.sqlalchemy.setup.database_engine import create_database_engine
+from dayfeel_auth.utils.client_secrets import generate_client_credentials
+from dayfeel_auth.utils.client_secrets import hash_client_secret
+
+import argparse
+import sys
+
+
+# --- CODE ---
+def main() -> None:
+    """
+    Command line entry point.
+
+    :returns: None.
+    """
+    # Parse arguments
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('create', help='register a client and print its credentials').add_argument(
+        'name', help='client name, written in the tokens it gets')
+    for command in ('disable', 'enable'):
+        commands.add_parser(command, help=f'{command} a client').add_argument('client_id', help='client id')
+    args = parser.parse_args()
+
+    # Create service clients repository
+    db = ServiceClientsRepository(engine=create_database_engine(url=container['config'].POSTGRES_URL))
+
+    # Register client and print its credentials
+    if args.command == 'create':
+        client_id, client_secret = generate_client_credentials()
+        db.insert_client(ServiceClients(client_id=client_id, secret_hash=hash_client_secret(client_secret),
+                                        name=args.name))
+        print(f'client_id={client_id}')
+        print(f'client_secret={client_secret}')
+        print('Store the secret now: it cannot be shown again.', file=sys.stderr)
+        return
+
+    # Disable or enable client
+    if not db.set_active(args.client_id, active=args.command == 'enable'):
+        sys.exit(f'Unknown client: {args.client_id}')
+    print(f'{args.client_id} {args.command}d', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+AuthSessions repository interface.
+"""
+
+# --- IMPORTS ---
+from abc import ABC
+from abc import abstractmethod
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.schemas.records.auth_sessions import AuthSessionRecord
+
+
+# --- TYPES ---
+from typing import Optional
+from uuid import UUID
+
+
+# --- CODE ---
+class AuthSessionsRepositoryInterface(ABC):
+    """
+    Session store used by the auth endpoints.
+
+    Implementations are selected with the SESSION_STORE config.
+    """
+
+    def start(self) -> None:
+        """
+        Start any background work of the store.
+
+        :returns: None.
+        """
+        pass
+
+
+    def stop(self) -> None:
+        """
+        Stop background work and persist pending state.
+
+        :returns: None.
+        """
+        pass
+
+
+    @abstractmethod
+    def insert_session(self, session: AuthSessions) -> AuthSessions:
+        """
+        Insert a new authentication session.
+
+        :param session: New authentication session.
+
+        :returns: Persisted authentication session.
+        """
+
+
+    @abstractmethod
+    def get_by_jti(self, jti: UUID) -> Optional[AuthSessionRecord]:
+        """
+        Retrieve a session by its JWT "jti".
+
+        :param jti: Unique JWT identifier.
+
+        :returns: AuthSessionRecord or None if not found.
+        """
+
+
+    @abstractmethod
+    def revoke_session(self, jti: UUID) -> bool:
+        """
+        Revoke a session.
+
+        :param jti: Unique JWT identifier.
+
+        :returns: True if this call revoked the session, False if it was unknown or already revoked.
+        """
+
+
+    @abstractmethod
+    def delete_expired_sessions(self) -> int:
+        """
+        Delete all expired sessions.
+
+        :returns: Number of deleted sessions.
+        """
@@ -0,0 +1,253 @@
+"""
+In-memory AuthSessions repository.
+
+Keeps sessions in a process-local dict for microsecond lookups, optionally
+persisting them to a JSON lines snapshot file at a fixed interval and on stop.
+Expired sessions are deleted at their own interval, snapshots or not.
+Sessions are not shared between processes, so this store is meant for
+single-node, single-worker deployments and tests.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from datetime import timezone
+from dayfeel_auth.app import container
+from dayfeel_auth.db.interfaces.auth_sessions import AuthSessionsRepositoryInterface
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.schemas.records.auth_sessions import AuthSessionRecord
+from threading import Event
+from threading import Lock
+from threading import Thread
+from uuid import UUID
+
+import json
+import os
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+
+# --- CODE ---
+class MemoryAuthSessionsRepository(AuthSessionsRepositoryInterface):
+    """
+    Session store kept in process memory.
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None, snapshot_interval_sec: float = 30.0,
+                 expiry_interval_sec: float = 60.0) -> None:
+        """
+        Initializes the storage, loading the last snapshot if any.
+
+        :param snapshot_path: File used to persist sessions, or None to keep them in memory only.
+        :param snapshot_interval_sec: Seconds between snapshots.
+        :param expiry_interval_sec: Seconds between deletions of expired sessions.
+
+        :returns: None.
+        """
+        self.__snapshot_path = snapshot_path
+        self.__snapshot_interval_sec = snapshot_interval_sec
+        self.__expiry_interval_sec = expiry_interval_sec
+
+        # jti -> session record
+        self.__sessions: Dict[UUID, AuthSessionRecord] = {}
+        self.__lock = Lock()
+        self.__dirty = False
+        self.__stop = Event()
+        self.__threads: List[Thread] = []
+
+        # Restore sessions from last snapshot
+        self.__load_snapshot()
+
+
+    def start(self) -> None:
+        """
+        Start periodic expiry, and periodic snapshots if configured.
+
+        :returns: None.
+        """
+        # Delete expired sessions, so memory does not grow with every login
+        self.__threads.append(Thread(target=self.__run, args=(self.__expiry_interval_sec, self.delete_expired_sessions),
+                                     name='session-expiry', daemon=True))
+
+        # Persist sessions
+        if self.__snapshot_path is not None:
+            self.__threads.append(Thread(target=self.__run, args=(self.__snapshot_interval_sec, self.snapshot),
+                                         name='session-snapshot', daemon=True))
+
+        for thread in self.__threads:
+            thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Stop periodic tasks and write a final snapshot.
+
+        :returns: None.
+        """
+        self.__stop.set()
+        for thread in self.__threads:
+            thread.join()
+
+        # Keep shutting down if the snapshot cannot be written (e.g. disk full): sessions since the last one are lost
+        try:
+            self.snapshot()
+        except OSError as e:
+            container['logger'].error(f'Session store final snapshot failed: {e}')
+
+
+    def insert_session(self, session: AuthSessions) -> AuthSessions:
+        """
+        Insert a new authentication session.
+
+        :param session: New authentication session.
+
+        :returns: The same authentication session.
+        """
+        with self.__lock:
+            self.__sessions[session.jti] = AuthSessionRecord(jti=session.jti,
+                                                             user_id=session.user_id,
+                                                             expires_at=session.expires_at,
+                                                             revoked=bool(session.revoked))
+            self.__dirty = True
+
+        return session
+
+
+    def get_by_jti(self, jti: UUID) -> Optional[AuthSessionRecord]:
+        """
+        Retrieve a session by its JWT "jti".
+
+        :param jti: Unique JWT identifier.
+
+        :returns: AuthSessionRecord or None if not found.
+        """
+        return self.__sessions.get(jti)
+
+
+    def revoke_session(self, jti: UUID) -> bool:
+        """
+        Revoke a session.
+
+        :param jti: Unique JWT identifier.
+
+        :returns: True if this call revoked the session, False if it was unknown or already revoked.
+        """
+        with self.__lock:
+
+            # Get session
+            session = self.__sessions.get(jti)
+
+            # If session is unknown or already revoked: nothing to do
+            if session is None or session.revoked:
+                return False
+
+            # Revoke session
+            self.__sessions[jti] = session._replace(revoked=True)
+            self.__dirty = True
+
+            return True
+
+
+    def delete_expired_sessions(self) -> int:
+        """
+        Delete all expired sessions.
+
+        :returns: Number of deleted sessions.
+        """
+        # Current datetime (UTC)
+        now = datetime.now(timezone.utc)
+
+        with self.__lock:
+
+            # Find expired sessions
+            expired = [jti for jti, session in self.__sessions.items() if session.expires_at < now]
+
+            # Delete them
+            for jti in expired:
+                del self.__sessions[jti]
+
+            if expired:
+                self.__dirty = True
+
+        return len(expired)
+
+
+    def snapshot(self) -> None:
+        """
+        Write all live sessions to the snapshot file, if configured and changed.
+
+        The file is written next to the target and atomically renamed over it,
+        so a crash never leaves a half-written snapshot behind.
+
+        :returns: None.
+        """
+        # If persistence is disabled or nothing changed: skip
+        if self.__snapshot_path is None or not self.__dirty:
+            return
+
+        # Drop expired sessions before persisting
+        self.delete_expired_sessions()
+
+        # Copy sessions so writing the file does not block requests
+        with self.__lock:
+            sessions = list(self.__sessions.values())
+            self.__dirty = False
+
+        # Write snapshot (if it fails: keep the changes pending for the next one)
+        temporary_path = f'{self.__snapshot_path}.tmp'
+        try:
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                for session in sessions:
+                    file.write(json.dumps({'jti': str(session.jti),
+                                           'user_id': session.user_id,
+                                           'expires_at': session.expires_at.isoformat(),
+                                           'revoked': session.revoked}) + '\n')
+            os.replace(temporary_path, self.__snapshot_path)
+        except OSError:
+            self.__dirty = True
+            raise
+
+
+# --- Private helpers ---
+    def __run(self, interval_sec: float, task: Callable[[], Any]) -> None:
+        """
+        Run a task at a fixed interval until stopped.
+
+        :param interval_sec: Seconds between runs.
+        :param task: Task to run.
+
+        :returns: None.
+        """
+        while not self.__stop.wait(interval_sec):
+
+            # Keep the loop alive: a failed run (e.g. disk full) is retried at the next interval
+            try:
+                task()
+            except Exception as e:  # pylint: disable=W0718
+                container['logger'].error(f'Session store {task.__name__} failed: {e}')
+
+
+    def __load_snapshot(self) -> None:
+        """
+        Load sessions from the snapshot file, if any.
+
+        :returns: None.
+        """
+        # If there is no snapshot: start empty
+        if self.__snapshot_path is None or not os.path.exists(self.__snapshot_path):
+            return
+
+        # Read snapshot
+        with open(self.__snapshot_path, encoding='utf-8') as file:
+            for line in file:
+                entry = json.loads(line)
+                jti = UUID(entry['jti'])
+                self.__sessions[jti] = AuthSessionRecord(jti=jti,
+                                                         user_id=entry['user_id'],
+                                                         expires_at=datetime.fromisoformat(entry['expires_at']),
+                                                         revoked=entry['revoked'])
@@ -0,0 +1,34 @@
+"""
+Login events model.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.setup.base import BASE
+from sqlalchemy import BigInteger
+from sqlalchemy import Boolean
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import String
+
+
+# --- CODE ---
+class LoginEvents(BASE):
+    """
+    Defines the login attempt audit entity (append-only, partitioned by month of 'occurred_at').
+    """
+    __tablename__ = 'login_events'
+    __table_args__ = {'schema': 'auth', 'postgresql_partition_by': 'RANGE (occurred_at)'}
+
+    # Partitioned tables need the partition key in their primary key
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    occurred_at = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(Integer)
+    success = Column(Boolean, nullable=False)
+    ip_address = Column(String(45))
+    user_agent = Column(String(512))
+
+
+# Per-user history, newest first
+Index('ix_auth_login_events_user_id_occurred_at', LoginEvents.user_id, LoginEvents.occurred_at)
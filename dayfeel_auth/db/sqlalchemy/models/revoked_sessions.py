@@ -0,0 +1,26 @@
+"""
+Revoked sessions model.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.setup.base import BASE
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Uuid
+from sqlalchemy import func
+
+
+# --- CODE ---
+class RevokedSessions(BASE):
+    """
+    Defines the append-only ledger of revoked authentication sessions.
+
+    A session is revoked when its jti is in this table; 'auth_sessions' rows
+    are never updated, so refresh rotation only inserts.
+    """
+    __tablename__ = 'revoked_sessions'
+    __table_args__ = {'schema': 'auth'}
+
+    jti = Column(Uuid, primary_key=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # pylint: disable=E1102
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
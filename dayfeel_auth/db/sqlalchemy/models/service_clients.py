@@ -0,0 +1,31 @@
+"""
+Service clients model.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.setup.base import BASE
+from sqlalchemy import Boolean
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Integer
+from sqlalchemy import String
+from sqlalchemy import func
+
+
+# --- CODE ---
+class ServiceClients(BASE):
+    """
+    Defines the machine clients allowed to use the client-credentials grant.
+
+    Secrets are generated by the service with enough entropy that a keyed
+    HMAC-SHA256 is a safe way to store them; only that hash is kept.
+    """
+    __tablename__ = 'service_clients'
+    __table_args__ = {'schema': 'auth'}
+
+    id = Column(Integer, primary_key=True)
+    client_id = Column(String(64), nullable=False, unique=True)
+    secret_hash = Column(String(64), nullable=False)
+    name = Column(String, nullable=False)
+    active = Column(Boolean, nullable=False, default=True, server_default='true')
+    created_at = Column(DateTime(timezone=True), server_default=func.now())  # pylint: disable=E1102
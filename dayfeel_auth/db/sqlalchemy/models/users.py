@@ -8,6 +8,7 @@ from dayfeel_auth.enums.user_role import UserRole
 from sqlalchemy import Column
 from sqlalchemy import DateTime
 from sqlalchemy import Enum
+from sqlalchemy import Index
 from sqlalchemy import Integer
 from sqlalchemy import String
 from sqlalchemy import func
@@ -23,13 +24,24 @@ class Users(BASE):
     __table_args__ = {'schema': 'auth'}
 
     id = Column(Integer, primary_key=True)
-    email = Column(String, nullable=False, unique=True)
+    email = Column(String, nullable=False)
     password_hash = Column(String, nullable=False)
     name = Column(String, nullable=False)
     role = Column(Enum(UserRole, name='user_role_enum', schema='auth'), nullable=False, default=UserRole.USER)
     last_login = Column(DateTime(timezone=True))
+    token_version = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(DateTime(timezone=True), server_default=func.now())  # pylint: disable=E1102
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())  # pylint: disable=E1102
 
     # ORM relationship
-    sessions = relationship("AuthSessions", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    sessions = relationship("AuthSessions", back_populates="user", cascade="all, delete-orphan", passive_deletes=True,
+                            lazy="raise")
+
+
+# Case-insensitive email uniqueness, also used by email lookups
+Index('ix_auth_users_email_lower', func.lower(Users.email), unique=True)
+
+# Admin user listing: keyset pagination on (created_at, id), role filter paginated on id, last-login ranges
+Index('ix_auth_users_created_at_id', Users.created_at, Users.id)
+Index('ix_auth_users_role_id', Users.role, Users.id)
+Index('ix_auth_users_last_login', Users.last_login)
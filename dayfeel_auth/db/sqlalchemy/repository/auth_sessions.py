@@ -1,22 +1,69 @@
 """
 AuthSessions table repository.
+
+Sessions are insert-only: revoking one appends its jti to the revoked_sessions
+ledger instead of updating the session row, so refresh rotation leaves no dead
+tuples or index churn behind on auth_sessions. Both tables are pruned by
+delete_expired_sessions.
 """
 
 # --- IMPORTS ---
 from datetime import datetime
 from datetime import timezone
+from dayfeel_auth.db.interfaces.auth_sessions import AuthSessionsRepositoryInterface
 from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.db.sqlalchemy.models.revoked_sessions import RevokedSessions
 from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import DbConnectionHandler
+from dayfeel_auth.db.sqlalchemy.setup.retry import retry_transient_errors
 from dayfeel_auth.err.database_unavailable_error import DatabaseUnavailableError
+from dayfeel_auth.schemas.records.auth_sessions import AuthSessionRecord
 from sqlalchemy import Engine
+from sqlalchemy import bindparam
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
 
 # --- TYPES ---
+from typing import List
 from typing import Optional
+from uuid import UUID
+
+
+# --- GLOBALS ---
+# Session lookup, revocation and cleanup statements
+
+# A session is revoked if its jti is in the ledger ('revoked' is only set on rows revoked before the ledger)
+SESSION_REVOKED = or_(AuthSessions.revoked, RevokedSessions.jti.is_not(None)).label('revoked')
+SELECT_SESSION_BY_JTI = (
+    select(AuthSessions.jti, AuthSessions.user_id, AuthSessions.expires_at, SESSION_REVOKED)
+    .outerjoin(RevokedSessions, RevokedSessions.jti == AuthSessions.jti)
+    .where(AuthSessions.jti == bindparam('jti'))
+)
+# Core insert on the table: ORM-enabled inserts treat parameters as bulk rows, which INSERT .. SELECT cannot take
+REVOKE_SESSION = (
+    insert(RevokedSessions.__table__)
+    .from_select([RevokedSessions.jti, RevokedSessions.expires_at],
+                 select(AuthSessions.jti, AuthSessions.expires_at)
+                 .where(AuthSessions.jti == bindparam('session_jti')))
+)
+INSERT_SESSIONS = insert(AuthSessions)
+DELETE_EXPIRED_SESSIONS = (
+    delete(AuthSessions)
+    .where(AuthSessions.expires_at < bindparam('now'))
+    .execution_options(synchronize_session=False)
+)
+DELETE_EXPIRED_REVOCATIONS = (
+    delete(RevokedSessions)
+    .where(RevokedSessions.expires_at < bindparam('now'))
+    .execution_options(synchronize_session=False)
+)
 
 
 # --- CODE ---
-class AuthSessionsRepository:
+class AuthSessionsRepository(AuthSessionsRepositoryInterface):
     """
     Repository responsible for operations related to the auth_sessions table.
     """
@@ -60,50 +107,78 @@ class AuthSessionsRepository:
                 raise DatabaseUnavailableError(e) from e
 
 
-    def get_by_jti(self, jti: str) -> Optional[AuthSessions]:
+    def insert_sessions(self, sessions: List[AuthSessions]) -> None:
+        """
+        Insert several authentication sessions in one multi-row insert and commit.
+
+        :param sessions: New authentication sessions.
+
+        :returns: None.
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__engine) as db:
+            try:
+                # Insert all sessions at once
+                db.session.execute(INSERT_SESSIONS, [{'user_id': session.user_id,
+                                                      'jti': session.jti,
+                                                      'expires_at': session.expires_at,
+                                                      'revoked': bool(session.revoked)}
+                                                     for session in sessions])
+
+                # Commit changes
+                db.session.commit()
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    @retry_transient_errors
+    def get_by_jti(self, jti: UUID) -> Optional[AuthSessionRecord]:
         """
         Retrieve a session by its JWT "jti".
 
         :param jti: Unique JWT identifier.
 
-        :returns: AuthSessions or None if not found.
+        :returns: AuthSessionRecord or None if not found.
         """
-        # Open database connection
+        # Open database connection (primary only: a lagging replica could miss a new session or a revocation)
         with DbConnectionHandler(self.__engine) as db:
             try:
-                # Retrieve session by jti from database
-                query = db.session.query(AuthSessions).filter(AuthSessions.jti == jti).one_or_none()
+                # Retrieve session columns by jti from database
+                row = db.session.execute(SELECT_SESSION_BY_JTI, {'jti': jti}).one_or_none()
 
-                # Return AuthSessions or None
-                return query
+                # Return AuthSessionRecord or None
+                return AuthSessionRecord(*row) if row else None
 
             # If database is unavailable: raise error
             except Exception as e:
                 raise DatabaseUnavailableError(e) from e
 
 
-    def revoke_session(self, jti: str) -> None:
+    def revoke_session(self, jti: UUID) -> bool:
         """
-        Revoke a session.
+        Revoke a session by appending it to the revocation ledger.
 
         :param jti: Unique JWT identifier.
 
-        :returns: None.
+        :returns: True if this call revoked the session, False if it was unknown or already revoked.
         """
         # Open database connection
         with DbConnectionHandler(self.__engine) as db:
             try:
-                # Retrieve session by jti from database
-                session = db.session.query(AuthSessions).filter(AuthSessions.jti == jti).one_or_none()
+                # Append jti to the ledger, without touching the session row
+                revoked = db.session.execute(REVOKE_SESSION, {'session_jti': jti}).rowcount
 
-                # If session exists: revoke session
-                if session:
+                # Commit changes
+                db.session.commit()
 
-                    # Set revoked field = True
-                    session.revoked = True
+                return revoked > 0
 
-                    # Commit changes
-                    db.session.commit()
+            # If a concurrent request revoked it first: report it
+            except IntegrityError:
+                db.session.rollback()
+                return False
 
             # If database is unavailable: raise error
             except Exception as e:
@@ -112,7 +187,7 @@ class AuthSessionsRepository:
 
     def delete_expired_sessions(self) -> int:
         """
-        Delete all expired sessions to clean up the table.
+        Delete all expired sessions and their revocations to clean up the tables.
 
         :returns: Number of deleted rows.
         """
@@ -122,8 +197,9 @@ class AuthSessionsRepository:
                 # Current datetime (UTC)
                 now = datetime.now(timezone.utc)
 
-                # Delete all sessions where expires_at < now
-                result = db.session.query(AuthSessions).filter(AuthSessions.expires_at < now).delete()
+                # Delete all sessions where expires_at < now, and their revocations
+                result = db.session.execute(DELETE_EXPIRED_SESSIONS, {'now': now}).rowcount
+                db.session.execute(DELETE_EXPIRED_REVOCATIONS, {'now': now})
 
                 # Commit changes
                 db.session.commit()
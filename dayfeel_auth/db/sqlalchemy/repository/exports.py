@@ -0,0 +1,115 @@
+"""
+Streaming table exports.
+
+Rows are read through a server-side cursor and handed out in fixed-size
+batches, so an export of millions of rows never holds more than one batch in
+memory. Exports run on their own connection rather than a DbConnectionHandler
+session: they are long-running by design, so request deadlines and the
+circuit breaker do not apply to them. That connection is opened outside the
+engine's pool, so a few slow export clients never hold the connections logins
+and refreshes need.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.db.sqlalchemy.models.revoked_sessions import RevokedSessions
+from dayfeel_auth.db.sqlalchemy.models.users import Users
+from dayfeel_auth.db.sqlalchemy.repository.auth_sessions import SESSION_REVOKED
+from functools import lru_cache
+from sqlalchemy import Engine
+from sqlalchemy import Select
+from sqlalchemy import create_engine
+from sqlalchemy import select
+from sqlalchemy.pool import NullPool
+
+
+# --- TYPES ---
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Literal
+from typing import Sequence
+from typing import Tuple
+
+
+# --- GLOBALS ---
+ExportTable = Literal['users', 'auth_sessions']
+
+# Exported columns per table (never the password hash)
+EXPORT_COLUMNS = {
+    'users': (Users.id, Users.email, Users.name, Users.role, Users.last_login, Users.token_version,
+              Users.created_at, Users.updated_at),
+    'auth_sessions': (AuthSessions.id, AuthSessions.user_id, AuthSessions.jti, AuthSessions.expires_at,
+                      SESSION_REVOKED, AuthSessions.created_at),
+}
+
+# Full table scans in primary key order
+EXPORT_STATEMENTS: Dict[str, Select] = {
+    table: select(*columns).order_by(columns[0]) for table, columns in EXPORT_COLUMNS.items()
+}
+
+# Sessions are revoked through the ledger
+EXPORT_STATEMENTS['auth_sessions'] = EXPORT_STATEMENTS['auth_sessions'].outerjoin(
+    RevokedSessions, RevokedSessions.jti == AuthSessions.jti
+)
+
+
+# --- CODE ---
+@lru_cache(maxsize=None)
+def get_export_engine(engine: Engine) -> Engine:
+    """
+    Get an engine on the same database that opens a new connection per export, built once per engine.
+
+    :param engine: SQLAlchemy engine serving requests.
+
+    :returns: Unpooled engine.
+    """
+    return create_engine(url=engine.url, echo=False, future=True, poolclass=NullPool)
+
+
+class ExportsRepository:
+    """
+    Repository streaming whole tables for exports.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        """
+        Initializes the storage.
+
+        :param engine: SQLAlchemy engine.
+
+        :returns: None.
+        """
+        self.__engine = engine
+
+
+    @staticmethod
+    def columns(table: ExportTable) -> List[str]:
+        """
+        Names of the exported columns of a table.
+
+        :param table: Exported table.
+
+        :returns: Column names, in row order.
+        """
+        return [column.key for column in EXPORT_COLUMNS[table]]
+
+
+    def stream(self, table: ExportTable, batch_size: int = 1_000) -> Iterator[Sequence[Tuple]]:
+        """
+        Stream every row of a table in batches.
+
+        :param table: Exported table.
+        :param batch_size: Rows fetched from the server-side cursor at a time.
+
+        :returns: Iterator over batches of rows.
+        """
+        # Open a connection of our own, closed when the export ends
+        with get_export_engine(self.__engine).connect() as connection:
+
+            # Read through a server-side cursor, fetching batch_size rows per round trip
+            result = connection.execution_options(stream_results=True, max_row_buffer=batch_size) \
+                               .execute(EXPORT_STATEMENTS[table])
+
+            # Hand rows out batch_size at a time (the size must be given: 'yield_per' on a connection is ignored here)
+            yield from result.partitions(batch_size)
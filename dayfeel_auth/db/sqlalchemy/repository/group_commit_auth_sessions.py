@@ -0,0 +1,190 @@
+"""
+AuthSessions repository with group commit.
+
+Every login and refresh inserts one session, and committing each insert on
+its own costs one WAL flush per token issued. This repository hands inserts
+to a writer thread that collects the sessions of concurrent requests for up
+to a few milliseconds (or until the batch is full), writes them with one
+multi-row insert and one commit, then releases every waiting request. Each
+request still returns only once its session is durable, and a request that
+gives up waiting withdraws its session unless its batch is already being written.
+"""
+
+# --- IMPORTS ---
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.db.sqlalchemy.repository.auth_sessions import AuthSessionsRepository
+from dayfeel_auth.err.deadline_exceeded_error import DeadlineExceededError
+from dayfeel_auth.utils.deadlines import remaining_sec
+from queue import Empty
+from queue import SimpleQueue
+from sqlalchemy import Engine
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+import time
+
+
+# --- TYPES ---
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+# --- GLOBALS ---
+# Seconds the writer waits for a first insert before checking whether it must stop
+IDLE_POLL_SEC = 0.1
+
+# Seconds an insert made outside a request (no deadline) waits for its batch
+NO_DEADLINE_WAIT_SEC = 30.0
+
+
+# --- CODE ---
+class GroupCommitAuthSessionsRepository(AuthSessionsRepository):
+    """
+    Postgres session store batching concurrent inserts into shared commits.
+    """
+
+    def __init__(self, engine: Engine, max_wait_ms: float = 2.0, max_batch: int = 64) -> None:
+        """
+        Initializes the storage.
+
+        :param engine: SQLAlchemy engine.
+        :param max_wait_ms: Milliseconds the first insert of a batch waits for others to join.
+        :param max_batch: Maximum sessions written per commit.
+
+        :returns: None.
+        """
+        super().__init__(engine=engine)
+        self.__max_wait_sec = max_wait_ms / 1000
+        self.__max_batch = max_batch
+
+        # Pending inserts, each with the future its request waits on
+        self.__pending: 'SimpleQueue[Tuple[AuthSessions, Future]]' = SimpleQueue()
+        self.__stop = Event()
+        self.__thread: Optional[Thread] = None
+
+        # Makes "is the writer running?" and queueing one step, so nothing is queued after the final drain
+        self.__lock = Lock()
+
+
+    def start(self) -> None:
+        """
+        Start the writer thread.
+
+        :returns: None.
+        """
+        self.__thread = Thread(target=self.__run, name='session-group-commit', daemon=True)
+        self.__thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Write pending inserts and stop the writer thread.
+
+        :returns: None.
+        """
+        with self.__lock:
+            self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+        # Write inserts the writer left behind
+        batch = []
+        while not self.__pending.empty():
+            batch.append(self.__pending.get_nowait())
+        if batch:
+            self.__write(batch)
+
+
+    def insert_session(self, session: AuthSessions) -> AuthSessions:
+        """
+        Insert a new authentication session, waiting for the batch it joins to commit.
+
+        Blocks the calling thread, so async endpoints must call it from the thread pool.
+
+        :param session: New authentication session.
+
+        :raises DeadlineExceededError: If the batch did not commit before the request deadline.
+
+        :returns: The same authentication session.
+        """
+        # Wait no longer than the request has left
+        timeout = remaining_sec()
+        if timeout is not None and timeout <= 0:
+            raise DeadlineExceededError({'detail': 'Request deadline exceeded before the session insert.'})
+
+        # Queue insert, unless the writer is not running: then insert on our own
+        future: Future = Future()
+        with self.__lock:
+            running = self.__thread is not None and not self.__stop.is_set()
+            if running:
+                self.__pending.put((session, future))
+        if not running:
+            return super().insert_session(session)
+
+        # Wait for its batch (re-raises the batch error, if any)
+        try:
+            future.result(timeout=NO_DEADLINE_WAIT_SEC if timeout is None else timeout)
+
+        # If the batch did not commit in time: withdraw the session, so the writer does not commit a token never issued
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceededError({'detail': 'Request deadline exceeded waiting for the session commit.'})  # pylint: disable=W0707
+
+        return session
+
+
+# --- Private helpers ---
+    def __run(self) -> None:
+        """
+        Writer loop, runs until stopped and every pending insert is written.
+
+        :returns: None.
+        """
+        while not (self.__stop.is_set() and self.__pending.empty()):
+
+            # Wait for the first insert of a batch
+            try:
+                batch = [self.__pending.get(timeout=IDLE_POLL_SEC)]
+            except Empty:
+                continue
+
+            # Let concurrent inserts join until the batch is full or the wait is over
+            deadline = time.monotonic() + self.__max_wait_sec
+            while len(batch) < self.__max_batch:
+                try:
+                    batch.append(self.__pending.get(timeout=max(0.0, deadline - time.monotonic())))
+                except Empty:
+                    break
+
+            # Write batch and release its requests
+            self.__write(batch)
+
+
+    def __write(self, batch: List[Tuple[AuthSessions, Future]]) -> None:
+        """
+        Write a batch in one commit and resolve its futures.
+
+        :param batch: Pending inserts.
+
+        :returns: None.
+        """
+        # Drop inserts whose request gave up waiting, the others can no longer be withdrawn
+        batch = [(session, future) for session, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            self.insert_sessions([session for session, _ in batch])
+
+        # If the batch failed: fail every request in it
+        except Exception as e:  # pylint: disable=W0718
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for _, future in batch:
+            future.set_result(None)
@@ -0,0 +1,129 @@
+"""
+LoginEvents table repository.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from dayfeel_auth.db.sqlalchemy.models.login_events import LoginEvents
+from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import DbConnectionHandler
+from dayfeel_auth.err.database_unavailable_error import DatabaseUnavailableError
+from dayfeel_auth.schemas.records.login_events import LoginEventRecord
+from sqlalchemy import Engine
+from sqlalchemy import insert
+from sqlalchemy import text
+
+
+# --- TYPES ---
+from typing import List
+
+
+# --- GLOBALS ---
+INSERT_LOGIN_EVENTS = insert(LoginEvents)
+
+# Partition maintenance (Postgres only)
+FIND_TABLE = text('SELECT to_regclass(:name)')
+DETACH_DEFAULT_PARTITION = text('ALTER TABLE auth.login_events DETACH PARTITION auth.login_events_default')
+ATTACH_DEFAULT_PARTITION = text('ALTER TABLE auth.login_events ATTACH PARTITION auth.login_events_default DEFAULT')
+MOVE_DEFAULT_EVENTS = text('WITH moved AS (DELETE FROM auth.login_events_default '
+                           'WHERE occurred_at >= :start AND occurred_at < :end RETURNING *) '
+                           'INSERT INTO auth.login_events SELECT * FROM moved')
+
+
+# --- CODE ---
+def month_start(moment: datetime, months_ahead: int = 0) -> datetime:
+    """
+    Get the first instant of a month.
+
+    :param moment: Any instant of the base month.
+    :param months_ahead: Months to move forward from the base month.
+
+    :returns: First instant of the month, in the timezone of 'moment'.
+    """
+    month_index = moment.year * 12 + moment.month - 1 + months_ahead
+    return moment.replace(year=month_index // 12, month=month_index % 12 + 1, day=1,
+                          hour=0, minute=0, second=0, microsecond=0)
+
+
+class LoginEventsRepository:
+    """
+    Repository responsible for operations related to the login_events table.
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        """
+        Initializes the storage.
+
+        :param engine: SQLAlchemy engine.
+
+        :returns: None.
+        """
+        self.__engine = engine
+
+
+    def insert_events(self, events: List[LoginEventRecord]) -> None:
+        """
+        Insert several login events in one multi-row insert and commit.
+
+        :param events: Login events.
+
+        :returns: None.
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__engine) as db:
+            try:
+                # Insert all events at once
+                db.session.execute(INSERT_LOGIN_EVENTS, [event._asdict() for event in events])
+
+                # Commit changes
+                db.session.commit()
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    def ensure_partitions(self, now: datetime, months_ahead: int) -> None:
+        """
+        Create the monthly partitions from the current month up to 'months_ahead' months later.
+
+        Events of months without a partition land in the default partition, and
+        Postgres refuses a new partition while the default holds rows in its
+        range. So each missing month is created with the default detached, its
+        rows are moved into the new partition, and the default is attached back,
+        all in one transaction (inserts wait on the table lock meanwhile).
+
+        :param now: Current instant (UTC).
+        :param months_ahead: Future months to create.
+
+        :returns: None.
+        """
+        # Partitions only exist on Postgres
+        if self.__engine.dialect.name != 'postgresql':
+            return
+
+        # Open database connection
+        with DbConnectionHandler(self.__engine) as db:
+            try:
+                for month in range(months_ahead + 1):
+                    start, end = month_start(now, month), month_start(now, month + 1)
+                    partition = f'auth.login_events_{start:y%Ym%m}'
+
+                    # If the month already exists: skip it
+                    if db.session.execute(FIND_TABLE, {'name': partition}).scalar() is not None:
+                        continue
+
+                    # Create the month with the default partition out of the way
+                    db.session.execute(DETACH_DEFAULT_PARTITION)
+                    db.session.execute(text(f'CREATE TABLE {partition} PARTITION OF auth.login_events '
+                                            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"))
+
+                    # Move the month's events out of the default partition, then attach it back
+                    db.session.execute(MOVE_DEFAULT_EVENTS, {'start': start, 'end': end})
+                    db.session.execute(ATTACH_DEFAULT_PARTITION)
+
+                # Commit changes
+                db.session.commit()
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
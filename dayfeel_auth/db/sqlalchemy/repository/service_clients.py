@@ -0,0 +1,140 @@
+"""
+Service clients table repository.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.models.service_clients import ServiceClients
+from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import DbConnectionHandler
+from dayfeel_auth.db.sqlalchemy.setup.retry import retry_transient_errors
+from dayfeel_auth.err.already_exists_error import AlreadyExistsError
+from dayfeel_auth.err.database_unavailable_error import DatabaseUnavailableError
+from dayfeel_auth.schemas.records.service_clients import ServiceClientRecord
+from sqlalchemy import Engine
+from sqlalchemy import bindparam
+from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+
+# --- TYPES ---
+from typing import Optional
+
+
+# --- GLOBALS ---
+# Columns loaded into a ServiceClientRecord
+SERVICE_CLIENT_RECORD_COLUMNS = (ServiceClients.id, ServiceClients.client_id, ServiceClients.secret_hash,
+                                 ServiceClients.name, ServiceClients.active)
+
+# Client lookup and activation statements
+SELECT_CLIENT_BY_CLIENT_ID = select(*SERVICE_CLIENT_RECORD_COLUMNS).where(
+    ServiceClients.client_id == bindparam('client_id'))
+UPDATE_CLIENT_ACTIVE = (
+    update(ServiceClients)
+    .where(ServiceClients.client_id == bindparam('service_client_id'))
+    .values(active=bindparam('client_active'))
+    .execution_options(synchronize_session=False)
+)
+
+
+# --- CODE ---
+class ServiceClientsRepository:
+    """
+    Repository responsible for operations related to the service clients table.
+
+    Lookups always go to the primary, so a deactivated client is refused at once.
+    """
+    def __init__(self, engine: Engine) -> None:
+        """
+        Initializes the storage.
+
+        :param engine: SQLAlchemy engine of the primary database.
+
+        :returns: None.
+        """
+        self.__engine = engine
+
+
+    def insert_client(self, client: ServiceClients) -> ServiceClients:
+        """
+        Insert a new service client to database.
+
+        :param client: Service client model instance.
+
+        :raises AlreadyExistsError: If the client id is taken.
+
+        :returns: Persisted client with updated fields.
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__engine) as db:
+            try:
+                # Insert client to database
+                db.session.add(client)
+
+                # Commit changes
+                db.session.commit()
+
+                # Refresh client instance
+                db.session.refresh(client)
+
+                # Return new client
+                return client
+
+            # If the client already exists: raise error
+            except IntegrityError as e:
+                raise AlreadyExistsError({'entity': 'service_client',
+                                          'local': 'database',
+                                          'detail': 'Service client already exists.'}) from e
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    @retry_transient_errors
+    def get_by_client_id(self, client_id: str) -> Optional[ServiceClientRecord]:
+        """
+        Retrieves a service client by its client id.
+
+        :param client_id: Public identifier of the client.
+
+        :returns: ServiceClientRecord or None if not found.
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__engine) as db:
+            try:
+                # Retrieves client columns by client id (unique index lookup)
+                row = db.session.execute(SELECT_CLIENT_BY_CLIENT_ID, {'client_id': client_id}).one_or_none()
+
+                # Returns ServiceClientRecord or None
+                return ServiceClientRecord(*row) if row else None
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    def set_active(self, client_id: str, active: bool) -> bool:
+        """
+        Enable or disable a service client.
+
+        :param client_id: Public identifier of the client.
+        :param active: Whether the client may get tokens.
+
+        :returns: True if the client exists.
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__engine) as db:
+            try:
+                # Update client in a single row update
+                result = db.session.execute(UPDATE_CLIENT_ACTIVE, {'service_client_id': client_id,
+                                                                    'client_active': active})
+
+                # Commit changes
+                db.session.commit()
+
+                # Return whether the client was found
+                return result.rowcount > 0
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
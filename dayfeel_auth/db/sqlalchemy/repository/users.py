@@ -6,31 +6,84 @@ Users table respository.
 from datetime import datetime
 from datetime import timezone
 from dayfeel_auth.db.sqlalchemy.models.users import Users
+from dayfeel_auth.db.sqlalchemy.setup import notifications
 from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import DbConnectionHandler
+from dayfeel_auth.db.sqlalchemy.setup.replica_set import ReplicaSet
+from dayfeel_auth.db.sqlalchemy.setup.retry import retry_transient_errors
+from dayfeel_auth.enums.user_role import UserRole
 from dayfeel_auth.err.already_exists_error import AlreadyExistsError
 from dayfeel_auth.err.database_unavailable_error import DatabaseUnavailableError
+from dayfeel_auth.schemas.records.users import UserRecord
+from dayfeel_auth.schemas.records.users import UserSummaryRecord
+from dayfeel_auth.utils.emails import normalize_email
 from sqlalchemy import Engine
+from sqlalchemy import bindparam
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy import tuple_
+from sqlalchemy import update
 from sqlalchemy.exc import IntegrityError
 
 
 # --- TYPES ---
+from typing import List
+from typing import Literal
 from typing import Optional
+from typing import Tuple
+
+
+# --- GLOBALS ---
+# Columns loaded into a UserRecord
+USER_RECORD_COLUMNS = (Users.id, Users.email, Users.password_hash, Users.name, Users.role, Users.token_version)
+
+# Columns loaded into a UserSummaryRecord
+USER_SUMMARY_COLUMNS = (Users.id, Users.email, Users.name, Users.role, Users.last_login, Users.created_at)
+
+# Hot statements are built once with bound parameters, so each call reuses the
+# same statement object and hits SQLAlchemy's compiled cache directly.
+SELECT_USER_BY_EMAIL = select(*USER_RECORD_COLUMNS).where(func.lower(Users.email) == bindparam('email'))
+SELECT_USER_BY_ID = select(*USER_RECORD_COLUMNS).where(Users.id == bindparam('user_id'))
+SELECT_EMAILS_AFTER_ID = (
+    select(Users.id, Users.email)
+    .where(Users.id > bindparam('after_id'))
+    .order_by(Users.id)
+    .limit(bindparam('limit'))
+)
+SELECT_TOKEN_VERSION = select(Users.token_version).where(Users.id == bindparam('user_id'))
+INCREMENT_TOKEN_VERSION = (
+    update(Users)
+    .where(Users.id == bindparam('user_id'))
+    .values(token_version=Users.token_version + 1)
+    .returning(Users.token_version)
+    .execution_options(synchronize_session=False)
+)
+UPDATE_LAST_LOGIN = (
+    update(Users)
+    .where(Users.id == bindparam('user_id'))
+    .values(last_login=bindparam('login_at'))
+    .execution_options(synchronize_session=False)
+)
 
 
 # --- CODE ---
 class UsersRepository:
     """
     Repository responsible for operations related to the users table.
+
+    Lag-tolerant lookups go to the read replicas when configured; writes and
+    token versions always go to the primary.
     """
-    def __init__(self, engine: Engine) -> None:
+    def __init__(self, engine: Engine, replicas: Optional[ReplicaSet] = None) -> None:
         """
         Initializes the storage.
 
-        :param engine: SQLAlchemy engine.
+        :param engine: SQLAlchemy engine of the primary database.
+        :param replicas: Read replicas for lookups, or None to read from the primary.
 
         :returns: None.
         """
         self.__engine = engine
+        self.__replicas = replicas
 
 
     def insert_user(self, user: Users) -> Users:
@@ -46,6 +99,10 @@ class UsersRepository:
             try:
                 # Insert user to database
                 db.session.add(user)
+                db.session.flush()
+
+                # Tell every worker about the new email
+                notifications.publish(db.session, notifications.USER_CREATED, user_id=user.id, email=user.email)
 
                 # Commit changes
                 db.session.commit()
@@ -67,44 +124,170 @@ class UsersRepository:
                 raise DatabaseUnavailableError(e) from e
 
 
-    def get_by_email(self, email: str) -> Optional[Users]:
+    @retry_transient_errors
+    def get_by_email(self, email: str, primary: bool = False) -> Optional[UserRecord]:
         """
-        Retrieves a user by email.
+        Retrieves a user by email, case-insensitively.
 
         :param email: email associete with user.
+        :param primary: Read from the primary instead of a replica.
 
-        :returns: User or None if not found.
+        :returns: UserRecord or None if not found.
         """
         # Open database connection
-        with DbConnectionHandler(self.__engine) as db:
+        with DbConnectionHandler(self.__reader(primary)) as db:
             try:
-                # Retrieves user by email from database
-                query = db.session.query(Users).filter(Users.email == email).one_or_none()
+                # Retrieves user columns by email from database (matches the lower(email) unique index)
+                row = db.session.execute(SELECT_USER_BY_EMAIL, {'email': normalize_email(email)}).one_or_none()
 
-                # Returns User ou None
-                return query
+                # Returns UserRecord ou None
+                return UserRecord(*row) if row else None
 
             # If database is unavailable: raise error
             except Exception as e:
                 raise DatabaseUnavailableError(e) from e
 
 
-    def get_by_id(self, user_id: int) -> Optional[Users]:
+    @retry_transient_errors
+    def get_by_id(self, user_id: int, primary: bool = False) -> Optional[UserRecord]:
         """
         Retrieves a user by id.
 
         :param user_id: Id associete by user.
+        :param primary: Read from the primary instead of a replica.
+
+        :returns: UserRecord or None if not found.
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__reader(primary)) as db:
+            try:
+                # Retrieves user columns by id from database
+                row = db.session.execute(SELECT_USER_BY_ID, {'user_id': user_id}).one_or_none()
+
+                # Returns UserRecord ou None
+                return UserRecord(*row) if row else None
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    @retry_transient_errors
+    def list_users(  # pylint: disable=R0913,R0917
+        self,
+        order_by: Literal['id', 'created_at'] = 'id',
+        after: Optional[Tuple] = None,
+        limit: int = 50,
+        role: Optional[UserRole] = None,
+        last_login_from: Optional[datetime] = None,
+        last_login_to: Optional[datetime] = None
+    ) -> List[UserSummaryRecord]:
+        """
+        Retrieves one page of users with keyset pagination.
+
+        Pages start right after the sort key of the previous page's last row,
+        so every page is an index range scan costing the same as the first.
+
+        :param order_by: Sort key, 'id' or 'created_at' (ties broken by id).
+        :param after: Sort key of the previous page's last row: (id,) or (created_at, id); None for the first page.
+        :param limit: Maximum number of users returned.
+        :param role: Only users with this role.
+        :param last_login_from: Only users who last logged in at or after this time.
+        :param last_login_to: Only users who last logged in before this time.
 
-        :returns: User or None if not found.
+        :returns: List of UserSummaryRecord.
         """
+        # Build sort key
+        sort_key = (Users.id,) if order_by == 'id' else (Users.created_at, Users.id)
+
+        # Build query
+        statement = select(*USER_SUMMARY_COLUMNS).order_by(*sort_key).limit(limit)
+        if after is not None:
+            statement = statement.where(tuple_(*sort_key) > tuple_(*after))
+        if role is not None:
+            statement = statement.where(Users.role == role)
+        if last_login_from is not None:
+            statement = statement.where(Users.last_login >= last_login_from)
+        if last_login_to is not None:
+            statement = statement.where(Users.last_login < last_login_to)
+
         # Open database connection
+        with DbConnectionHandler(self.__reader(False)) as db:
+            try:
+                # Retrieves page of users from database
+                return [UserSummaryRecord(*row) for row in db.session.execute(statement)]
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    @retry_transient_errors
+    def get_emails_after(self, after_id: int, limit: int) -> List[Tuple[int, str]]:
+        """
+        Retrieves the emails of the users following an id, in id order.
+
+        :param after_id: Id of the last user already read (0 for the first page).
+        :param limit: Maximum number of users returned.
+
+        :returns: List of (id, email).
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__reader(False)) as db:
+            try:
+                # Retrieves one primary key range of emails from database
+                return [tuple(row) for row in db.session.execute(SELECT_EMAILS_AFTER_ID,
+                                                                 {'after_id': after_id, 'limit': limit})]
+
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    @retry_transient_errors
+    def get_token_version(self, user_id: int) -> Optional[int]:
+        """
+        Retrieves the current token version of a user.
+
+        :param user_id: User's unique identificator.
+
+        :returns: Token version or None if user not found.
+        """
+        # Open database connection (primary only: a lagging replica would accept revoked tokens)
         with DbConnectionHandler(self.__engine) as db:
             try:
-                # Retrieves user by id from database
-                query = db.session.query(Users).filter(Users.id == user_id).one_or_none()
+                # Retrieves token version by user id from database
+                return db.session.execute(SELECT_TOKEN_VERSION, {'user_id': user_id}).scalar_one_or_none()
 
-                # Returns User ou None
-                return query
+            # If database is unavailable: raise error
+            except Exception as e:
+                raise DatabaseUnavailableError(e) from e
+
+
+    def increment_token_version(self, user_id: int) -> Optional[int]:
+        """
+        Increment the token version of a user, revoking every token issued before.
+
+        :param user_id: User's unique identificator.
+
+        :returns: New token version or None if user not found.
+        """
+        # Open database connection
+        with DbConnectionHandler(self.__engine) as db:
+            try:
+                # Increment token version in a single row update
+                token_version = db.session.execute(INCREMENT_TOKEN_VERSION, {'user_id': user_id}).scalar_one_or_none()
+
+                # Tell every worker to drop its cached version
+                if token_version is not None:
+                    notifications.publish(db.session, notifications.USER_TOKENS_REVOKED, user_id=user_id,
+                                          token_version=token_version)
+
+                # Commit changes
+                db.session.commit()
+
+                # Return new token version
+                return token_version
 
             # If database is unavailable: raise error
             except Exception as e:
@@ -123,12 +306,7 @@ class UsersRepository:
         with DbConnectionHandler(self.__engine) as db:
             try:
                 # Update last_login field of the user
-                db.session.query(Users).filter(
-                    Users.id == user_id
-                ).update(
-                    {Users.last_login: datetime.now(timezone.utc)},
-                    synchronize_session=False
-                )
+                db.session.execute(UPDATE_LAST_LOGIN, {'user_id': user_id, 'login_at': datetime.now(timezone.utc)})
 
                 # Commit changes
                 db.session.commit()
@@ -136,3 +314,18 @@ class UsersRepository:
             # If database is unavailable: raise error
             except Exception as e:
                 raise DatabaseUnavailableError(e) from e
+
+
+# --- Private helpers ---
+    def __reader(self, primary: bool) -> Engine:
+        """
+        Pick the engine for a read.
+
+        :param primary: Force the primary.
+
+        :returns: Primary engine or the next healthy replica.
+        """
+        if primary or self.__replicas is None:
+            return self.__engine
+
+        return self.__replicas.reader()
@@ -0,0 +1,186 @@
+"""
+Database circuit breaker.
+
+Tracks the outcome of the last database calls made through DbConnectionHandler.
+When the share of transient failures crosses a threshold, the circuit opens
+and calls fail immediately with CircuitOpenError (503) instead of waiting on
+connection timeouts. After a cool-down, a single probe call is let through
+(half-open): its success closes the circuit, its failure opens it again. Calls
+let through before the circuit opened may still finish afterwards; their
+outcomes are ignored, so only the probe decides.
+"""
+
+# --- IMPORTS ---
+from collections import deque
+from dayfeel_auth.err.circuit_open_error import CircuitOpenError
+from sqlalchemy import Engine
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+import time
+
+
+# --- TYPES ---
+from typing import Deque
+from typing import Literal
+from typing import Optional
+
+
+# --- GLOBALS ---
+CircuitState = Literal['closed', 'open', 'half_open']
+
+# Engine -> its circuit breaker (engines without one are never short-circuited)
+CIRCUIT_BREAKERS: 'WeakKeyDictionary[Engine, CircuitBreaker]' = WeakKeyDictionary()
+
+
+# --- CODE ---
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding window of calls.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, window_size: int = 20, min_calls: int = 10,
+                 open_sec: float = 5.0) -> None:
+        """
+        Initializes the breaker, closed.
+
+        :param failure_rate: Share of failed calls in the window that opens the circuit.
+        :param window_size: Number of most recent calls considered.
+        :param min_calls: Calls needed in the window before the circuit may open.
+        :param open_sec: Seconds the circuit stays open before letting a probe through.
+
+        :returns: None.
+        """
+        self.__failure_rate = failure_rate
+        self.__min_calls = min_calls
+        self.__open_sec = open_sec
+
+        # Outcomes of the last calls (True = failed)
+        self.__outcomes: Deque[bool] = deque(maxlen=window_size)
+        self.__state: CircuitState = 'closed'
+        self.__opened_at = 0.0
+        self.__probing = False
+        self.__lock = Lock()
+
+
+    @property
+    def state(self) -> CircuitState:
+        """
+        Current circuit state.
+        """
+        # An open circuit whose cool-down is over lets the next call probe
+        if self.__state == 'open' and time.monotonic() - self.__opened_at >= self.__open_sec:
+            return 'half_open'
+
+        return self.__state
+
+
+    def before_call(self) -> bool:
+        """
+        Let a call through, or fail it right away.
+
+        :raises CircuitOpenError: If the circuit is open, or half-open with a probe already running.
+
+        :returns: Whether the call is the half-open probe (to pass back with its outcome).
+        """
+        with self.__lock:
+
+            # If circuit is closed: let the call through
+            state = self.state
+            if state == 'closed':
+                return False
+
+            # If cool-down is over and nobody is probing: this call is the probe
+            if state == 'half_open' and not self.__probing:
+                self.__state = 'half_open'
+                self.__probing = True
+                return True
+
+        raise CircuitOpenError({'state': state, 'detail': 'Database circuit is open, failing fast.'})
+
+
+    def record_success(self, probe: bool = False) -> None:
+        """
+        Record a call that reached the database.
+
+        :param probe: Whether the call was the half-open probe, as returned by before_call.
+
+        :returns: None.
+        """
+        with self.__lock:
+
+            # If a call let through before the circuit opened finished late: ignore it
+            if self.__state != 'closed' and not probe:
+                return
+
+            # If the probe succeeded: close the circuit with a fresh window
+            if self.__state == 'half_open':
+                self.__state = 'closed'
+                self.__probing = False
+                self.__outcomes.clear()
+                return
+
+            self.__outcomes.append(False)
+
+
+    def record_failure(self, probe: bool = False) -> None:
+        """
+        Record a call that failed with a transient database error.
+
+        :param probe: Whether the call was the half-open probe, as returned by before_call.
+
+        :returns: None.
+        """
+        with self.__lock:
+
+            # If a call let through before the circuit opened finished late: ignore it
+            if self.__state != 'closed' and not probe:
+                return
+
+            # If the probe failed: open the circuit again
+            if self.__state == 'half_open':
+                self.__open()
+                return
+
+            self.__outcomes.append(True)
+
+            # If failure rate crossed the threshold: open the circuit
+            if (len(self.__outcomes) >= self.__min_calls
+                    and sum(self.__outcomes) / len(self.__outcomes) >= self.__failure_rate):
+                self.__open()
+
+
+# --- Private helpers ---
+    def __open(self) -> None:
+        """
+        Open the circuit, starting the cool-down. Caller holds the lock.
+
+        :returns: None.
+        """
+        self.__state = 'open'
+        self.__opened_at = time.monotonic()
+        self.__probing = False
+        self.__outcomes.clear()
+
+
+def attach_circuit_breaker(engine: Engine, breaker: CircuitBreaker) -> None:
+    """
+    Guard every DbConnectionHandler session on an engine with a circuit breaker.
+
+    :param engine: SQLAlchemy engine.
+    :param breaker: Breaker to attach.
+
+    :returns: None.
+    """
+    CIRCUIT_BREAKERS[engine] = breaker
+
+
+def get_circuit_breaker(engine: Engine) -> Optional[CircuitBreaker]:
+    """
+    Get the circuit breaker attached to an engine.
+
+    :param engine: SQLAlchemy engine.
+
+    :returns: Attached breaker, or None.
+    """
+    return CIRCUIT_BREAKERS.get(engine)
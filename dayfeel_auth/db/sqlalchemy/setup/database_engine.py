@@ -11,14 +11,18 @@ from sqlalchemy import Engine
 
 
 # -- CODE ---
-def create_database_engine(url: str) -> Engine:
+def create_database_engine(url: str, pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 30.0) -> Engine:
     """
     Creates the SQLAlchemy engine used for database connections.
 
     :param url: Database connection string.
+    :param pool_size: Number of connections kept open in the pool.
+    :param max_overflow: Extra connections allowed beyond pool_size under load.
+    :param pool_timeout: Seconds to wait for a free pooled connection before failing.
 
     :returns: Configured Engine instance.
     """
-    engine = create_engine(url=url, echo=False, future=True)
+    engine = create_engine(url=url, echo=False, future=True,
+                           pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
 
     return engine
@@ -3,8 +3,17 @@ Database Connection Handler.
 """
 
 # --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.setup.circuit_breaker import get_circuit_breaker
+from dayfeel_auth.db.sqlalchemy.setup.retry import is_transient_error
+from dayfeel_auth.err.deadline_exceeded_error import DeadlineExceededError
+from dayfeel_auth.utils.deadlines import remaining_sec
+from functools import lru_cache
+from sqlalchemy import Connection
 from sqlalchemy import Engine
+from sqlalchemy import event
+from sqlalchemy import text
 from sqlalchemy.orm import Session
+from sqlalchemy.orm import SessionTransaction
 from sqlalchemy.orm import sessionmaker
 
 
@@ -14,7 +23,63 @@ from typing import Optional
 from typing import Type
 
 
+# --- GLOBALS ---
+# Bounds every statement and lock wait of a transaction (transaction-local settings)
+SET_TIMEOUTS = text("SELECT set_config('statement_timeout', :timeout, true), "
+                    "set_config('lock_timeout', :timeout, true)")
+
+
 # --- CODE ---
+def apply_request_deadline(
+    session: Session,  # pylint: disable=W0613
+    transaction: SessionTransaction,  # pylint: disable=W0613
+    connection: Connection
+) -> None:
+    """
+    Bound a new Postgres transaction by the time left before the request deadline.
+
+    :param session: Session beginning the transaction.
+    :param transaction: New session transaction.
+    :param connection: Connection the transaction runs on.
+
+    :raises DeadlineExceededError: If the deadline has already passed.
+
+    :returns: None.
+    """
+    # Get time left (outside requests, or on other databases: no timeout)
+    remaining = remaining_sec()
+    if remaining is None or connection.dialect.name != 'postgresql':
+        return
+
+    # If the deadline passed while waiting for a connection: give up
+    if remaining <= 0:
+        raise DeadlineExceededError({'detail': 'Request deadline exceeded before the query started.'})
+
+    # Apply time left as statement and lock timeouts
+    connection.execute(SET_TIMEOUTS, {'timeout': f'{max(1, int(remaining * 1000))}ms'})
+
+
+@lru_cache(maxsize=None)
+def create_session_maker(engine: Engine) -> sessionmaker:
+    """
+    Creates and returns a sessionmaker instance, built once per engine.
+
+    :param engine: The SQLAlchemy engine instance.
+
+    :returns:  Configured sessionmaker.
+    """
+    session_maker = sessionmaker(
+        bind=engine,
+        class_=Session,
+        expire_on_commit=False,
+    )
+
+    # Apply request deadlines to every transaction
+    event.listen(session_maker, 'after_begin', apply_request_deadline)
+
+    return session_maker
+
+
 class DbConnectionHandler:
     """
     Handler for database connection using SQLAlchemy.
@@ -26,9 +91,13 @@ class DbConnectionHandler:
 
         self.__engine: The SQLAlchemy engine instance.
         self.__session: Holds the current active session object.
+        self.__breaker: Circuit breaker guarding the engine, if any.
+        self.__probe: Whether this session is the breaker's half-open probe.
         """
         self.__engine = engine
         self.__session = None
+        self.__breaker = get_circuit_breaker(engine)
+        self.__probe = False
 
 
 # --- Context management methods ---
@@ -36,13 +105,25 @@ class DbConnectionHandler:
         """
         Enters the context of the handler, opening a new session.
 
+        :raises DeadlineExceededError: If the request deadline has passed.
+        :raises CircuitOpenError: If the engine's circuit breaker is open.
+
         :returns: The handler itself, with an active session.
 
         Usage:
             with DbConnectionHandler(engine) as db:
                 # db.session can now be used
         """
-        session_maker = self.__create_session_maker()
+        # Fail fast once the request is out of time
+        remaining = remaining_sec()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceededError({'detail': 'Request deadline exceeded before opening a session.'})
+
+        # Fail fast while the database is known to be down
+        if self.__breaker is not None:
+            self.__probe = self.__breaker.before_call()
+
+        session_maker = create_session_maker(self.__engine)
         self.__session = session_maker()
         return self
 
@@ -58,6 +139,8 @@ class DbConnectionHandler:
 
         If an exception occurs, it rolls back the session and then closes it.
         If no exception occurs, it simply closes the session.
+        The outcome is reported to the circuit breaker: only transient database
+        errors count as failures.
 
         :param exc_type: Type of the exception raised, if any.
         :param exc_val: Value of the exception raised, if any.
@@ -69,6 +152,13 @@ class DbConnectionHandler:
         finally:
             self.session.close()
 
+            # Report outcome to the circuit breaker
+            if self.__breaker is not None:
+                if exc_val is not None and is_transient_error(exc_val):
+                    self.__breaker.record_failure(probe=self.__probe)
+                else:
+                    self.__breaker.record_success(probe=self.__probe)
+
 
 # --- Public properties ---
     @property
@@ -81,17 +171,3 @@ class DbConnectionHandler:
         if self.__session is None:
             raise RuntimeError('Session is not open.')
         return self.__session
-
-
-# --- Private helpers ---
-    def __create_session_maker(self) -> sessionmaker:
-        """
-        Creates and returns a sessionmaker instance.
-
-        :returns:  Configured sessionmaker.
-        """
-        return sessionmaker(
-            bind=self.__engine,
-            class_=Session,
-            expire_on_commit=False,
-        )
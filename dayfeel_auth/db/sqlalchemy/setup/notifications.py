@@ -0,0 +1,42 @@
+"""
+Cache invalidation events published through Postgres NOTIFY.
+
+Repositories publish an event inside the transaction that makes the change,
+so Postgres delivers it to every listening worker when, and only if, the
+transaction commits, in commit order. Payloads are small JSON objects:
+{"event": "<name>", ...fields}.
+"""
+
+# --- IMPORTS ---
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import json
+
+
+# --- GLOBALS ---
+# Channel every worker listens on
+CHANNEL = 'dayfeel_auth_invalidation'
+
+# Events
+USER_CREATED = 'user_created'
+USER_TOKENS_REVOKED = 'user_tokens_revoked'
+
+NOTIFY = text('SELECT pg_notify(:channel, :payload)')
+
+
+# --- CODE ---
+def publish(session: Session, event: str, **fields: object) -> None:
+    """
+    Queue a cache invalidation event, sent when the session's transaction commits.
+
+    Only Postgres has a notification channel; on other databases nothing is sent.
+
+    :param session: Session running the transaction that makes the change.
+    :param event: Event name.
+    :param fields: JSON-serializable event fields.
+
+    :returns: None.
+    """
+    if session.get_bind().dialect.name == 'postgresql':
+        session.execute(NOTIFY, {'channel': CHANNEL, 'payload': json.dumps({'event': event, **fields})})
@@ -0,0 +1,284 @@
+"""
+Online schema migration helpers.
+
+Plain Alembic operations take ACCESS EXCLUSIVE or SHARE locks for as long as
+they run, and a lock request queued behind a long transaction blocks every
+query behind it too. On a production-sized table that stalls logins. These
+helpers are called from migration 'upgrade()' functions and follow the rules
+used for the tables of this service:
+
+- indexes are built and dropped CONCURRENTLY (invalid leftovers of a failed
+  build are dropped first);
+- every DDL statement runs in its own short transaction with a lock_timeout,
+  retried a few times instead of queueing indefinitely;
+- columns are added nullable or with a constant default (catalog-only on
+  Postgres 11+), then backfilled in throttled batches of short transactions;
+- NOT NULL is proved by a validated CHECK constraint, so SET NOT NULL does not
+  scan the table under an exclusive lock.
+
+Each helper commits the migration transaction so far, so a migration that
+fails halfway is rerun on top of its own committed steps: every helper is
+idempotent, and operations that must be atomic together are run with
+'run_with_lock_timeout(..., atomic=True)'.
+"""
+
+# --- IMPORTS ---
+# 'op' is a proxy bound to the running migration, its members only exist at run time
+# pylint: disable=E1101
+from alembic import op
+from sqlalchemy import Column
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import logging
+import time
+
+
+# --- TYPES ---
+from typing import Callable
+from typing import Optional
+
+
+# --- GLOBALS ---
+# Longest a DDL statement may wait for its lock before it gives up and is retried
+LOCK_TIMEOUT = '5s'
+
+# Attempts per DDL statement, and pause between them
+LOCK_ATTEMPTS = 5
+LOCK_RETRY_SLEEP_SEC = 2.0
+
+# SQLSTATE raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = '55P03'
+
+# Backfill defaults: keys per transaction, and pause between transactions
+BACKFILL_BATCH_SIZE = 10_000
+BACKFILL_PAUSE_SEC = 0.05
+
+LOGGER = logging.getLogger('alembic.online_migrations')
+
+
+# --- CODE ---
+def run_with_lock_timeout(operation: Callable[[], None], lock_timeout: str = LOCK_TIMEOUT,
+                          attempts: int = LOCK_ATTEMPTS, atomic: bool = False) -> None:
+    """
+    Run a DDL operation outside the migration transaction, retrying when its lock is not granted in time.
+
+    Without 'atomic', every statement of the operation commits on its own
+    (as CONCURRENTLY statements require), so the operation must be safe to
+    run again after a partial failure.
+
+    :param operation: Function emitting DDL through 'op'.
+    :param lock_timeout: Longest wait for each lock, as a Postgres interval.
+    :param attempts: Tries before giving up.
+    :param atomic: Whether the statements of the operation commit together, or not at all.
+
+    :raises OperationalError: If the lock was never granted, or the statement failed otherwise.
+
+    :returns: None.
+    """
+    with op.get_context().autocommit_block():
+        op.execute(f"SET lock_timeout = '{lock_timeout}'")
+        try:
+            for attempt in range(1, attempts + 1):
+                try:
+                    if atomic:
+                        op.execute('BEGIN')
+
+                    # Whatever fails, commit none of an atomic operation
+                    try:
+                        operation()
+                    except Exception:
+                        if atomic:
+                            op.execute('ROLLBACK')
+                        raise
+
+                    if atomic:
+                        op.execute('COMMIT')
+                    return
+
+                # If the lock was not granted in time: let waiting queries through, then retry
+                except OperationalError as e:
+                    if getattr(e.orig, 'pgcode', None) != LOCK_NOT_AVAILABLE or attempt == attempts:
+                        raise
+                    LOGGER.warning('Lock not granted within %s (attempt %d/%d), retrying',
+                                   lock_timeout, attempt, attempts)
+                    time.sleep(LOCK_RETRY_SLEEP_SEC)
+
+        finally:
+            op.execute('RESET lock_timeout')
+
+
+def create_index_concurrently(name: str, table: str, expressions: str, schema: str = 'auth',  # pylint: disable=R0913,R0917
+                              unique: bool = False, where: Optional[str] = None) -> None:
+    """
+    Build an index without blocking writes.
+
+    An invalid index left by an earlier failed build is dropped and built
+    again, so a failed migration can be rerun.
+
+    :param name: Index name.
+    :param table: Table name.
+    :param expressions: Indexed columns or expressions, e.g. 'user_id, created_at' or 'lower(email)'.
+    :param schema: Schema of the table.
+    :param unique: Whether the index is unique.
+    :param where: Predicate of a partial index.
+
+    :raises RuntimeError: If the index is still invalid after its build.
+
+    :returns: None.
+    """
+    def build() -> None:
+
+        # A failed concurrent build leaves an invalid index behind that IF NOT EXISTS would keep
+        if is_invalid_index(name, schema):
+            LOGGER.warning('Dropping invalid index %s.%s left by an earlier build', schema, name)
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema}.{name}')
+
+        # Build index
+        op.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                   f'ON {schema}.{table} ({expressions}){f" WHERE {where}" if where else ""}')
+
+    run_with_lock_timeout(build)
+
+    # Callers rely on the index (e.g. to replace a constraint), so never return with an unusable one
+    if is_invalid_index(name, schema):
+        raise RuntimeError(f'Index {schema}.{name} is invalid after its build')
+
+
+def drop_index_concurrently(name: str, schema: str = 'auth') -> None:
+    """
+    Drop an index without blocking reads or writes.
+
+    :param name: Index name.
+    :param schema: Schema of the index.
+
+    :returns: None.
+    """
+    run_with_lock_timeout(lambda: op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema}.{name}'))
+
+
+def is_invalid_index(name: str, schema: str = 'auth') -> bool:
+    """
+    Tell whether an index was left invalid by an interrupted concurrent build.
+
+    :param name: Index name.
+    :param schema: Schema of the index.
+
+    :returns: True if the index exists and is invalid.
+    """
+    return op.get_bind().execute(text('''
+        SELECT 1 FROM pg_index
+        JOIN pg_class ON pg_class.oid = pg_index.indexrelid
+        JOIN pg_namespace ON pg_namespace.oid = pg_class.relnamespace
+        WHERE pg_class.relname = :name AND pg_namespace.nspname = :schema AND NOT pg_index.indisvalid
+    '''), {'name': name, 'schema': schema}).first() is not None
+
+
+def get_column_type(table: str, column: str, schema: str = 'auth') -> Optional[str]:
+    """
+    Get the type of a column, e.g. to tell which steps of a rerun migration are already done.
+
+    :param table: Table name.
+    :param column: Column name.
+    :param schema: Schema of the table.
+
+    :returns: Type name as in information_schema (e.g. 'uuid'), or None if there is no such column.
+    """
+    return op.get_bind().execute(text('''
+        SELECT data_type FROM information_schema.columns
+        WHERE table_schema = :schema AND table_name = :table AND column_name = :column
+    '''), {'schema': schema, 'table': table, 'column': column}).scalar()
+
+
+def add_column(table: str, column: Column, schema: str = 'auth') -> None:
+    """
+    Add a column without rewriting the table.
+
+    The column must be nullable or have a constant server default (no now(),
+    random() or other volatile default): Postgres 11+ then only updates the
+    catalog and the exclusive lock is held for milliseconds. An existing
+    column of the same name is left as is.
+
+    :param table: Table name.
+    :param column: Column to add.
+    :param schema: Schema of the table.
+
+    :raises ValueError: If the column is NOT NULL without a server default.
+
+    :returns: None.
+    """
+    # NOT NULL without a default cannot be added to a non-empty table
+    if not column.nullable and column.server_default is None:
+        raise ValueError(f'Column {column.name} must be nullable or have a constant server default')
+
+    run_with_lock_timeout(lambda: op.add_column(table, column, schema=schema, if_not_exists=True))
+
+
+def backfill_in_batches(table: str, assignments: str, where: str = 'TRUE', schema: str = 'auth',  # pylint: disable=R0913,R0917
+                        key: str = 'id', batch_size: int = BACKFILL_BATCH_SIZE,
+                        pause_sec: float = BACKFILL_PAUSE_SEC) -> int:
+    """
+    Update every matching row in short transactions over ranges of an integer key.
+
+    Each batch locks at most 'batch_size' rows for one short transaction, and
+    the pause between batches leaves room for regular traffic, vacuum and
+    replication to keep up.
+
+    :param table: Table name.
+    :param assignments: SET clause, e.g. 'jti_uuid = jti::uuid'.
+    :param where: Rows to update, e.g. 'jti_uuid IS NULL'.
+    :param schema: Schema of the table.
+    :param key: Indexed integer column batches are ranged over.
+    :param batch_size: Keys per batch.
+    :param pause_sec: Seconds slept between batches.
+
+    :returns: Number of rows updated.
+    """
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+
+        # Get key range
+        low, high = bind.execute(text(f'SELECT min({key}), max({key}) FROM {schema}.{table}')).one()
+        if low is None:
+            return 0
+
+        # Update one key range per transaction
+        updated = 0
+        statement = text(f'UPDATE {schema}.{table} SET {assignments} '
+                         f'WHERE {key} >= :low AND {key} < :high AND ({where})')
+        for start in range(low, high + 1, batch_size):
+            updated += bind.execute(statement, {'low': start, 'high': start + batch_size}).rowcount
+
+            # Report progress and throttle
+            if (start - low) // batch_size % 100 == 99:
+                LOGGER.info('Backfilled %s.%s up to %s=%d of %d', schema, table, key, start + batch_size - 1, high)
+            time.sleep(pause_sec)
+
+    return updated
+
+
+def set_not_null(table: str, column: str, schema: str = 'auth') -> None:
+    """
+    Mark a backfilled column NOT NULL without scanning the table under an exclusive lock.
+
+    A CHECK constraint is added NOT VALID (catalog-only), validated under a
+    lock that allows reads and writes, and then lets SET NOT NULL skip its scan.
+
+    :param table: Table name.
+    :param column: Column name.
+    :param schema: Schema of the table.
+
+    :returns: None.
+    """
+    constraint = f'{table}_{column}_not_null'
+
+    # Replace the constraint a failed earlier run may have left (possibly not validated)
+    def add_constraint() -> None:
+        op.execute(f'ALTER TABLE {schema}.{table} DROP CONSTRAINT IF EXISTS {constraint}')
+        op.execute(f'ALTER TABLE {schema}.{table} ADD CONSTRAINT {constraint} '
+                   f'CHECK ({column} IS NOT NULL) NOT VALID')
+
+    run_with_lock_timeout(add_constraint, atomic=True)
+    run_with_lock_timeout(lambda: op.execute(f'ALTER TABLE {schema}.{table} VALIDATE CONSTRAINT {constraint}'))
+    run_with_lock_timeout(lambda: op.execute(f'ALTER TABLE {schema}.{table} ALTER COLUMN {column} SET NOT NULL'))
+    run_with_lock_timeout(lambda: op.execute(f'ALTER TABLE {schema}.{table} DROP CONSTRAINT IF EXISTS {constraint}'))
@@ -0,0 +1,133 @@
+"""
+Read replica routing.
+
+Pure reads that tolerate replication lag are spread over the configured
+replicas in round-robin order. A replica whose connection fails is taken out of
+rotation for a cool-down period and then retried on the next pick, so a dead
+replica costs one failed request instead of one per rotation. When no replica
+is available, reads fall back to the primary.
+"""
+
+# --- IMPORTS ---
+from itertools import count
+from sqlalchemy import Engine
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from threading import Lock
+
+import time
+
+
+# --- TYPES ---
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+
+
+# --- CODE ---
+class ReplicaSet:
+    """
+    Round-robin, health-aware selection of read replica engines.
+    """
+
+    def __init__(self, primary: Engine, replicas: Sequence[Engine], retry_interval_sec: float = 30.0) -> None:
+        """
+        Initializes the replica set.
+
+        :param primary: Engine used for writes, and for reads when no replica is available.
+        :param replicas: Read replica engines.
+        :param retry_interval_sec: Seconds a failed replica stays out of rotation.
+
+        :returns: None.
+        """
+        self.__primary = primary
+        self.__replicas: List[Engine] = list(replicas)
+        self.__retry_interval_sec = retry_interval_sec
+        self.__counter = count()
+
+        # Replica index -> monotonic time it may be used again
+        self.__down_until: Dict[int, float] = {}
+        self.__lock = Lock()
+
+        # Take a replica out of rotation as soon as one of its connections fails
+        for index, replica in enumerate(self.__replicas):
+            event.listen(replica, 'handle_error', self.__on_error(index))
+
+
+    @property
+    def primary(self) -> Engine:
+        """
+        Engine used for writes and read-after-write sensitive lookups.
+        """
+        return self.__primary
+
+
+    @property
+    def replicas(self) -> List[Engine]:
+        """
+        Every configured read replica engine.
+        """
+        return list(self.__replicas)
+
+
+    @property
+    def healthy_count(self) -> int:
+        """
+        Number of replicas currently in rotation.
+        """
+        now = time.monotonic()
+        return sum(1 for index in range(len(self.__replicas)) if self.__down_until.get(index, 0.0) <= now)
+
+
+    def reader(self) -> Engine:
+        """
+        Pick the engine for a lag-tolerant read.
+
+        :returns: Next healthy replica, or the primary if there is none.
+        """
+        # If no replica is configured: read from primary
+        if not self.__replicas:
+            return self.__primary
+
+        # Try each replica once, starting from the next one in rotation
+        now = time.monotonic()
+        start = next(self.__counter)
+        for offset in range(len(self.__replicas)):
+            index = (start + offset) % len(self.__replicas)
+            if self.__down_until.get(index, 0.0) <= now:
+                return self.__replicas[index]
+
+        # If every replica is down: read from primary
+        return self.__primary
+
+
+    def dispose(self) -> None:
+        """
+        Close every pooled replica connection.
+
+        :returns: None.
+        """
+        for replica in self.__replicas:
+            replica.dispose()
+
+
+# --- Private helpers ---
+    def __on_error(self, index: int) -> Callable[[ExceptionContext], None]:
+        """
+        Build the 'handle_error' listener of one replica.
+
+        :param index: Replica index.
+
+        :returns: Listener marking the replica down on connection errors.
+        """
+        def listener(context: ExceptionContext) -> None:
+            # Statement errors (bad SQL, constraint violations) say nothing about replica health
+            if not context.is_disconnect and context.connection is not None:
+                return
+
+            # Take replica out of rotation
+            with self.__lock:
+                self.__down_until[index] = time.monotonic() + self.__retry_interval_sec
+
+        return listener
@@ -0,0 +1,139 @@
+"""
+Transient database error classification and retry.
+
+Transient errors (dropped connections, failover, deadlocks, serialization
+failures, connection limits) may succeed when tried again and count against
+the circuit breaker. Permanent errors (constraint violations, bad SQL, bad
+data) fail the same way every time and prove the database is reachable.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.err.circuit_open_error import CircuitOpenError
+from dayfeel_auth.err.deadline_exceeded_error import DeadlineExceededError
+from dayfeel_auth.utils.deadlines import remaining_sec
+from functools import wraps
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.exc import InterfaceError
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+import random
+import time
+
+
+# --- TYPES ---
+from typing import Callable
+from typing import Optional
+from typing import TypeVar
+
+
+# --- GLOBALS ---
+T = TypeVar('T')
+
+# Postgres SQLSTATE codes worth retrying (class 08 is matched by prefix)
+TRANSIENT_SQLSTATES = frozenset({
+    '40001',  # serialization_failure
+    '40P01',  # deadlock_detected
+    '53300',  # too_many_connections
+    '57P01',  # admin_shutdown
+    '57P02',  # crash_shutdown
+    '57P03',  # cannot_connect_now
+})
+
+# Attempts per read, including the first one
+RETRY_ATTEMPTS = 3
+
+# Full jitter backoff: sleep a random time up to base * 2^attempt, capped
+RETRY_BASE_DELAY_SEC = 0.02
+RETRY_MAX_DELAY_SEC = 0.2
+
+
+# --- CODE ---
+def root_database_error(error: BaseException) -> Optional[BaseException]:
+    """
+    Find the SQLAlchemy error behind an exception, following its causes.
+
+    :param error: Raised exception, possibly a DatabaseUnavailableError wrapping the original.
+
+    :returns: The first SQLAlchemy/DBAPI error found, or None.
+    """
+    while error is not None:
+        if isinstance(error, (DBAPIError, DisconnectionError, PoolTimeoutError)):
+            return error
+        error = error.__cause__
+
+    return None
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Tell whether a database error may succeed when tried again.
+
+    :param error: Raised exception.
+
+    :returns: True for transient errors, False for permanent or non-database errors.
+    """
+    # Get database error
+    cause = root_database_error(error)
+
+    # Connection dropped or pool exhausted: transient
+    if isinstance(cause, (DisconnectionError, PoolTimeoutError)):
+        return True
+
+    # If not a driver error: permanent
+    if not isinstance(cause, DBAPIError):
+        return False
+
+    # Connection invalidated by SQLAlchemy: transient
+    if cause.connection_invalidated:
+        return True
+
+    # Get SQLSTATE, absent when the error never reached the server
+    sqlstate = getattr(cause.orig, 'pgcode', None) or ''
+
+    # Client-side connection failure (refused, reset, closed): transient
+    if not sqlstate and isinstance(cause, (OperationalError, InterfaceError)):
+        return True
+
+    # Classify by SQLSTATE
+    return sqlstate.startswith('08') or sqlstate in TRANSIENT_SQLSTATES
+
+
+def retry_transient_errors(function: Callable[..., T]) -> Callable[..., T]:
+    """
+    Retry an idempotent read on transient database errors, with jittered backoff.
+
+    Open circuits and pool timeouts are not retried: waiting again would only
+    add load to a database that is already failing or saturated. Nor are
+    retries attempted when the backoff would outlast the request deadline.
+
+    :param function: Repository read method.
+
+    :returns: Wrapped method.
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs) -> T:
+        for attempt in range(RETRY_ATTEMPTS - 1):
+            try:
+                return function(*args, **kwargs)
+
+            # If error is worth retrying: back off and try again
+            except Exception as e:  # pylint: disable=W0718
+                if (isinstance(e, (CircuitOpenError, DeadlineExceededError))
+                        or isinstance(root_database_error(e), PoolTimeoutError)
+                        or not is_transient_error(e)):
+                    raise
+
+                # If backing off would outlast the request deadline: give up now
+                delay = random.uniform(0, min(RETRY_MAX_DELAY_SEC, RETRY_BASE_DELAY_SEC * 2 ** attempt))
+                remaining = remaining_sec()
+                if remaining is not None and remaining <= delay:
+                    raise
+
+                time.sleep(delay)
+
+        # Last attempt: let any error through
+        return function(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,16 @@
+"""
+Circuit Open Error.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.err.database_unavailable_error import DatabaseUnavailableError
+
+
+# --- CODE ---
+class CircuitOpenError(DatabaseUnavailableError):
+    """
+    Circuit Open Error.
+
+    Raised without touching the database while its circuit breaker is open.
+    """
+    message = 'Database Unavailable Error'
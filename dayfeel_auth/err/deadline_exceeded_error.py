@@ -0,0 +1,16 @@
+"""
+Deadline Exceeded Error.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.err.database_unavailable_error import DatabaseUnavailableError
+
+
+# --- CODE ---
+class DeadlineExceededError(DatabaseUnavailableError):
+    """
+    Deadline Exceeded Error.
+
+    Raised instead of starting database work once the request deadline has passed.
+    """
+    message = 'Request Deadline Exceeded'
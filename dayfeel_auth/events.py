@@ -6,13 +6,156 @@ Startup and shutdown event handlers.
 from dayfeel_auth import routers
 from dayfeel_auth.app import container
 from dayfeel_auth.app import health
+from dayfeel_auth.app import readiness
+from dayfeel_auth.db.interfaces.auth_sessions import AuthSessionsRepositoryInterface
+from dayfeel_auth.db.memory.repository.auth_sessions import MemoryAuthSessionsRepository
 from dayfeel_auth.db.sqlalchemy.repository.auth_sessions import AuthSessionsRepository
+from dayfeel_auth.db.sqlalchemy.repository.group_commit_auth_sessions import GroupCommitAuthSessionsRepository
+from dayfeel_auth.db.sqlalchemy.repository.login_events import LoginEventsRepository
+from dayfeel_auth.db.sqlalchemy.repository.service_clients import ServiceClientsRepository
 from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
+from dayfeel_auth.db.sqlalchemy.setup import notifications
+from dayfeel_auth.db.sqlalchemy.setup.circuit_breaker import CircuitBreaker
+from dayfeel_auth.db.sqlalchemy.setup.circuit_breaker import attach_circuit_breaker
 from dayfeel_auth.db.sqlalchemy.setup.database_engine import create_database_engine
+from dayfeel_auth.db.sqlalchemy.setup.replica_set import ReplicaSet
+from dayfeel_auth.health_monitor import HealthMonitor
+from dayfeel_auth.middlewares.draining import DRAINING
+from dayfeel_auth.middlewares.draining import REQUESTS_IN_FLIGHT
+from dayfeel_auth.utils.breached_passwords import get_breached_passwords
+from dayfeel_auth.utils.cache_invalidation import CacheInvalidationListener
+from dayfeel_auth.utils.email_filter import EmailFilter
+from dayfeel_auth.utils.login_events import LoginEventBuffer
+from dayfeel_auth.utils.refresh_grace import RefreshGraceCache
+from dayfeel_auth.utils.security import shutdown_hashing_executor
+from dayfeel_auth.utils.token_versions import TokenVersionCache
+from dayfeel_auth.warmup import start_warmup
 from fastapi import FastAPI
+from sqlalchemy import Engine
+from threading import Timer
+
+import asyncio
+import signal
+import threading
+import time
+
+
+# --- TYPES ---
+from types import FrameType
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+
+# --- GLOBALS ---
+# Seconds between checks for in-flight requests while draining
+DRAIN_POLL_SEC = 0.05
 
 
 # --- CODE ---
+def create_auth_sessions_repository(engine: Engine) -> AuthSessionsRepositoryInterface:
+    """
+    Create the session store selected by the SESSION_STORE config.
+
+    :param engine: SQLAlchemy engine, used by the 'postgres' store.
+
+    :returns: Session store.
+    """
+    # Get config
+    config = container['config']
+
+    # If the embedded store is selected: keep sessions in memory
+    if config.SESSION_STORE == 'memory':
+        return MemoryAuthSessionsRepository(snapshot_path=config.SESSION_STORE_SNAPSHOT_PATH or None,
+                                            snapshot_interval_sec=config.SESSION_STORE_SNAPSHOT_INTERVAL_SEC,
+                                            expiry_interval_sec=config.SESSION_STORE_EXPIRY_INTERVAL_SEC)
+
+    # If group commit is enabled: batch concurrent session inserts
+    if config.SESSION_GROUP_COMMIT:
+        return GroupCommitAuthSessionsRepository(engine=engine,
+                                                 max_wait_ms=config.SESSION_GROUP_COMMIT_MAX_WAIT_MS,
+                                                 max_batch=config.SESSION_GROUP_COMMIT_MAX_BATCH)
+
+    return AuthSessionsRepository(engine=engine)
+
+
+def create_cache_invalidation_listener(engine: Engine, token_versions: TokenVersionCache,
+                                       email_filter: EmailFilter) -> Optional[CacheInvalidationListener]:
+    """
+    Create the listener applying other workers' changes to this worker's caches.
+
+    :param engine: SQLAlchemy engine of the primary database.
+    :param token_versions: Per-user token version cache.
+    :param email_filter: Filter of registered emails.
+
+    :returns: Listener, or None if disabled or the database has no notification channel.
+    """
+    # If disabled, or not on Postgres: caches only expire
+    if not container['config'].CACHE_INVALIDATION_ENABLED or engine.dialect.name != 'postgresql':
+        return None
+
+    # Events may have been missed: drop cached token versions, look up unknown emails until the filter is re-read
+    def on_gap() -> None:
+        token_versions.clear()
+        email_filter.invalidate()
+
+    listener = CacheInvalidationListener(
+        engine=engine,
+        handlers={
+            notifications.USER_TOKENS_REVOKED:
+                lambda event: token_versions.set(event['user_id'], event['token_version']),
+            notifications.USER_CREATED: lambda event: email_filter.add(event['email']),
+        },
+        on_gap=on_gap,
+        reconnect_max_sec=container['config'].CACHE_INVALIDATION_RECONNECT_MAX_SEC)
+
+    # The email filter only trusts misses while the listener delivers new emails
+    email_filter.follow(listener)
+    return listener
+
+
+def install_drain_signal_handler(grace_delay_sec: float) -> None:
+    """
+    Start draining as soon as SIGTERM arrives, before Uvicorn's own shutdown.
+
+    Uvicorn closes its listener and waits for open connections before the
+    lifespan shutdown runs, so by then the instance can no longer report
+    unready. This handler runs first: it reports unready and turns new
+    requests away right away, then hands the signal to Uvicorn once the grace
+    delay has given the orchestrator time to take the instance out of rotation.
+
+    :param grace_delay_sec: Seconds between SIGTERM and Uvicorn's shutdown.
+
+    :returns: None.
+    """
+    # Signal handlers can only be set from the main thread (not under a test client)
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    # Uvicorn installs its handler before startup runs: chain to it
+    uvicorn_handler = signal.getsignal(signal.SIGTERM)
+    if not callable(uvicorn_handler):
+        return
+
+    def forward(sig: int, frame: Optional[FrameType]) -> None:
+        container['logger'].info('Grace delay over: stopping the server')
+        uvicorn_handler(sig, frame)
+
+    def on_sigterm(sig: int, frame: Optional[FrameType]) -> None:
+
+        # If already draining (e.g. a second SIGTERM): shut down now
+        if DRAINING.is_set():
+            uvicorn_handler(sig, frame)
+            return
+
+        # Report unready and turn new requests away, then let Uvicorn shut down after the grace delay
+        readiness.ready = False
+        DRAINING.set()
+        Timer(grace_delay_sec, forward, args=(sig, frame)).start()
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+
 def on_startup(app: FastAPI) -> None:
     """
     Initialize the service on startup.
@@ -20,31 +163,176 @@ def on_startup(app: FastAPI) -> None:
     # Mount routers
     routers.mount(app)
 
+    # Start draining on SIGTERM, ahead of Uvicorn's shutdown
+    install_drain_signal_handler(container['config'].SHUTDOWN_GRACE_DELAY_SEC)
+
+    # Map the breached password list now: a missing or malformed file stops startup instead of failing registrations
+    breached_passwords = get_breached_passwords()
+    if breached_passwords is not None:
+        container['logger'].info(f'Breached password list loaded: {len(breached_passwords):,} prefixes')
+
     # Create database engine
-    database_engine = create_database_engine(url=container['config'].POSTGRES_URL)
+    database_engine = create_database_engine(url=container['config'].POSTGRES_URL,
+                                             pool_size=container['config'].DB_POOL_SIZE,
+                                             max_overflow=container['config'].DB_MAX_OVERFLOW,
+                                             pool_timeout=container['config'].DB_POOL_TIMEOUT_SEC)
+
+    # Create read replica engines, sized like the primary pool
+    replicas = ReplicaSet(primary=database_engine,
+                          replicas=[create_database_engine(url=url,
+                                                           pool_size=container['config'].DB_POOL_SIZE,
+                                                           max_overflow=container['config'].DB_MAX_OVERFLOW,
+                                                           pool_timeout=container['config'].DB_POOL_TIMEOUT_SEC)
+                                    for url in container['config'].POSTGRES_REPLICA_URLS],
+                          retry_interval_sec=container['config'].DB_REPLICA_RETRY_INTERVAL_SEC)
+
+    # Guard each database with its own circuit breaker
+    for engine in [database_engine, *replicas.replicas]:
+        attach_circuit_breaker(engine, CircuitBreaker(failure_rate=container['config'].DB_CIRCUIT_FAILURE_RATE,
+                                                      window_size=container['config'].DB_CIRCUIT_WINDOW_SIZE,
+                                                      min_calls=container['config'].DB_CIRCUIT_MIN_CALLS,
+                                                      open_sec=container['config'].DB_CIRCUIT_OPEN_SEC))
 
     # Initialize users repository
-    users_repository = UsersRepository(engine=database_engine)
+    users_repository = UsersRepository(engine=database_engine, replicas=replicas)
 
     # Initialize auth sessions reposository
-    auth_sessions_reposository = AuthSessionsRepository(engine=database_engine)
+    auth_sessions_reposository = create_auth_sessions_repository(engine=database_engine)
+    auth_sessions_reposository.start()
+
+    # Initialize service clients repository
+    service_clients_repository = ServiceClientsRepository(engine=database_engine)
+
+    # Initialize buffered login audit trail
+    login_events = LoginEventBuffer(repository=LoginEventsRepository(engine=database_engine),
+                                    capacity=container['config'].LOGIN_EVENTS_BUFFER_SIZE,
+                                    flush_interval_ms=container['config'].LOGIN_EVENTS_FLUSH_INTERVAL_MS,
+                                    max_batch=container['config'].LOGIN_EVENTS_MAX_BATCH,
+                                    partitions_ahead=container['config'].LOGIN_EVENTS_PARTITIONS_AHEAD)
+    login_events.start()
+
+    # Initialize per-user token version cache
+    token_versions = TokenVersionCache(users_repository=users_repository,
+                                       ttl_sec=container['config'].TOKEN_VERSION_CACHE_TTL_SEC,
+                                       max_size=container['config'].TOKEN_VERSION_CACHE_SIZE)
+
+    # Initialize filter of registered emails, loaded in the background
+    email_filter = EmailFilter(users_repository=users_repository,
+                               capacity=container['config'].EMAIL_FILTER_CAPACITY,
+                               error_rate=container['config'].EMAIL_FILTER_ERROR_RATE,
+                               refresh_interval_sec=container['config'].EMAIL_FILTER_REFRESH_SEC)
+    email_filter.start()
+
+    # Apply cache invalidations published by other workers
+    cache_invalidation = create_cache_invalidation_listener(engine=database_engine,
+                                                            token_versions=token_versions,
+                                                            email_filter=email_filter)
+    if cache_invalidation is not None:
+        cache_invalidation.start()
+
+    # Initialize refresh token grace window
+    refresh_grace = RefreshGraceCache(grace_sec=container['config'].REFRESH_GRACE_SEC,
+                                      max_size=container['config'].REFRESH_GRACE_CACHE_SIZE)
+
+    # Initialize dependency health checks
+    health_monitor = HealthMonitor(engine=database_engine, replicas=replicas)
 
     # Update global container
     container.update({
+        'replicas': replicas,
         'users_repository': users_repository,
-        'auth_sessions_reposository': auth_sessions_reposository
+        'auth_sessions_reposository': auth_sessions_reposository,
+        'service_clients_repository': service_clients_repository,
+        'token_versions': token_versions,
+        'email_filter': email_filter,
+        'cache_invalidation': cache_invalidation,
+        'refresh_grace': refresh_grace,
+        'health_monitor': health_monitor,
+        'login_events': login_events
     })
 
-    # Set app health as OK
+    # Set app health as OK until the first dependency check reports (readiness is set by the warmup)
     health.status = 'OK'
 
+    # Start periodic dependency health checks
+    health_monitor.start()
+
+    # Warm up connections, hashing and tokens before accepting traffic
+    start_warmup(database_engine)
+
     # Log service start
     container['logger'].info('Service started')
 
 
-def on_shutdown(app: FastAPI) -> None:  #pylint: disable=W0613
+async def drain_requests(timeout_sec: float) -> bool:
     """
-    Run on service shutdown.
+    Wait for in-flight requests to finish.
+
+    :param timeout_sec: Longest wait.
+
+    :returns: True if every request finished in time.
     """
-    # Log service shutdown
+    deadline = time.monotonic() + timeout_sec
+    while REQUESTS_IN_FLIGHT.value > 0 and time.monotonic() < deadline:
+        await asyncio.sleep(DRAIN_POLL_SEC)
+
+    return REQUESTS_IN_FLIGHT.value == 0
+
+
+def run_shutdown_step(name: str, step: Callable[[], Any]) -> None:
+    """
+    Run one shutdown step, logging its failure so the following steps still run.
+
+    :param name: Step description, for the log.
+    :param step: Function running the step.
+
+    :returns: None.
+    """
+    try:
+        step()
+    except Exception as e:  # pylint: disable=W0718
+        container['logger'].error(f'Shutdown step "{name}" failed: {e}')
+
+
+async def on_shutdown(app: FastAPI) -> None:  #pylint: disable=W0613
+    """
+    Shut the service down in order: stop taking new requests, drain the ones in
+    flight, stop background work (writing what it buffered), close database
+    connections and flush the log queue. A failing step is logged and the
+    shutdown goes on, so one component cannot cost another its buffered data.
+    """
+    # Report unready and turn new requests away (already done on SIGTERM)
+    readiness.ready = False
+    DRAINING.set()
+    container['logger'].info('Service shutting down: draining requests')
+
+    # Wait for in-flight requests, up to the drain timeout
+    if not await drain_requests(container['config'].SHUTDOWN_DRAIN_TIMEOUT_SEC):
+        container['logger'].warning(f'Shutting down with {REQUESTS_IN_FLIGHT.value} requests still in flight')
+
+    # Stop dependency health checks
+    run_shutdown_step('health monitor', container['health_monitor'].stop)
+
+    # Stop cache invalidation listener
+    if container['cache_invalidation'] is not None:
+        run_shutdown_step('cache invalidation', container['cache_invalidation'].stop)
+
+    # Stop email filter refreshes
+    run_shutdown_step('email filter', container['email_filter'].stop)
+
+    # Stop session store, persisting pending state
+    run_shutdown_step('session store', container['auth_sessions_reposository'].stop)
+
+    # Stop login audit trail, writing buffered events
+    run_shutdown_step('login events', container['login_events'].stop)
+
+    # Stop password hashing threads
+    run_shutdown_step('password hashing', shutdown_hashing_executor)
+
+    # Close read replica and primary connections
+    run_shutdown_step('read replicas', container['replicas'].dispose)
+    run_shutdown_step('primary database', container['replicas'].primary.dispose)
+
+    # Log service shutdown and wait for queued log messages to be written
     container['logger'].info('Service shutdown')
+    await container['logger'].complete()
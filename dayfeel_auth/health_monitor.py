@@ -0,0 +1,212 @@
+"""
+Background dependency health checks.
+
+Probes run at a fixed interval in a background thread and update the global
+health object in place, so '/health' only serves the cached result and never
+touches the database itself.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.app import health
+from dayfeel_auth.db.sqlalchemy.setup.circuit_breaker import get_circuit_breaker
+from dayfeel_auth.db.sqlalchemy.setup.replica_set import ReplicaSet
+from dayfeel_auth.utils.security import HASHING_IN_FLIGHT
+from sqlalchemy import Engine
+from sqlalchemy import text
+from threading import Event
+from threading import Thread
+
+
+# --- TYPES ---
+from typing import Dict
+from typing import Literal
+from typing import Optional
+
+
+# --- GLOBALS ---
+Status = Literal['OK', 'WARNING', 'FAILURE', 'UNKNOWN']
+
+# Worst status first
+STATUS_SEVERITY = ('FAILURE', 'WARNING', 'UNKNOWN', 'OK')
+
+
+# --- CODE ---
+class HealthMonitor:
+    """
+    Periodically probes the service dependencies and caches the result.
+    """
+
+    def __init__(self, engine: Engine, replicas: Optional[ReplicaSet] = None) -> None:
+        """
+        Initializes the monitor.
+
+        :param engine: SQLAlchemy engine to probe.
+        :param replicas: Read replicas to report on, if any.
+
+        :returns: None.
+        """
+        self.__engine = engine
+        self.__replicas = replicas
+        self.__stop = Event()
+        self.__thread: Optional[Thread] = None
+
+
+    def start(self) -> None:
+        """
+        Start probing in a background thread.
+
+        :returns: None.
+        """
+        self.__thread = Thread(target=self.__run, name='health-monitor', daemon=True)
+        self.__thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Stop probing and wait for the background thread.
+
+        :returns: None.
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+
+    def check(self) -> None:
+        """
+        Run every probe once and update the global health object.
+
+        :returns: None.
+        """
+        # Run probes
+        checks: Dict[str, Status] = {
+            'database': self.__check_database(),
+            'database_pool': self.__check_database_pool(),
+            'database_circuit': self.__check_database_circuit(),
+            'password_hashing': self.__check_password_hashing(),
+        }
+
+        # If cache invalidation is enabled: report whether the listener is connected
+        if container.get('cache_invalidation') is not None:
+            checks['cache_invalidation'] = 'OK' if container['cache_invalidation'].connected else 'WARNING'
+
+        # If read replicas are configured: report how many are in rotation
+        if self.__replicas is not None and self.__replicas.replicas:
+            checks['database_replicas'] = self.__check_database_replicas()
+
+        # Overall status is the worst status of all checks
+        status = next(s for s in STATUS_SEVERITY if s in checks.values())
+
+        # Log status changes
+        if status != health.status:
+            container['logger'].warning(f'Health changed from {health.status} to {status}: {checks}')
+
+        # Update cached health
+        health.checks = checks
+        health.status = status
+
+
+# --- Private helpers ---
+    def __run(self) -> None:
+        """
+        Probe loop, runs until stopped.
+
+        :returns: None.
+        """
+        while not self.__stop.is_set():
+            self.check()
+            self.__stop.wait(container['config'].HEALTH_CHECK_INTERVAL_SEC)
+
+
+    def __check_database(self) -> Status:
+        """
+        Check that Postgres answers a trivial query.
+
+        :returns: 'OK' or 'FAILURE'.
+        """
+        try:
+            with self.__engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            return 'OK'
+
+        # If database is unavailable: report failure
+        except Exception as e:  # pylint: disable=W0718
+            container['logger'].error(f'Health check failed for database: {e}')
+            return 'FAILURE'
+
+
+    def __check_database_pool(self) -> Status:
+        """
+        Check how much of the connection pool is in use.
+
+        :returns: 'OK', 'WARNING' when close to saturation or 'UNKNOWN' if the pool does not report usage.
+        """
+        # Get pool usage
+        config = container['config']
+        pool = self.__engine.pool
+        capacity = config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW
+
+        # If pool does not track checked out connections: usage is unknown
+        if not hasattr(pool, 'checkedout') or capacity <= 0:
+            return 'UNKNOWN'
+
+        # If pool is close to saturation: report warning
+        if pool.checkedout() / capacity >= config.HEALTH_POOL_USAGE_WARNING:
+            return 'WARNING'
+
+        return 'OK'
+
+
+    def __check_database_circuit(self) -> Status:
+        """
+        Check the state of the primary database circuit breaker.
+
+        :returns: 'OK' when closed, 'WARNING' when probing recovery, 'FAILURE' when open or 'UNKNOWN' without breaker.
+        """
+        # Get breaker
+        breaker = get_circuit_breaker(self.__engine)
+
+        # If no breaker is attached: state is unknown
+        if breaker is None:
+            return 'UNKNOWN'
+
+        return {'closed': 'OK', 'half_open': 'WARNING', 'open': 'FAILURE'}[breaker.state]
+
+
+    def __check_password_hashing(self) -> Status:
+        """
+        Check how many password hash/verify calls are queued or running.
+
+        :returns: 'OK' or 'WARNING' when hashing is backing up.
+        """
+        if HASHING_IN_FLIGHT.value >= container['config'].HEALTH_HASHING_QUEUE_WARNING:
+            return 'WARNING'
+
+        return 'OK'
+
+
+    def __check_database_replicas(self) -> Status:
+        """
+        Check that every read replica is in rotation.
+
+        Each replica is probed with a trivial query, so a replica that failed
+        requests while idle is taken out of rotation before traffic reaches it.
+
+        :returns: 'OK' or 'WARNING' when any replica is out of rotation (reads then fall back to the primary).
+        """
+        # Probe replicas (connection failures take them out of rotation)
+        for replica in self.__replicas.replicas:
+            try:
+                with replica.connect() as connection:
+                    connection.execute(text('SELECT 1'))
+
+            # If replica is unavailable: log and keep probing the others
+            except Exception as e:  # pylint: disable=W0718
+                container['logger'].error(f'Health check failed for database replica {replica.url!r}: {e}')
+
+        # If any replica is out of rotation: report warning
+        if self.__replicas.healthy_count < len(self.__replicas.replicas):
+            return 'WARNING'
+
+        return 'OK'
@@ -7,6 +7,8 @@ from contextlib import asynccontextmanager
 from dayfeel_auth.app import app
 from dayfeel_auth.events import on_shutdown
 from dayfeel_auth.events import on_startup
+from dayfeel_auth.middlewares.deadlines import DeadlineMiddleware
+from dayfeel_auth.middlewares.draining import DrainingMiddleware
 from dayfeel_auth.responders import errors  # pylint: disable=W0611
 from fastapi import FastAPI
 
@@ -26,7 +28,13 @@ async def lifespan(application: FastAPI):
 
     # Shutdown tasks
     finally:
-        on_shutdown(application)
+        await on_shutdown(application)
 
 # Attach lifespan to the app
 app.router.lifespan_context = lifespan
+
+# Bound each request by its route deadline
+app.add_middleware(DeadlineMiddleware)
+
+# Count in-flight requests and turn new ones away on shutdown (outermost, added last)
+app.add_middleware(DrainingMiddleware)
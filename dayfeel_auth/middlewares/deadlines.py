@@ -0,0 +1,88 @@
+"""
+Request deadline middleware.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.utils.deadlines import REQUEST_DEADLINE
+
+import time
+
+
+# --- TYPES ---
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+
+# --- CODE ---
+class DeadlineMiddleware:
+    """
+    Sets the deadline of each HTTP request from its route timeout.
+
+    The timeout is the REQUEST_TIMEOUTS entry with the longest path prefix
+    matching the request, or REQUEST_TIMEOUT_SEC when none matches.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initializes the middleware.
+
+        :param app: Wrapped ASGI application.
+
+        :returns: None.
+        """
+        self.__app = app
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request within its deadline.
+
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+
+        :returns: None.
+        """
+        # If not an HTTP request: pass through
+        if scope['type'] != 'http':
+            await self.__app(scope, receive, send)
+            return
+
+        # Get route timeout
+        timeout_sec = self.__timeout_sec(scope['path'])
+
+        # If timeouts are disabled for this route: pass through
+        if timeout_sec <= 0:
+            await self.__app(scope, receive, send)
+            return
+
+        # Serve request with its deadline set
+        token = REQUEST_DEADLINE.set(time.monotonic() + timeout_sec)
+        try:
+            await self.__app(scope, receive, send)
+        finally:
+            REQUEST_DEADLINE.reset(token)
+
+
+# --- Private helpers ---
+    @staticmethod
+    def __timeout_sec(path: str) -> float:
+        """
+        Find the timeout of a request path.
+
+        :param path: Request path.
+
+        :returns: Timeout in seconds, 0 when disabled.
+        """
+        # Get config
+        config = container['config']
+
+        # Find most specific matching route prefix
+        prefixes = [prefix for prefix in config.REQUEST_TIMEOUTS if path.startswith(prefix)]
+        if prefixes:
+            return config.REQUEST_TIMEOUTS[max(prefixes, key=len)]
+
+        return config.REQUEST_TIMEOUT_SEC
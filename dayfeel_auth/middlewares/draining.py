@@ -0,0 +1,74 @@
+"""
+Request draining middleware.
+
+Counts the HTTP requests being served, so the shutdown sequence can wait for
+them to finish before closing the database, and turns new requests away once
+shutdown has started instead of cutting them off half way.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.utils.in_flight_counter import InFlightCounter
+from starlette.responses import JSONResponse
+from threading import Event
+
+
+# --- TYPES ---
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+
+# --- GLOBALS ---
+# HTTP requests currently being served
+REQUESTS_IN_FLIGHT = InFlightCounter()
+
+# Set when shutdown starts
+DRAINING = Event()
+
+# Probe endpoints keep answering while draining, so orchestrators see the instance go unready
+PROBE_PATHS = ('/health', '/ready')
+
+
+# --- CODE ---
+class DrainingMiddleware:
+    """
+    Tracks in-flight requests and rejects new ones while the service shuts down.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """
+        Initializes the middleware.
+
+        :param app: Wrapped ASGI application.
+
+        :returns: None.
+        """
+        self.__app = app
+
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request, unless the service is shutting down.
+
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+
+        :returns: None.
+        """
+        # If not an HTTP request: pass through
+        if scope['type'] != 'http':
+            await self.__app(scope, receive, send)
+            return
+
+        # If shutting down: ask the client to retry elsewhere and close the connection
+        if DRAINING.is_set() and scope['path'] not in PROBE_PATHS:
+            response = JSONResponse({'error': 'Service Shutting Down'}, status_code=503,
+                                    headers={'Retry-After': '1', 'Connection': 'close'})
+            await response(scope, receive, send)
+            return
+
+        # Serve request, counting it as in flight
+        with REQUESTS_IN_FLIGHT:
+            await self.__app(scope, receive, send)
@@ -4,10 +4,13 @@ Data models.
 
 # --- IMPORTS ---
 from pydantic import BaseModel
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 from typing import Any
 from typing import Dict
+from typing import List
 from typing import Literal
+from typing import Optional
 
 
 # --- CODE ---
@@ -17,9 +20,88 @@ class Config(BaseSettings):
     Application configuration.
     """
     POSTGRES_URL: str
+    POSTGRES_REPLICA_URLS: List[str] = []
+    DB_REPLICA_RETRY_INTERVAL_SEC: float = 30.0
     JWT_SECRET_KEY: str
     JWT_ACCESS_TOKEN_EXP_MIN: int
     JWT_REFRESH_TOKEN_EXP_MIN: int
+    TOKEN_VERSION_CACHE_TTL_SEC: float = 30.0
+    TOKEN_VERSION_CACHE_SIZE: int = 100_000
+    CLIENT_SECRET_HMAC_KEY: Optional[str] = None
+    CLIENT_ACCESS_TOKEN_EXP_MIN: int = 5
+    CACHE_INVALIDATION_ENABLED: bool = True
+    CACHE_INVALIDATION_RECONNECT_MAX_SEC: float = 30.0
+    REFRESH_GRACE_SEC: float = 10.0
+    REFRESH_GRACE_CACHE_SIZE: int = 10_000
+    EMAIL_FILTER_CAPACITY: int = 1_000_000
+    EMAIL_FILTER_ERROR_RATE: float = 0.01
+    EMAIL_FILTER_REFRESH_SEC: float = 5.0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SEC: float = 1.0
+    DB_CIRCUIT_FAILURE_RATE: float = 0.5
+    DB_CIRCUIT_WINDOW_SIZE: int = 20
+    DB_CIRCUIT_MIN_CALLS: int = 10
+    DB_CIRCUIT_OPEN_SEC: float = 5.0
+    SESSION_STORE: Literal['postgres', 'memory'] = 'postgres'
+    SESSION_STORE_SNAPSHOT_PATH: Optional[str] = None
+    SESSION_STORE_SNAPSHOT_INTERVAL_SEC: float = 30.0
+    SESSION_STORE_EXPIRY_INTERVAL_SEC: float = 60.0
+    SESSION_GROUP_COMMIT: bool = False
+    SESSION_GROUP_COMMIT_MAX_WAIT_MS: float = 2.0
+    SESSION_GROUP_COMMIT_MAX_BATCH: int = 64
+    REQUEST_TIMEOUT_SEC: float = 10.0
+    REQUEST_TIMEOUTS: Dict[str, float] = {}
+    BREACHED_PASSWORDS_PATH: Optional[str] = None
+    BREACHED_PASSWORDS_PREFIX_BYTES: int = 10
+    PASSWORD_HASHING_THREADS: int = 0
+    EXPORT_BATCH_SIZE: int = 1_000
+    LOGIN_EVENTS_BUFFER_SIZE: int = 10_000
+    LOGIN_EVENTS_FLUSH_INTERVAL_MS: float = 250.0
+    LOGIN_EVENTS_MAX_BATCH: int = 1_000
+    LOGIN_EVENTS_PARTITIONS_AHEAD: int = 2
+    WARMUP_DB_CONNECTIONS: int = 2
+    WARMUP_RETRY_INTERVAL_SEC: float = 1.0
+    HEALTH_CHECK_INTERVAL_SEC: float = 10.0
+    HEALTH_POOL_USAGE_WARNING: float = 0.8
+    HEALTH_HASHING_QUEUE_WARNING: int = 8
+    SHUTDOWN_DRAIN_TIMEOUT_SEC: float = 10.0
+    SHUTDOWN_GRACE_DELAY_SEC: float = 5.0
+    WEB_CONCURRENCY: int = 1
+
+    @model_validator(mode='after')
+    def validate_session_store(self) -> 'Config':
+        """
+        Validate the session store against the deployment.
+
+        :returns: validated config.
+
+        :raises ValueError: If the memory store is used with several worker processes.
+        """
+        # Sessions kept in memory are not shared: a token issued by one worker would be unknown to the others
+        if self.SESSION_STORE == 'memory' and self.WEB_CONCURRENCY > 1:
+            raise ValueError(f"SESSION_STORE='memory' requires a single worker, "
+                             f'got WEB_CONCURRENCY={self.WEB_CONCURRENCY}')
+
+        return self
+
+
+    @model_validator(mode='after')
+    def validate_pool_timeout(self) -> 'Config':
+        """
+        Validate the pool checkout timeout against the request deadlines.
+
+        :returns: validated config.
+
+        :raises ValueError: If waiting for a pooled connection can outlast a route's deadline.
+        """
+        # A pool checkout cannot be interrupted by the deadline: it must time out first, whatever the route
+        deadlines = [timeout for timeout in (self.REQUEST_TIMEOUT_SEC, *self.REQUEST_TIMEOUTS.values()) if timeout > 0]
+        if deadlines and self.DB_POOL_TIMEOUT_SEC >= min(deadlines):
+            raise ValueError(f'DB_POOL_TIMEOUT_SEC={self.DB_POOL_TIMEOUT_SEC} must be below the shortest '
+                             f'request timeout ({min(deadlines)}s)')
+
+        return self
 
     class Config:
         """
@@ -34,6 +116,15 @@ class Health(BaseModel):
     System health status.
     """
     status: Literal['OK', 'WARNING', 'FAILURE', 'UNKNOWN'] = 'UNKNOWN'
+    checks: Dict[str, Literal['OK', 'WARNING', 'FAILURE', 'UNKNOWN']] = {}
+
+
+# Readiness model
+class Readiness(BaseModel):
+    """
+    System readiness to receive traffic.
+    """
+    ready: bool = False
 
 
 # Info model
@@ -50,4 +141,5 @@ class Info(BaseModel):
 # --- Forward references ---
 Config.model_rebuild()
 Health.model_rebuild()
+Readiness.model_rebuild()
 Info.model_rebuild()
@@ -4,6 +4,7 @@ HTTP routers.
 
 # --- IMPORTS ---
 from dayfeel_auth.routers import auth
+from dayfeel_auth.routers import exports
 from dayfeel_auth.routers import system
 from dayfeel_auth.routers import users
 from fastapi import FastAPI
@@ -21,3 +22,4 @@ def mount(app: FastAPI) -> None:
     app.include_router(system.router, tags = ['system'])
     app.include_router(users.router, tags = ['users'])
     app.include_router(auth.router, tags = ['auth'], prefix='/auth')
+    app.include_router(exports.router, tags = ['exports'])
@@ -7,18 +7,28 @@ from datetime import datetime
 from datetime import timezone
 from dayfeel_auth.app import container
 from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.utils.auth import CLIENT_SUBJECT_PREFIX
 from dayfeel_auth.utils.auth import decode_token
 from dayfeel_auth.utils.auth import generate_access_token
 from dayfeel_auth.utils.auth import generate_refresh_token
-from dayfeel_auth.utils.security import verify_password
+from dayfeel_auth.utils.auth import parse_jti
+from dayfeel_auth.utils.client_secrets import verify_client_secret
+from dayfeel_auth.utils.login_events import record_login_attempt
+from dayfeel_auth.utils.routers.require_user import require_user
+from dayfeel_auth.utils.security import verify_password_async
 from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 
 
 # --- TYPES ---
+from dayfeel_auth.schemas.endpoints.auth import ClientCredentialsPayload
 from dayfeel_auth.schemas.endpoints.auth import LoginPayload
 from dayfeel_auth.schemas.endpoints.auth import RefreshPayload
+from uuid import UUID
 
 
 # --- GLOBAL ---
@@ -28,15 +38,20 @@ router = APIRouter()
 # Access token expiration
 ACCESS_TOKEN_EXP = container['config'].JWT_ACCESS_TOKEN_EXP_MIN * 60
 
+# Service client access token expiration, and the role its tokens carry
+CLIENT_ACCESS_TOKEN_EXP = container['config'].CLIENT_ACCESS_TOKEN_EXP_MIN * 60
+CLIENT_ROLE = 'service'
+
 
 # --- CODE ---
 # Login endpoint
 @router.post('/login', response_model = dict)
-async def user_login(payload: LoginPayload) -> JSONResponse:
+async def user_login(payload: LoginPayload, request: Request) -> JSONResponse:
     """
     Login user endpoint.
 
     :param payload: Validate data input.
+    :param request: Incoming request (client address and user agent are audited).
 
     :returns: JSON Response.
     """
@@ -47,11 +62,17 @@ async def user_login(payload: LoginPayload) -> JSONResponse:
     users_db = container['users_repository']
     auth_db = container['auth_sessions_reposository']
 
+    # If no user has this email: audit attempt and raise 'HTTP' error without a database lookup
+    if not container['email_filter'].might_exist(payload.email):
+        record_login_attempt(request, user_id=None, success=False)
+        raise HTTPException(status_code=401, detail='Invalid credentials!')
+
     # Get user from database
     user = users_db.get_by_email(payload.email)
 
-    # If user not found: raise 'HTTP' error
+    # If user not found: audit attempt and raise 'HTTP' error
     if user is None:
+        record_login_attempt(request, user_id=None, success=False)
         raise HTTPException(status_code=401, detail='Invalid credentials!')
 
     # Get password sent by request
@@ -60,27 +81,32 @@ async def user_login(payload: LoginPayload) -> JSONResponse:
     # Get password hash of the found user
     user_hash = user.password_hash
 
-    # Check password
-    check = verify_password(password=password, password_hash=user_hash)
+    # Check password (on the hashing pool, keeping the event loop free)
+    check = await verify_password_async(password=password, password_hash=user_hash)
 
-    # If check failed: raise 'HTTP' error
+    # If check failed: audit attempt and raise 'HTTP' error
     if check is False:
+        record_login_attempt(request, user_id=user.id, success=False)
         raise HTTPException(status_code=401, detail='Invalid credentials!')
 
     # Update last login field of database
     users_db.update_last_login(user_id=user.id)
 
     # Generate JWT tokens
-    access_token = generate_access_token(user_id=user.id, email=user.email, name=user.name, role=user.role.value)
-    refresh_token = generate_refresh_token(user_id=user.id)
+    access_token = generate_access_token(user_id=user.id, email=user.email, name=user.name, role=user.role.value,
+                                         token_version=user.token_version)
+    refresh_token = generate_refresh_token(user_id=user.id, token_version=user.token_version)
 
     # Create a new session
     session = AuthSessions(user_id=user.id,
-                           jti=refresh_token['claims']['jti'],
-                           expires_at=refresh_token['claims']['exp'])
+                           jti=refresh_token['jti'],
+                           expires_at=refresh_token['expires_at'])
 
-    # Insert new session to database
-    auth_db.insert_session(session)
+    # Insert new session to database (from the thread pool, so concurrent inserts can share a commit)
+    await run_in_threadpool(auth_db.insert_session, session)
+
+    # Audit successful attempt
+    record_login_attempt(request, user_id=user.id, success=True)
 
     # Create endpoint response
     response = {
@@ -102,6 +128,49 @@ async def user_login(payload: LoginPayload) -> JSONResponse:
     return JSONResponse(content=response, status_code=200)
 
 
+# Client-credentials token endpoint
+@router.post('/token', response_model = dict)
+async def client_token(payload: ClientCredentialsPayload) -> JSONResponse:
+    """
+    Issue an access token to a service client.
+
+    :param payload: Validate data input.
+
+    :returns: JSON Response.
+    """
+    # Log request
+    container['logger'].info(f'Client token request "POST /auth/token" received: {payload.client_id}')
+
+    # Get client from database
+    client = container['service_clients_repository'].get_by_client_id(payload.client_id)
+
+    # If client not found, disabled or the secret does not match: raise 'HTTP' error
+    if client is None or not client.active or not verify_client_secret(payload.client_secret, client.secret_hash):
+        raise HTTPException(status_code=401, detail='Invalid client credentials!')
+
+    # Generate a short-lived access token (no refresh token: clients just ask again)
+    access_token = generate_access_token(user_id=f'{CLIENT_SUBJECT_PREFIX}{client.client_id}', email=None,
+                                         name=client.name, role=CLIENT_ROLE, token_version=0,
+                                         exp_min=container['config'].CLIENT_ACCESS_TOKEN_EXP_MIN)
+
+    # Create endpoint response
+    response = {
+        'access_token': access_token['token'],
+        'token_type': 'Bearer',
+        'expires_in': CLIENT_ACCESS_TOKEN_EXP,
+        'client': {
+            'client_id': client.client_id,
+            'name': client.name
+        }
+    }
+
+    # Log success
+    container['logger'].info('Client token request "POST /auth/token" succeeded with status 200')
+
+    # Return json
+    return JSONResponse(content=response, status_code=200)
+
+
 # Refresh endpoint
 @router.post('/refresh', response_model = dict)
 async def refresh_tokens(payload: RefreshPayload) -> JSONResponse:
@@ -118,13 +187,34 @@ async def refresh_tokens(payload: RefreshPayload) -> JSONResponse:
     # Decode token
     decoded_token = decode_token(payload.refresh_token)
 
+    # Get jti of JWT token
+    jti = parse_jti(decoded_token.get('jti'))
+
+    # Rotate token once, replaying the new pair to duplicate refreshes within the grace window
+    response = await container['refresh_grace'].rotate(jti, lambda: rotate_refresh_token(decoded_token, jti))
+
+    # Log success
+    container['logger'].info('Refresh token request "POST /auth/refresh" succeeded with status 200')
+
+    # Return json
+    return JSONResponse(content=response, status_code=200)
+
+
+async def rotate_refresh_token(decoded_token: dict, jti: UUID) -> dict:
+    """
+    Revoke a refresh token session and issue a new token pair.
+
+    :param decoded_token: Decoded refresh token.
+    :param jti: Unique JWT identifier of the refresh token.
+
+    :raises HTTPException: If the session is unknown, revoked or expired, or the user is gone.
+
+    :returns: Endpoint response with the new token pair.
+    """
     # Get database repositories
     user_db = container['users_repository']
     auth_db = container['auth_sessions_reposository']
 
-    # Get jti of JWT token
-    jti = decoded_token.get('jti')
-
     # Get session by jti
     session = auth_db.get_by_jti(jti)
 
@@ -140,30 +230,32 @@ async def refresh_tokens(payload: RefreshPayload) -> JSONResponse:
     if session.expires_at < datetime.now(timezone.utc):
         raise HTTPException(status_code=401, detail='Refresh token expired')
 
-    # Revoke the current session
-    auth_db.revoke_session(jti)
+    # Revoke the current session (if another worker revoked it first: raise 'HTTP' error)
+    if not auth_db.revoke_session(jti):
+        raise HTTPException(status_code=401, detail='Refresh token revoked')
 
     # Get user id from token
     user_id = int(decoded_token.get('sub'))
 
-    # Get user by id
-    user = user_db.get_by_id(user_id = user_id)
+    # Get user by id from the primary, as part of a read-after-write flow
+    user = user_db.get_by_id(user_id = user_id, primary=True)
 
     # If not user: raise 'HTTP' error
     if not user:
         raise HTTPException(status_code=401, detail='User not found')
 
     # Generate new JWT tokens
-    access_token = generate_access_token(user_id=user.id, email=user.email, name=user.name, role=user.role.value)
-    refresh_token = generate_refresh_token(user_id=user_id)
+    access_token = generate_access_token(user_id=user.id, email=user.email, name=user.name, role=user.role.value,
+                                         token_version=user.token_version)
+    refresh_token = generate_refresh_token(user_id=user_id, token_version=user.token_version)
 
     # Create new session
     new_session = AuthSessions(user_id=user.id,
-                               jti=refresh_token['claims']['jti'],
-                               expires_at=refresh_token['claims']['exp'])
+                               jti=refresh_token['jti'],
+                               expires_at=refresh_token['expires_at'])
 
-    # Insert new session in database
-    auth_db.insert_session(new_session)
+    # Insert new session in database (from the thread pool, so concurrent inserts can share a commit)
+    await run_in_threadpool(auth_db.insert_session, new_session)
 
     # Create endpoint response
     response = {
@@ -178,8 +270,41 @@ async def refresh_tokens(payload: RefreshPayload) -> JSONResponse:
         }
     }
 
+    # Return endpoint response
+    return response
+
+
+# Logout everywhere endpoint
+@router.post('/logout-all', response_model = dict)
+async def logout_all(current_user: dict = Depends(require_user)) -> JSONResponse:
+    """
+    Revoke every access and refresh token of the current user.
+
+    :param current_user: Decoded access token of the user.
+
+    :returns: JSON Response.
+    """
+    # Log request
+    container['logger'].info('Logout all request "POST /auth/logout-all" received')
+
+    # Get users database repository
+    users_db = container['users_repository']
+
+    # Get user id from token
+    user_id = int(current_user['sub'])
+
+    # Increment token version, invalidating every token issued before
+    token_version = users_db.increment_token_version(user_id=user_id)
+
+    # If not user: raise 'HTTP' error
+    if token_version is None:
+        raise HTTPException(status_code=404, detail='User not found')
+
+    # Make this worker reject old tokens right away
+    container['token_versions'].set(user_id, token_version)
+
     # Log success
-    container['logger'].info('Refresh token request "POST /auth/refresh" succeeded with status 200')
+    container['logger'].info('Logout all request "POST /auth/logout-all" succeeded with status 200')
 
     # Return json
-    return JSONResponse(content=response, status_code=200)
+    return JSONResponse(content={'user_id': user_id, 'token_version': token_version}, status_code=200)
@@ -0,0 +1,60 @@
+"""
+Export endpoints.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.repository.exports import ExportsRepository
+from dayfeel_auth.utils.exports import MEDIA_TYPES
+from dayfeel_auth.utils.exports import format_batches
+from dayfeel_auth.utils.routers.require_admin import require_admin
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+
+
+# --- TYPES ---
+from dayfeel_auth.db.sqlalchemy.repository.exports import ExportTable
+from dayfeel_auth.utils.exports import ExportFormat
+
+
+# --- GLOBAL ---
+# Router instance
+router = APIRouter()
+
+
+# --- CODE ---
+# Export table endpoint
+@router.get('/exports/{table}')
+async def export_table(table: ExportTable,
+                       export_format: ExportFormat = Query('ndjson', alias='format'),
+                       current_admin: dict = Depends(require_admin)) -> StreamingResponse:  # pylint: disable=W0613
+    """
+    Stream every row of a table as NDJSON or CSV.
+
+    Rows are read from a read replica when configured, one batch at a time.
+
+    :param table: 'users' (without password hashes) or 'auth_sessions'.
+    :param export_format: 'ndjson' or 'csv' (query parameter 'format').
+
+    :returns: Streaming response.
+    """
+    # Log request
+    container['logger'].info(f'Export request "GET /exports/{table}" received')
+
+    # Get exports repository, on a replica when available
+    db = ExportsRepository(engine=container['replicas'].reader())
+
+    # Log throughput once the export is done
+    def on_done(rows: int, elapsed: float) -> None:
+        container['logger'].info(f'Export request "GET /exports/{table}" streamed {rows} rows in {elapsed:.1f}s '
+                                 f'({rows / max(elapsed, 1e-9):,.0f} rows/s)')
+
+    # Stream rows (the sync generator runs in the thread pool)
+    return StreamingResponse(format_batches(db.stream(table, batch_size=container['config'].EXPORT_BATCH_SIZE),
+                                            columns=db.columns(table),
+                                            export_format=export_format,
+                                            on_done=on_done),
+                             media_type=MEDIA_TYPES[export_format],
+                             headers={'Content-Disposition': f'attachment; filename="{table}.{export_format}"'})
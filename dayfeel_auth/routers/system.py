@@ -5,8 +5,10 @@ System endpoints.
 # --- IMPORTS ---
 from dayfeel_auth.app import health
 from dayfeel_auth.app import info
+from dayfeel_auth.app import readiness
 from dayfeel_auth.models import Health
 from dayfeel_auth.models import Info
+from dayfeel_auth.models import Readiness
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
 
@@ -21,11 +23,23 @@ router = APIRouter()
 @router.get('/health', response_model = Health)
 def get_health() -> JSONResponse:
     """
-    Returns the current system health status.
+    Returns the system health status cached by the background health checks.
     """
     return JSONResponse(health.dict())
 
 
+# Readiness endpoint
+@router.get('/ready', response_model = Readiness)
+def get_ready() -> JSONResponse:
+    """
+    Returns whether the system has finished warming up and its dependencies are reachable.
+    """
+    # Ready once warmed up, unless a dependency check is failing
+    ready = Readiness(ready = readiness.ready and health.status != 'FAILURE')
+
+    return JSONResponse(ready.dict(), status_code = 200 if ready.ready else 503)
+
+
 # Info endpoint
 @router.get('/info', response_model = Info)
 def get_info() -> JSONResponse:
@@ -3,16 +3,22 @@ Users endpoints.
 """
 
 # --- IMPORTS ---
+from datetime import datetime
 from dayfeel_auth.app import container
 from dayfeel_auth.db.sqlalchemy.models.users import Users
+from dayfeel_auth.err.already_exists_error import AlreadyExistsError
+from dayfeel_auth.utils.cursors import decode_cursor
+from dayfeel_auth.utils.cursors import encode_cursor
 from dayfeel_auth.utils.routers.require_admin import require_admin
-from dayfeel_auth.utils.security import hash_password
+from dayfeel_auth.utils.security import hash_password_async
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
 
 
 # --- TYPES ---
+from dayfeel_auth.schemas.endpoints.users import ListUsersQuery
 from dayfeel_auth.schemas.endpoints.users import RegisterPayload
 
 
@@ -39,8 +45,14 @@ async def register_user(payload: RegisterPayload,
     # Get users database repository
     db = container['users_repository']
 
-    # Generate a password hash
-    password_hash = hash_password(password=payload.password)
+    # If the email may be taken: check before paying for the password hash
+    if container['email_filter'].might_exist(payload.email) and db.get_by_email(payload.email, primary=True):
+        raise AlreadyExistsError({'entity': 'user',
+                                  'local': 'database',
+                                  'detail': 'User already exists.'})
+
+    # Generate a password hash (on the hashing pool, keeping the event loop free)
+    password_hash = await hash_password_async(password=payload.password)
 
     # Create user model instance
     new_user = Users(email=payload.email, password_hash=password_hash, name=payload.name)
@@ -48,6 +60,9 @@ async def register_user(payload: RegisterPayload,
     # Add user to database
     user = db.insert_user(user=new_user)
 
+    # Let this worker's logins find the new user right away
+    container['email_filter'].add(user.email)
+
     # Create endpoint response
     response = {
         'id': user.id,
@@ -61,3 +76,100 @@ async def register_user(payload: RegisterPayload,
 
     # Return json
     return JSONResponse(content=response, status_code=201)
+
+
+# Revoke user tokens endpoint
+@router.post('/users/{user_id}/revoke-tokens', response_model = dict)
+async def revoke_user_tokens(user_id: int,
+                             current_admin: dict = Depends(require_admin)) -> JSONResponse:  # pylint: disable=W0613
+    """
+    Revoke every access and refresh token of a user.
+
+    :param user_id: Id of the user whose tokens are revoked.
+
+    :returns: JSON Response.
+    """
+    # Log request
+    container['logger'].info(f'Revoke tokens request "POST /users/{user_id}/revoke-tokens" received')
+
+    # Get users database repository
+    db = container['users_repository']
+
+    # Increment token version, invalidating every token issued before
+    token_version = db.increment_token_version(user_id=user_id)
+
+    # If not user: raise 'HTTP' error
+    if token_version is None:
+        raise HTTPException(status_code=404, detail='User not found')
+
+    # Make this worker reject old tokens right away
+    container['token_versions'].set(user_id, token_version)
+
+    # Log success
+    container['logger'].info(f'Revoke tokens request "POST /users/{user_id}/revoke-tokens" succeeded with status 200')
+
+    # Return json
+    return JSONResponse(content={'user_id': user_id, 'token_version': token_version}, status_code=200)
+
+
+# List users endpoint
+@router.get('/users', response_model = dict)
+async def list_users(query: ListUsersQuery = Depends(),
+                     current_admin: dict = Depends(require_admin)) -> JSONResponse:  # pylint: disable=W0613
+    """
+    List users, one keyset-paginated page at a time.
+
+    :param query: Sort order, page size, cursor returned as 'next_cursor' by the previous page, and filters.
+
+    :returns: JSON Response.
+    """
+    # Log request
+    container['logger'].info('List users request "GET /users" received')
+
+    # Get users database repository
+    db = container['users_repository']
+
+    # Decode cursor into the sort key of the previous page's last row
+    after = None
+    if query.cursor is not None:
+        try:
+            values = decode_cursor(query.cursor)
+            if values.get('order_by') != query.order_by:
+                raise ValueError('Cursor was issued for another sort order')
+            after = ((values['id'],) if query.order_by == 'id' else
+                     (datetime.fromisoformat(values['created_at']), values['id']))
+
+        # If cursor is invalid: raise 'HTTP' error
+        except (KeyError, TypeError, ValueError) as e:
+            raise HTTPException(status_code=400, detail='Invalid cursor') from e
+
+    # Get page of users
+    users = db.list_users(order_by=query.order_by, after=after, limit=query.limit, role=query.role,
+                          last_login_from=query.last_login_from, last_login_to=query.last_login_to)
+
+    # Build cursor of the next page (none after a short page)
+    next_cursor = None
+    if len(users) == query.limit:
+        last = users[-1]
+        next_cursor = encode_cursor({'order_by': query.order_by, 'id': last.id} if query.order_by == 'id' else
+                                    {'order_by': query.order_by, 'id': last.id,
+                                     'created_at': last.created_at.isoformat()})
+
+    # Create endpoint response
+    response = {
+        'users': [{
+            'id': user.id,
+            'email': user.email,
+            'name': user.name,
+            'role': user.role.value,
+            'last_login': user.last_login.isoformat() if user.last_login else None,
+            'created_at': user.created_at.isoformat() if user.created_at else None
+        } for user in users],
+        'next_cursor': next_cursor
+    }
+
+    # Log success
+    container['logger'].info('List users request "GET /users" succeeded with status 200')
+
+    # Return json
+    return JSONResponse(content=response, status_code=200)
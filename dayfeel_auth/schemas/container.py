@@ -2,23 +2,43 @@
 Container (dependency injection) Schema.
 """
 
-# --- IMPORTS ---
-from dayfeel_auth.db.sqlalchemy.repository.auth_sessions import AuthSessionsRepository
-from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
-from dayfeel_auth.models import Config
-
-
 # --- TYPES ---
-from loguru._logger import Logger
+from typing import TYPE_CHECKING
+from typing import Optional
 from typing import TypedDict
 
 
+# Repositories pull in the SQLAlchemy ORM, so they are only imported for type checking
+# to keep 'dayfeel_auth.app' cheap to import (alembic, scripts and cold starts).
+if TYPE_CHECKING:
+    from dayfeel_auth.db.interfaces.auth_sessions import AuthSessionsRepositoryInterface
+    from dayfeel_auth.db.sqlalchemy.repository.service_clients import ServiceClientsRepository
+    from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
+    from dayfeel_auth.db.sqlalchemy.setup.replica_set import ReplicaSet
+    from dayfeel_auth.health_monitor import HealthMonitor
+    from dayfeel_auth.models import Config
+    from dayfeel_auth.utils.cache_invalidation import CacheInvalidationListener
+    from dayfeel_auth.utils.email_filter import EmailFilter
+    from dayfeel_auth.utils.login_events import LoginEventBuffer
+    from dayfeel_auth.utils.refresh_grace import RefreshGraceCache
+    from dayfeel_auth.utils.token_versions import TokenVersionCache
+    from loguru._logger import Logger
+
+
 # --- CODE ---
 class Container(TypedDict):
     """
     Structure for global application resources.
     """
-    config: Config
-    logger: Logger
-    users_repository: UsersRepository
-    auth_sessions_reposository: AuthSessionsRepository
+    config: 'Config'
+    logger: 'Logger'
+    replicas: 'ReplicaSet'
+    users_repository: 'UsersRepository'
+    auth_sessions_reposository: 'AuthSessionsRepositoryInterface'
+    service_clients_repository: 'ServiceClientsRepository'
+    token_versions: 'TokenVersionCache'
+    email_filter: 'EmailFilter'
+    cache_invalidation: Optional['CacheInvalidationListener']
+    refresh_grace: 'RefreshGraceCache'
+    health_monitor: 'HealthMonitor'
+    login_events: 'LoginEventBuffer'
@@ -3,8 +3,14 @@ Payload schemas for auth endpoints.
 """
 
 # --- IMPORTS ---
+from dayfeel_auth.utils.emails import normalize_email
 from pydantic import BaseModel
 from pydantic import EmailStr
+from pydantic import field_validator
+
+
+# --- TYPES ---
+from typing import Literal
 
 
 # --- CODE ---
@@ -15,9 +21,31 @@ class LoginPayload(BaseModel):
     email: EmailStr
     password: str
 
+    @field_validator('email')
+    @classmethod
+    def validate_email(cls, email: str) -> str:
+        """
+        Normalize email.
+
+        :param cls: class reference.
+        :param email: user email.
+
+        :returns: normalized email.
+        """
+        return normalize_email(email)
+
 
 class RefreshPayload(BaseModel):
     """
     Refresh token payload.
     """
     refresh_token: str
+
+
+class ClientCredentialsPayload(BaseModel):
+    """
+    Client-credentials token payload.
+    """
+    grant_type: Literal['client_credentials']
+    client_id: str
+    client_secret: str
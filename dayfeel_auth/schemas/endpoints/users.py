@@ -3,11 +3,24 @@ Payload schemas for user endpoints.
 """
 
 # --- IMPORTS ---
+from datetime import datetime
+from dayfeel_auth.enums.user_role import UserRole
+from dayfeel_auth.utils.breached_passwords import is_breached_password
+from dayfeel_auth.utils.emails import normalize_email
 from pydantic import BaseModel
 from pydantic import EmailStr
+from pydantic import Field
 from pydantic import field_validator
 
-import re
+
+# --- TYPES ---
+from typing import Literal
+from typing import Optional
+
+
+# --- GLOBALS ---
+# Characters accepted as special characters
+SPECIAL_CHARACTERS = frozenset('!@#$%^&*(),.?":{}|<>')
 
 
 # --- CODE ---
@@ -19,6 +32,19 @@ class RegisterPayload(BaseModel):
     password: str
     name: str
 
+    @field_validator('email')
+    @classmethod
+    def validate_email(cls, email: str) -> str:
+        """
+        Normalize email.
+
+        :param cls: class reference.
+        :param email: user email.
+
+        :returns: normalized email.
+        """
+        return normalize_email(email)
+
     @field_validator('password')
     @classmethod
     def validate_password(cls, password: str) -> str:
@@ -34,24 +60,49 @@ class RegisterPayload(BaseModel):
         if len(password) < 5:
             raise ValueError('Password must be at least 5 characters long!')
 
+        # character classes, collected in a single pass.
+        has_upper = has_lower = has_digit = has_special = has_space = False
+        for char in password:
+            has_upper = has_upper or 'A' <= char <= 'Z'
+            has_lower = has_lower or 'a' <= char <= 'z'
+            has_digit = has_digit or char.isdecimal()
+            has_special = has_special or char in SPECIAL_CHARACTERS
+            has_space = has_space or char.isspace()
+
         # uppercase.
-        if not re.search(r'[A-Z]', password):
+        if not has_upper:
             raise ValueError('Password must contain at least one uppercase letter!')
 
         # lowercase.
-        if not re.search(r'[a-z]', password):
+        if not has_lower:
             raise ValueError('Password must contain at least one lowercase letter!')
 
         # number.
-        if not re.search(r'\d', password):
+        if not has_digit:
             raise ValueError('Password must contain at least one number!')
 
         # special char.
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
+        if not has_special:
             raise ValueError('Password must contain at least one special character!')
 
         # no spaces.
-        if re.search(r'\s', password):
+        if has_space:
             raise ValueError('Password must not contain spaces!')
 
+        # known breached password.
+        if is_breached_password(password):
+            raise ValueError('Password has appeared in a data breach, please choose another one!')
+
         return password
+
+
+class ListUsersQuery(BaseModel):
+    """
+    Query parameters of the admin user listing.
+    """
+    order_by: Literal['id', 'created_at'] = 'id'
+    limit: int = Field(50, ge=1, le=500)
+    cursor: Optional[str] = None
+    role: Optional[UserRole] = None
+    last_login_from: Optional[datetime] = None
+    last_login_to: Optional[datetime] = None
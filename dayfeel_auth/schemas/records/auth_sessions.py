@@ -0,0 +1,19 @@
+"""
+Read-only authentication session records.
+"""
+
+# --- TYPES ---
+from datetime import datetime
+from typing import NamedTuple
+from uuid import UUID
+
+
+# --- CODE ---
+class AuthSessionRecord(NamedTuple):
+    """
+    Columns of an authentication session needed by the refresh endpoint.
+    """
+    jti: UUID
+    user_id: int
+    expires_at: datetime
+    revoked: bool
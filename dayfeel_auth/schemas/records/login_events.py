@@ -0,0 +1,20 @@
+"""
+Login event records.
+"""
+
+# --- TYPES ---
+from datetime import datetime
+from typing import NamedTuple
+from typing import Optional
+
+
+# --- CODE ---
+class LoginEventRecord(NamedTuple):
+    """
+    One login attempt, as buffered before it is written to the audit table.
+    """
+    occurred_at: datetime
+    user_id: Optional[int]
+    success: bool
+    ip_address: Optional[str]
+    user_agent: Optional[str]
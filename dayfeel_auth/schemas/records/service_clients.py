@@ -0,0 +1,18 @@
+"""
+Read-only service client records.
+"""
+
+# --- TYPES ---
+from typing import NamedTuple
+
+
+# --- CODE ---
+class ServiceClientRecord(NamedTuple):
+    """
+    Columns of a service client needed by the token endpoint.
+    """
+    id: int
+    client_id: str
+    secret_hash: str
+    name: str
+    active: bool
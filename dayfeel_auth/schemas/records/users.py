@@ -0,0 +1,37 @@
+"""
+Read-only user records.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from dayfeel_auth.enums.user_role import UserRole
+
+
+# --- TYPES ---
+from typing import NamedTuple
+from typing import Optional
+
+
+# --- CODE ---
+class UserRecord(NamedTuple):
+    """
+    Columns of a user needed by the auth endpoints.
+    """
+    id: int
+    email: str
+    password_hash: str
+    name: str
+    role: UserRole
+    token_version: int
+
+
+class UserSummaryRecord(NamedTuple):
+    """
+    Columns of a user shown in admin listings (never the password hash).
+    """
+    id: int
+    email: str
+    name: str
+    role: UserRole
+    last_login: Optional[datetime]
+    created_at: Optional[datetime]
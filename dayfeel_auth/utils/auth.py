@@ -4,47 +4,58 @@ JWT utility module.
 
 # --- IMPORTS ---
 from datetime import datetime
-from datetime import timedelta
 from datetime import timezone
 from dayfeel_auth.app import container
 from dayfeel_auth.err.invalid_token_error import InvalidTokenError
+from dayfeel_auth.utils.hs256 import get_codec
+from uuid import UUID
 from uuid import uuid4
 
-import jwt
+import time
 
 
 # --- TYPES ---
 from typing import Any
 from typing import Dict
+from typing import Optional
+from typing import Union
 
 
 # --- GLOBALS ---
-SECRET_KEY = container['config'].JWT_SECRET_KEY
-ACCESS_TOKEN_EXP_MIN = container['config'].JWT_ACCESS_TOKEN_EXP_MIN
-REFRESH_TOKEN_EXP_MIN = container['config'].JWT_REFRESH_TOKEN_EXP_MIN
-
+# Secret and expirations are read from the container config on each call (not at import time),
+# and PyJWT is imported lazily, so importing this module stays cheap.
 ISSUER = 'dayfeel-auth'
 ALGORITHM = 'HS256'
 
+# Claims every token must carry, and tolerated clock skew in seconds
+REQUIRED_CLAIMS = ('exp', 'iat', 'jti')
+LEEWAY_SEC = 5
+
+# Subject prefix of tokens issued to service clients (user tokens carry the numeric user id)
+CLIENT_SUBJECT_PREFIX = 'client:'
+
 
 # --- CODE ---
-def generate_access_token(user_id: int, email: str, name: str, role: str) -> Dict[str, Any]:
+def generate_access_token(user_id: Union[int, str], email: Optional[str], name: str, role: str,  # pylint: disable=R0913,R0917
+                          token_version: int, exp_min: Optional[int] = None) -> Dict[str, Any]:
     """
     Generate a JWT access token.
 
-    :param user_id: Unique identifier of the user.
-    :param email: User's email address.
+    :param user_id: Unique identifier of the user, or 'client:<client_id>' for a service client.
+    :param email: User's email address (None for a service client).
     :param name: User's name.
     :param role: User's role.
+    :param token_version: User's current token version.
+    :param exp_min: Token lifetime in minutes (defaults to JWT_ACCESS_TOKEN_EXP_MIN).
     
     :returns: Dict with the encoded token and associated claims.
     """
 
-    # Get the current UTC time
-    now = datetime.now(timezone.utc)
+    # Get the current UTC time (integer seconds, as written in the token)
+    now = int(time.time())
 
     # Access token expiration time
-    exp = now + timedelta(minutes=ACCESS_TOKEN_EXP_MIN)
+    exp = now + (container['config'].JWT_ACCESS_TOKEN_EXP_MIN if exp_min is None else exp_min) * 60
 
     # Build claims
     claims = {
@@ -57,10 +68,11 @@ def generate_access_token(user_id: int, email: str, name: str, role: str) -> Dic
         'name': name,
         'email': email,
         'role': role,
+        'ver': token_version,
     }
 
-    # Generate token
-    token = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    # Generate token (same bytes PyJWT would produce)
+    token = get_codec(container['config'].JWT_SECRET_KEY).encode(claims)
 
     # Log success
     container['logger'].info(f'Generated access token for user_id={user_id}')
@@ -69,20 +81,24 @@ def generate_access_token(user_id: int, email: str, name: str, role: str) -> Dic
     return {'token': token, 'claims': claims}
 
 
-def generate_refresh_token(user_id: int) -> Dict[str, Any]:
+def generate_refresh_token(user_id: int, token_version: int) -> Dict[str, Any]:
     """
     Generate a signed JWT used only for refreshing access tokens.
 
     :param user_id: Unique identifier of the user.
+    :param token_version: User's current token version.
     
-    :returns: Dict with the encoded token and associated claims.
+    :returns: Dict with the encoded token, associated claims, the jti as UUID and the expiration as datetime.
     """
 
-    # Get the current UTC time
-    now = datetime.now(timezone.utc)
+    # Get the current UTC time (integer seconds, as written in the token)
+    now = int(time.time())
+
+    # Unique token identifier (stored as a native UUID by the sessions table)
+    jti = uuid4()
 
     # Refresh token expiration time
-    exp = now + timedelta(minutes=REFRESH_TOKEN_EXP_MIN)
+    exp = now + container['config'].JWT_REFRESH_TOKEN_EXP_MIN * 60
 
     # Build claims
     claims = {
@@ -91,17 +107,18 @@ def generate_refresh_token(user_id: int) -> Dict[str, Any]:
         'exp': exp,
         'iat': now,
         'nbf': now,
-        'jti': str(uuid4()),
+        'jti': str(jti),
+        'ver': token_version,
     }
 
-    # Generate token
-    token = jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+    # Generate token (same bytes PyJWT would produce)
+    token = get_codec(container['config'].JWT_SECRET_KEY).encode(claims)
 
     # Log success
     container['logger'].info(f'Generated refresh token for user_id={user_id}')
 
     # Return payload
-    return {'token': token, 'claims': claims}
+    return {'token': token, 'claims': claims, 'jti': jti, 'expires_at': datetime.fromtimestamp(exp, timezone.utc)}
 
 
 def decode_token(token: str) -> Dict[str, Any]:
@@ -112,16 +129,63 @@ def decode_token(token: str) -> Dict[str, Any]:
     
     :returns: Dict with the decoded claims.
 
-    :raises InvalidTokenError: If the token is invalid, expired, missing required claims or any error in decoding.
+    :raises InvalidTokenError: If the token is invalid, expired, revoked, missing required claims or fails to decode.
+    """
+    # Decode and validate token on the fast path
+    decoded_token = get_codec(container['config'].JWT_SECRET_KEY).decode(token,
+                                                                        issuer=ISSUER,
+                                                                        required=REQUIRED_CLAIMS,
+                                                                        leeway=LEEWAY_SEC)
+
+    # If the fast path rejected the token: let PyJWT validate it and report why
+    if decoded_token is None:
+        decoded_token = decode_token_with_pyjwt(token)
+
+    # Get params of token
+    jti = decoded_token.get('jti')
+    sub = decoded_token.get('sub')
+
+    # If jti or sub not exist: raise error
+    if not jti or not sub:
+        raise InvalidTokenError('Invalid token')
+
+    # Get cached token versions (absent outside the running service)
+    token_versions = container.get('token_versions')
+
+    # If token was issued before the user's tokens were revoked: raise error
+    if token_versions is not None and sub.isdigit():
+        current_version = token_versions.get(int(sub))
+        if current_version is not None and decoded_token.get('ver', 0) < current_version:
+            raise InvalidTokenError('Revoked token')
+
+    # Log success
+    container['logger'].info(f'Decoded token jti={decoded_token.get("jti")} for user_id={decoded_token.get("sub")}')
+
+    # Return decoded claims
+    return decoded_token
+
+
+def decode_token_with_pyjwt(token: str) -> Dict[str, Any]:
+    """
+    Decode and validate a JWT token with PyJWT, mapping its errors.
+
+    :param token: Encoded JWT string to be decoded and verified.
+
+    :returns: Dict with the decoded claims.
+
+    :raises InvalidTokenError: If the token is invalid, expired, missing required claims or fails to decode.
     """
+    # Import PyJWT only when a token first needs it
+    import jwt  # pylint: disable=C0415
+
     try:
         # Decode and validate token
-        decoded_token = jwt.decode(token,
-                            SECRET_KEY,
-                            algorithms=[ALGORITHM],
-                            options={'require': ['exp', 'iat', 'jti']},
-                            issuer=ISSUER,
-                            leeway=5)
+        return jwt.decode(token,
+                          container['config'].JWT_SECRET_KEY,
+                          algorithms=[ALGORITHM],
+                          options={'require': list(REQUIRED_CLAIMS)},
+                          issuer=ISSUER,
+                          leeway=LEEWAY_SEC)
 
     # If token was expired: raise error
     except jwt.ExpiredSignatureError:
@@ -143,16 +207,20 @@ def decode_token(token: str) -> Dict[str, Any]:
     except Exception as e:
         raise InvalidTokenError(f'Failed to validate token: {e}') from e
 
-    # Get params of token
-    jti = decoded_token.get('jti')
-    sub = decoded_token.get('sub')
 
-    # If jti or sub not exist: raise error
-    if not jti or not sub:
-        raise InvalidTokenError('Invalid token')
+def parse_jti(jti: str) -> UUID:
+    """
+    Parse the "jti" claim of a decoded token.
 
-    # Log success
-    container['logger'].info(f'Decoded token jti={decoded_token.get("jti")} for user_id={decoded_token.get("sub")}')
+    :param jti: Token identifier as found in the claims.
 
-    # Return decoded claims
-    return decoded_token
+    :returns: Token identifier as UUID.
+
+    :raises InvalidTokenError: If the jti is not a UUID.
+    """
+    try:
+        return UUID(jti)
+
+    # If jti is not a UUID: raise error
+    except (TypeError, ValueError) as e:
+        raise InvalidTokenError(f'Invalid jti: {jti}') from e
@@ -0,0 +1,109 @@
+"""
+Small in-process Bloom filter.
+"""
+
+# --- IMPORTS ---
+from threading import Lock
+
+import hashlib
+import math
+
+
+# --- TYPES ---
+from typing import List
+
+
+# --- CODE ---
+class BloomFilter:
+    """
+    Thread-safe Bloom filter of strings.
+
+    Never answers "absent" for an added item; answers "present" for an item
+    that was never added with about 'error_rate' probability, as long as no
+    more than 'capacity' items were added.
+    """
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        """
+        Initializes an empty filter sized for its capacity.
+
+        :param capacity: Number of items the error rate is sized for.
+        :param error_rate: Target false positive probability.
+
+        :returns: None.
+        """
+        # Optimal sizes: m = -n ln(p) / ln(2)^2 bits and k = m / n ln(2) hashes
+        self.__size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.__hashes = max(1, round(self.__size / capacity * math.log(2)))
+        self.__bits = bytearray((self.__size + 7) // 8)
+        self.__count = 0
+
+        # Setting a bit is a read-modify-write: concurrent adds must not lose each other's bits
+        self.__lock = Lock()
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of distinct items added (items colliding with earlier ones are not counted).
+        """
+        return self.__count
+
+
+    def __contains__(self, item: str) -> bool:
+        """
+        Tell whether an item may have been added.
+
+        :param item: Item to look up.
+
+        :returns: False if the item was never added, True if it probably was.
+        """
+        return all(self.__bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(item))
+
+
+    @property
+    def size_bytes(self) -> int:
+        """
+        Returns the memory used by the bit array.
+        """
+        return len(self.__bits)
+
+
+    def add(self, item: str) -> None:
+        """
+        Add an item.
+
+        :param item: Item to add.
+
+        :returns: None.
+        """
+        positions = self.__positions(item)
+        with self.__lock:
+
+            # Set the item's bits
+            added = False
+            for position in positions:
+                mask = 1 << (position & 7)
+                if not self.__bits[position >> 3] & mask:
+                    self.__bits[position >> 3] |= mask
+                    added = True
+
+            # Count only items not already present, so adding an item twice counts it once
+            if added:
+                self.__count += 1
+
+
+# --- Private helpers ---
+    def __positions(self, item: str) -> List[int]:
+        """
+        Compute the bit positions of an item.
+
+        Double hashing: two 64-bit halves of one BLAKE2b digest generate all
+        'k' positions, so an item is hashed once whatever 'k' is.
+
+        :param item: Item to hash.
+
+        :returns: Bit positions.
+        """
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.__size for i in range(self.__hashes)]
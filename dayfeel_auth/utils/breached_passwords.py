@@ -0,0 +1,127 @@
+"""
+Offline breached-password screening.
+
+Passwords are checked against a local file of breached-password SHA-1 hash
+prefixes (e.g. built from the offline HIBP dataset with
+'python -m dayfeel_auth.cli.breached_passwords'). The file is a sorted array of
+fixed-width prefixes, memory-mapped and binary-searched: a lookup touches about
+log2(n) pages, so it costs microseconds and only the pages it reads stay
+resident, even for a multi-gigabyte list.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from functools import lru_cache
+
+import hashlib
+import mmap
+import os
+
+
+# --- TYPES ---
+from typing import Optional
+
+
+# --- CODE ---
+class BreachedPasswords:
+    """
+    Memory-mapped, sorted list of breached-password SHA-1 hash prefixes.
+    """
+
+    def __init__(self, path: str, prefix_bytes: int) -> None:
+        """
+        Map the file.
+
+        :param path: Path of the prefix file.
+        :param prefix_bytes: Bytes of SHA-1 kept per password.
+
+        :raises ValueError: If the file size is not a multiple of prefix_bytes.
+
+        :returns: None.
+        """
+        self.__prefix_bytes = prefix_bytes
+
+        # Map file read-only
+        with open(path, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            if size % prefix_bytes:
+                raise ValueError(f'{path} is not a list of {prefix_bytes}-byte prefixes')
+            self.__map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+        # Lookups jump around the file: do not read ahead
+        if hasattr(self.__map, 'madvise') and hasattr(mmap, 'MADV_RANDOM'):
+            self.__map.madvise(mmap.MADV_RANDOM)
+
+        self.__count = size // prefix_bytes
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of prefixes in the list.
+        """
+        return self.__count
+
+
+    def contains(self, password: str) -> bool:
+        """
+        Tell whether a password is in the list.
+
+        :param password: Plain text password.
+
+        :returns: True if its hash prefix is listed.
+        """
+        # Hash password
+        prefix = hashlib.sha1(password.encode('utf-8'), usedforsecurity=False).digest()[:self.__prefix_bytes]
+
+        # Binary search for the first prefix >= ours
+        width = self.__prefix_bytes
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__map[middle * width:(middle + 1) * width] < prefix:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low < self.__count and self.__map[low * width:(low + 1) * width] == prefix
+
+
+@lru_cache(maxsize=1)
+def load_breached_passwords(path: str, prefix_bytes: int) -> BreachedPasswords:
+    """
+    Map a prefix file once per process.
+
+    :param path: Path of the prefix file.
+    :param prefix_bytes: Bytes of SHA-1 kept per password.
+
+    :returns: Mapped list.
+    """
+    return BreachedPasswords(path, prefix_bytes)
+
+
+def get_breached_passwords() -> Optional[BreachedPasswords]:
+    """
+    Get the configured breached-password list.
+
+    :returns: Mapped list, or None when BREACHED_PASSWORDS_PATH is not set.
+    """
+    # Get config
+    config = container['config']
+
+    # If no list is configured: screening is disabled
+    if not config.BREACHED_PASSWORDS_PATH:
+        return None
+
+    return load_breached_passwords(config.BREACHED_PASSWORDS_PATH, config.BREACHED_PASSWORDS_PREFIX_BYTES)
+
+
+def is_breached_password(password: str) -> bool:
+    """
+    Tell whether a password is known to be breached.
+
+    :param password: Plain text password.
+
+    :returns: True if listed, False if not listed or screening is disabled.
+    """
+    breached_passwords = get_breached_passwords()
+    return breached_passwords is not None and breached_passwords.contains(password)
@@ -0,0 +1,249 @@
+"""
+Cross-worker cache invalidation.
+
+Each worker keeps in-process caches (token versions, the email filter) that
+another worker or replica can make stale: an admin revoking a user's tokens
+on one worker used to leave the others accepting them until their cached
+version expired. Repositories publish change events with Postgres NOTIFY
+('dayfeel_auth.db.sqlalchemy.setup.notifications'), and every worker runs a
+listener thread on a dedicated connection that applies them to its caches
+within milliseconds of the commit.
+
+Notifications sent while the listener is disconnected are lost, so after
+every reconnection the caches are flushed and rebuild from the database.
+Reconnection backs off exponentially, and an idle connection is pinged so a
+silently dropped connection is noticed.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.setup.notifications import CHANNEL
+from sqlalchemy import Engine
+from threading import Event
+from threading import Thread
+
+import json
+import select
+import time
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+
+
+# --- GLOBALS ---
+Handler = Callable[[Dict[str, Any]], None]
+
+# Seconds between checks for notifications (and for a stop request)
+POLL_INTERVAL_SEC = 1.0
+
+# Idle seconds before the connection is pinged
+HEARTBEAT_INTERVAL_SEC = 15.0
+
+# First reconnection delay, doubled after each failed attempt
+RECONNECT_MIN_SEC = 0.5
+
+
+# --- CODE ---
+class CacheInvalidationListener:
+    """
+    Listens for cache invalidation events and applies them to this worker's caches.
+    """
+
+    def __init__(self, engine: Engine, handlers: Dict[str, Handler], on_gap: Callable[[], None],
+                 reconnect_max_sec: float) -> None:
+        """
+        Initializes the listener.
+
+        :param engine: SQLAlchemy engine of the primary database (Postgres only).
+        :param handlers: Function applying each event, by event name.
+        :param on_gap: Function flushing every cache, called when events may have been missed.
+        :param reconnect_max_sec: Longest delay between reconnection attempts.
+
+        :returns: None.
+        """
+        self.__engine = engine
+        self.__handlers = handlers
+        self.__on_gap = on_gap
+        self.__reconnect_max_sec = reconnect_max_sec
+        self.__connected_since: Optional[float] = None
+
+        self.__stop = Event()
+        self.__thread: Optional[Thread] = None
+
+
+    @property
+    def connected(self) -> bool:
+        """
+        Returns whether the listener is receiving events.
+        """
+        return self.__connected_since is not None
+
+
+    @property
+    def connected_since(self) -> Optional[float]:
+        """
+        Returns when ('time.monotonic') the listener subscribed, or None if disconnected.
+
+        Every change committed after that time is notified, so a cache read
+        from the database after it and kept up to date by events is current.
+        """
+        return self.__connected_since
+
+
+    def start(self) -> None:
+        """
+        Start the listener thread.
+
+        :returns: None.
+        """
+        self.__thread = Thread(target=self.__run, name='cache-invalidation', daemon=True)
+        self.__thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Stop the listener thread and close its connection.
+
+        :returns: None.
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+
+# --- Private helpers ---
+    def __run(self) -> None:
+        """
+        Listener loop: connect, listen until the connection fails, flush caches, reconnect.
+
+        :returns: None.
+        """
+        delay = RECONNECT_MIN_SEC
+        reconnecting = False
+        while not self.__stop.is_set():
+
+            # Open a dedicated connection and subscribe
+            try:
+                connection = self.__connect()
+
+            # If the database is unavailable: retry later, backing off
+            except Exception as e:  # pylint: disable=W0718
+                container['logger'].warning(f'Cache invalidation listener could not connect, '
+                                            f'retrying in {delay:.1f}s: {e}')
+                self.__stop.wait(delay)
+                delay = min(delay * 2, self.__reconnect_max_sec)
+                continue
+
+            # Events published while disconnected were lost: start over from the database
+            self.__connected_since = time.monotonic()
+            delay = RECONNECT_MIN_SEC
+            if reconnecting:
+                self.__on_gap()
+                container['logger'].warning('Cache invalidation listener reconnected, flushed caches')
+            reconnecting = True
+
+            try:
+                self.__listen(connection)
+
+            # If the connection failed: flush caches and reconnect
+            except Exception as e:  # pylint: disable=W0718
+                container['logger'].warning(f'Cache invalidation listener lost its connection: {e}')
+
+            finally:
+                self.__connected_since = None
+                self.__close(connection)
+
+
+    def __connect(self) -> Any:
+        """
+        Open a connection outside the pool, in autocommit mode, listening on the channel.
+
+        :returns: Driver (psycopg2) connection.
+        """
+        # Take a connection out of the pool for good: it stays busy listening
+        # (a detached connection has no pool record, so it only exposes its DBAPI connection)
+        pool_connection = self.__engine.raw_connection()
+        pool_connection.detach()
+        connection = pool_connection.dbapi_connection
+
+        try:
+            # Notifications are only delivered outside transactions
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            return connection
+
+        # If subscribing failed: do not leak the connection
+        except Exception:
+            self.__close(connection)
+            raise
+
+
+    def __listen(self, connection: Any) -> None:
+        """
+        Apply events as they arrive, until stopped or the connection fails.
+
+        :param connection: Listening connection.
+
+        :returns: None.
+        """
+        last_activity = time.monotonic()
+        while not self.__stop.is_set():
+
+            # Wait for the socket to become readable
+            readable, _, _ = select.select([connection], [], [], POLL_INTERVAL_SEC)
+
+            # If idle for a while: ping, so a dead connection raises instead of staying silent
+            if not readable:
+                if time.monotonic() - last_activity >= HEARTBEAT_INTERVAL_SEC:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                    last_activity = time.monotonic()
+                continue
+
+            # Read notifications and apply them in commit order
+            connection.poll()
+            last_activity = time.monotonic()
+            while connection.notifies:
+                self.__dispatch(connection.notifies.pop(0).payload)
+
+
+    def __dispatch(self, payload: str) -> None:
+        """
+        Apply one event.
+
+        :param payload: JSON payload of the notification.
+
+        :returns: None.
+        """
+        try:
+            event = json.loads(payload)
+            handler = self.__handlers.get(event.get('event'))
+            if handler is not None:
+                handler(event)
+
+        # If the event cannot be applied: flush caches rather than keep a possibly stale entry
+        except Exception as e:  # pylint: disable=W0718
+            container['logger'].warning(f'Failed to apply cache invalidation event {payload!r}, flushing caches: {e}')
+            self.__on_gap()
+
+
+    @staticmethod
+    def __close(connection: Any) -> None:
+        """
+        Close a listening connection, ignoring errors of an already broken one.
+
+        :param connection: Listening connection.
+
+        :returns: None.
+        """
+        try:
+            connection.close()
+
+        # If the connection is already broken: nothing left to close
+        except Exception:  # pylint: disable=W0718
+            pass
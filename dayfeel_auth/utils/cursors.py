@@ -0,0 +1,54 @@
+"""
+Opaque pagination cursors.
+
+A cursor carries the sort key of the last row of a page, so the next page
+starts right after it (keyset pagination). Every sort key ends with the
+integer row id, which breaks ties. It is base64url-encoded JSON: clients
+must pass it back unchanged and never build one themselves.
+"""
+
+# --- IMPORTS ---
+import base64
+import binascii
+import json
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Dict
+
+
+# --- CODE ---
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Encode a cursor.
+
+    :param values: JSON-serializable cursor values.
+
+    :returns: Opaque cursor string.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor.
+
+    :param cursor: Opaque cursor string.
+
+    :raises ValueError: If the cursor is malformed, or has no integer 'id'.
+
+    :returns: Cursor values.
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+
+    # If cursor is not base64 JSON: raise error
+    except (ValueError, binascii.Error) as e:
+        raise ValueError('Malformed cursor') from e
+
+    # If cursor is not an object with an integer id: raise error (never let it reach the query)
+    if not isinstance(values, dict) or type(values.get('id')) is not int:  # pylint: disable=C0123
+        raise ValueError('Malformed cursor')
+
+    return values
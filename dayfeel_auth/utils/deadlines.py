@@ -0,0 +1,36 @@
+"""
+Per-request deadlines.
+
+The deadline middleware stores the request deadline in a context variable, so
+repository calls made while serving the request (directly or from the thread
+pool, which copies the context) can bound their database work by the time left.
+Outside a request there is no deadline.
+"""
+
+# --- IMPORTS ---
+from contextvars import ContextVar
+
+import time
+
+
+# --- TYPES ---
+from typing import Optional
+
+
+# --- GLOBALS ---
+# Monotonic time the current request must finish by, or None
+REQUEST_DEADLINE: ContextVar[Optional[float]] = ContextVar('request_deadline', default=None)
+
+
+# --- CODE ---
+def remaining_sec() -> Optional[float]:
+    """
+    Seconds left before the current request deadline.
+
+    :returns: Remaining seconds (zero or negative once exceeded), or None without deadline.
+    """
+    deadline = REQUEST_DEADLINE.get()
+    if deadline is None:
+        return None
+
+    return deadline - time.monotonic()
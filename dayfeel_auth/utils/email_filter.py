@@ -0,0 +1,241 @@
+"""
+Negative lookup filter of registered emails.
+
+Under credential stuffing most login attempts are for emails that do not
+exist, and each one used to cost a database round trip. Every worker keeps a
+Bloom filter of the normalized emails of all users: an email the filter has
+never seen is certainly unknown and is rejected without touching the
+database, while a hit (a real user, or a false positive about 'error_rate' of
+the time) goes on to the usual lookup.
+
+A background thread loads the filter at startup, paging through users by id,
+then reads the users added since every few seconds. Users registered through
+this worker are added right away, users registered through another worker
+through cache invalidation events. A miss is only trusted while the filter is
+current: the invalidation listener has been connected since before the start
+of the last full read, and no event was missed since. Otherwise (still
+loading, no listener, listener down, event lost) every email "may exist" and
+is looked up in the database, so a stale filter never locks a user out.
+Periodic reads cannot guarantee that on their own: ids are allocated before
+commit, so a user committed late can land below the highest id already read.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
+from dayfeel_auth.utils.bloom_filter import BloomFilter
+from dayfeel_auth.utils.cache_invalidation import CacheInvalidationListener
+from dayfeel_auth.utils.emails import normalize_email
+from threading import Event
+from threading import Thread
+
+import time
+
+
+# --- TYPES ---
+from typing import Optional
+
+
+# --- GLOBALS ---
+# Users read per round trip while loading
+LOAD_BATCH_SIZE = 10_000
+
+# Ids re-read on each refresh, for users committed late that the listener also missed
+REFRESH_OVERLAP_IDS = 256
+
+
+# --- CODE ---
+class EmailFilter:
+    """
+    Bloom filter of registered emails, kept up to date by a background thread.
+    """
+
+    def __init__(self, users_repository: UsersRepository, capacity: int, error_rate: float,
+                 refresh_interval_sec: float) -> None:
+        """
+        Initializes the filter.
+
+        :param users_repository: Repository emails are read from.
+        :param capacity: Number of users the filter is sized for (0 disables it).
+        :param error_rate: Share of unknown emails still looked up in the database.
+        :param refresh_interval_sec: Seconds between reads of newly registered users.
+
+        :returns: None.
+        """
+        self.__users_repository = users_repository
+        self.__capacity = capacity
+        self.__refresh_interval_sec = refresh_interval_sec
+        self.__filter = BloomFilter(capacity=capacity, error_rate=error_rate) if capacity > 0 else None
+
+        # Highest user id read, and whether every user up to it was loaded
+        self.__last_id = 0
+        self.__loaded = False
+
+        # Listener keeping the filter current, start ('time.monotonic') of the last complete full read,
+        # and when an event was last missed
+        self.__listener: Optional[CacheInvalidationListener] = None
+        self.__scan_started_at: Optional[float] = None
+        self.__invalidated_at = 0.0
+
+        self.__stop = Event()
+        self.__thread: Optional[Thread] = None
+
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Returns whether the filter knows every registered email.
+        """
+        return self.__loaded
+
+
+    @property
+    def current(self) -> bool:
+        """
+        Returns whether the filter is known to hold every registered email, so a miss can be trusted.
+        """
+        listening_since = self.__listening_since()
+        return (listening_since is not None and self.__scan_started_at is not None
+                and self.__scan_started_at >= listening_since)
+
+
+    def follow(self, listener: CacheInvalidationListener) -> None:
+        """
+        Trust misses while a cache invalidation listener delivers new users' emails.
+
+        :param listener: Listener applying 'user_created' events to this filter.
+
+        :returns: None.
+        """
+        self.__listener = listener
+
+
+    def invalidate(self) -> None:
+        """
+        Stop trusting misses until the next full read, after an event may have been missed.
+
+        :returns: None.
+        """
+        self.__invalidated_at = time.monotonic()
+
+
+    def start(self) -> None:
+        """
+        Start the loader thread.
+
+        :returns: None.
+        """
+        if self.__filter is not None:
+            self.__thread = Thread(target=self.__run, name='email-filter', daemon=True)
+            self.__thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Stop the loader thread.
+
+        :returns: None.
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+
+
+    def might_exist(self, email: str) -> bool:
+        """
+        Tell whether a user may be registered with an email.
+
+        :param email: Email address.
+
+        :returns: False if no user has this email, True if one may have it (or the filter is not current).
+        """
+        if self.__filter is None or not self.current:
+            return True
+        return normalize_email(email) in self.__filter
+
+
+    def add(self, email: str) -> None:
+        """
+        Record the email of a newly registered user.
+
+        :param email: Email address.
+
+        :returns: None.
+        """
+        if self.__filter is not None:
+            self.__filter.add(normalize_email(email))
+
+
+# --- Private helpers ---
+    def __run(self) -> None:
+        """
+        Loader loop: load every user, then read new users until stopped.
+
+        :returns: None.
+        """
+        while not self.__stop.is_set():
+            try:
+                self.__read_new_users()
+
+            # If the database is unavailable: keep the filter as is (filters not current let everything through)
+            except Exception as e:  # pylint: disable=W0718
+                container['logger'].warning(f'Failed to read emails into the email filter: {e}')
+
+            # Wait for the next refresh
+            if self.__stop.wait(self.__refresh_interval_sec):
+                break
+
+
+    def __read_new_users(self) -> None:
+        """
+        Add the emails of users past the last id read, or of every user if the filter is not current.
+
+        :returns: None.
+        """
+        start = time.perf_counter()
+        scan_started_at = time.monotonic()
+
+        # If listening but not current (first load, reconnection, missed event): read every user again,
+        # events cover whatever is committed from now on
+        full_scan = not self.__loaded or (self.__listening_since() is not None and not self.current)
+        after_id = 0 if full_scan else max(0, self.__last_id - REFRESH_OVERLAP_IDS)
+
+        # Read users one id range at a time
+        while not self.__stop.is_set():
+            rows = self.__users_repository.get_emails_after(after_id=after_id, limit=LOAD_BATCH_SIZE)
+            for _, email in rows:
+                self.__filter.add(normalize_email(email))
+            if rows:
+                after_id = rows[-1][0]
+                self.__last_id = max(self.__last_id, after_id)
+            if len(rows) < LOAD_BATCH_SIZE:
+                break
+
+        # If only recent users were read, or the read was interrupted: the filter is no more current than before
+        if self.__stop.is_set() or not full_scan:
+            return
+        self.__scan_started_at = scan_started_at
+
+        # First complete pass: log the size of the filter
+        if not self.__loaded:
+            self.__loaded = True
+            container['logger'].info(f'Email filter loaded {len(self.__filter):,} emails '
+                                     f'({self.__filter.size_bytes / 1024 / 1024:,.1f}MiB) '
+                                     f'in {time.perf_counter() - start:.1f}s')
+
+            # If more users than the filter was sized for: say so, false positives grow quickly past it
+            if len(self.__filter) > self.__capacity:
+                container['logger'].warning(f'Email filter holds {len(self.__filter):,} emails but is sized for '
+                                            f'{self.__capacity:,}: raise EMAIL_FILTER_CAPACITY')
+
+
+    def __listening_since(self) -> Optional[float]:
+        """
+        Get since when every new user's email reaches the filter as an event.
+
+        :returns: Time ('time.monotonic') the listener subscribed or an event was last missed, None if not listening.
+        """
+        connected_since = self.__listener.connected_since if self.__listener is not None else None
+        if connected_since is None:
+            return None
+        return max(connected_since, self.__invalidated_at)
@@ -0,0 +1,17 @@
+"""
+Email utility module.
+"""
+
+
+# --- CODE ---
+def normalize_email(email: str) -> str:
+    """
+    Normalize an email address for storage and lookups.
+
+    Emails are compared case-insensitively, backed by the unique index on lower(email).
+
+    :param email: Email address.
+
+    :returns: Normalized email address.
+    """
+    return email.strip().lower()
@@ -0,0 +1,97 @@
+"""
+Export formatting.
+
+Turns batches of rows into NDJSON or CSV chunks, one chunk per batch, and
+reports throughput once the export is done.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+import csv
+import io
+import json
+import time
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Literal
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+
+# --- GLOBALS ---
+ExportFormat = Literal['ndjson', 'csv']
+
+# Content type per format
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+# --- CODE ---
+def export_value(value: Any) -> Any:
+    """
+    Convert a column value to its exported form.
+
+    :param value: Column value.
+
+    :returns: JSON/CSV friendly value.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+
+    return value
+
+
+def format_batches(
+    batches: Iterable[Sequence[Tuple]],
+    columns: List[str],
+    export_format: ExportFormat,
+    on_done: Optional[Callable[[int, float], None]] = None
+) -> Iterator[str]:
+    """
+    Format batches of rows, yielding one text chunk per batch.
+
+    :param batches: Batches of rows, in column order.
+    :param columns: Column names.
+    :param export_format: 'ndjson' (one JSON object per line) or 'csv' (with header).
+    :param on_done: Called with the number of rows and elapsed seconds once every batch is formatted.
+
+    :returns: Iterator over text chunks.
+    """
+    start = time.perf_counter()
+    rows = 0
+
+    # CSV starts with a header line
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(columns)
+        yield buffer.getvalue()
+
+    for batch in batches:
+
+        # Format batch
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows([export_value(value) for value in row] for row in batch)
+            yield buffer.getvalue()
+        else:
+            yield ''.join(json.dumps(dict(zip(columns, map(export_value, row))), separators=(',', ':')) + '\n'
+                          for row in batch)
+
+        rows += len(batch)
+
+    # Report throughput
+    if on_done is not None:
+        on_done(rows, time.perf_counter() - start)
@@ -0,0 +1,68 @@
+"""
+Thread-safe counter of in-flight operations.
+"""
+
+# --- IMPORTS ---
+from threading import Lock
+
+
+# --- TYPES ---
+from types import TracebackType
+from typing import Optional
+from typing import Type
+
+
+# --- CODE ---
+class InFlightCounter:
+    """
+    Counts operations currently running inside its context.
+
+    Usage:
+        with counter:
+            # counter.value includes this operation
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the counter.
+
+        :returns: None.
+        """
+        self.__lock = Lock()
+        self.__value = 0
+
+
+    def __enter__(self) -> 'InFlightCounter':
+        """
+        Count a new operation.
+
+        :returns: The counter itself.
+        """
+        with self.__lock:
+            self.__value += 1
+        return self
+
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],  # pylint: disable=C0103
+        exc_tb: Optional[TracebackType]  # pylint: disable=C0103
+    ) -> None:
+        """
+        Uncount a finished operation.
+
+        :param exc_type: Type of the exception raised, if any.
+        :param exc_val: Value of the exception raised, if any.
+        :param exc_tb: Traceback object of the exception raised, if any.
+        """
+        with self.__lock:
+            self.__value -= 1
+
+
+    @property
+    def value(self) -> int:
+        """
+        Returns the number of operations currently in flight.
+        """
+        return self.__value
@@ -0,0 +1,209 @@
+"""
+Buffered login audit trail.
+
+Writing an audit row inside '/auth/login' would add a commit to the hottest
+endpoint, so login attempts are appended to a bounded in-memory buffer instead
+and a background thread writes them with multi-row inserts every few hundred
+milliseconds. Recording never blocks: when the buffer is full (or a write
+fails) events are dropped and counted, and the drops are logged.
+"""
+
+# --- IMPORTS ---
+from collections import deque
+from datetime import datetime
+from datetime import timezone
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.repository.login_events import LoginEventsRepository
+from dayfeel_auth.schemas.records.login_events import LoginEventRecord
+from fastapi import Request
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+import time
+
+
+# --- TYPES ---
+from typing import Deque
+from typing import Optional
+
+
+# --- GLOBALS ---
+# Seconds between checks that upcoming monthly partitions exist
+PARTITION_CHECK_INTERVAL_SEC = 3600.0
+
+# Longest user agent stored
+USER_AGENT_MAX_LENGTH = 512
+
+
+# --- CODE ---
+class LoginEventBuffer:
+    """
+    Bounded buffer of login events, flushed to the database by a background thread.
+    """
+
+    def __init__(self, repository: LoginEventsRepository, capacity: int, flush_interval_ms: float,
+                 max_batch: int, partitions_ahead: int) -> None:
+        """
+        Initializes the buffer.
+
+        :param repository: Repository events are written to.
+        :param capacity: Maximum buffered events (0 disables recording).
+        :param flush_interval_ms: Milliseconds between flushes.
+        :param max_batch: Maximum events per multi-row insert.
+        :param partitions_ahead: Future monthly partitions kept created.
+
+        :returns: None.
+        """
+        self.__repository = repository
+        self.__capacity = capacity
+        self.__flush_interval_sec = flush_interval_ms / 1000
+        self.__max_batch = max_batch
+        self.__partitions_ahead = partitions_ahead
+
+        # Pending events and drop counters
+        self.__events: Deque[LoginEventRecord] = deque()
+        self.__lock = Lock()
+        self.__dropped = 0
+        self.__reported_dropped = 0
+
+        self.__stop = Event()
+        self.__thread: Optional[Thread] = None
+
+
+    @property
+    def dropped(self) -> int:
+        """
+        Returns the number of events dropped since start.
+        """
+        return self.__dropped
+
+
+    def start(self) -> None:
+        """
+        Start the flusher thread.
+
+        :returns: None.
+        """
+        if self.__capacity > 0:
+            self.__thread = Thread(target=self.__run, name='login-events', daemon=True)
+            self.__thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Stop the flusher thread and write the remaining events.
+
+        :returns: None.
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+        self.flush()
+
+
+    def record(self, event: LoginEventRecord) -> None:
+        """
+        Buffer a login event without blocking.
+
+        :param event: Login event.
+
+        :returns: None.
+        """
+        # If recording is disabled: ignore event
+        if self.__capacity <= 0:
+            return
+
+        with self.__lock:
+
+            # If the buffer is full: drop event
+            if len(self.__events) >= self.__capacity:
+                self.__dropped += 1
+                return
+
+            self.__events.append(event)
+
+
+    def flush(self) -> None:
+        """
+        Write every buffered event, in batches of at most 'max_batch'.
+
+        :returns: None.
+        """
+        # Take buffered events
+        with self.__lock:
+            events, self.__events = self.__events, deque()
+
+        # Write them in multi-row inserts
+        while events:
+            batch = [events.popleft() for _ in range(min(self.__max_batch, len(events)))]
+            try:
+                self.__repository.insert_events(batch)
+
+            # If the write failed: drop batch rather than hold logins back
+            except Exception as e:  # pylint: disable=W0718
+                container['logger'].warning(f'Failed to write {len(batch)} login events: {e}')
+                with self.__lock:
+                    self.__dropped += len(batch)
+
+        # Report new drops
+        dropped = self.__dropped
+        if dropped > self.__reported_dropped:
+            container['logger'].warning(f'Dropped {dropped - self.__reported_dropped} login events '
+                                        f'({dropped} since start)')
+            self.__reported_dropped = dropped
+
+
+# --- Private helpers ---
+    def __run(self) -> None:
+        """
+        Flusher loop, runs until stopped.
+
+        :returns: None.
+        """
+        next_partition_check = 0.0
+        while not self.__stop.is_set():
+
+            # Keep upcoming monthly partitions created
+            if time.monotonic() >= next_partition_check:
+                next_partition_check = time.monotonic() + PARTITION_CHECK_INTERVAL_SEC
+                self.__ensure_partitions()
+
+            # Wait for the next flush
+            if self.__stop.wait(self.__flush_interval_sec):
+                break
+
+            self.flush()
+
+
+    def __ensure_partitions(self) -> None:
+        """
+        Create missing monthly partitions, logging failures.
+
+        :returns: None.
+        """
+        try:
+            self.__repository.ensure_partitions(now=datetime.now(timezone.utc), months_ahead=self.__partitions_ahead)
+
+        # If creation failed: events still land in the default partition
+        except Exception as e:  # pylint: disable=W0718
+            container['logger'].warning(f'Failed to create login event partitions: {e}')
+
+
+def record_login_attempt(request: Request, user_id: Optional[int], success: bool) -> None:
+    """
+    Buffer a login attempt made by a request.
+
+    :param request: Login request (client address and user agent are recorded).
+    :param user_id: User's unique identificator, or None if the email is unknown.
+    :param success: Whether the credentials were accepted.
+
+    :returns: None.
+    """
+    user_agent = request.headers.get('user-agent')
+    container['login_events'].record(LoginEventRecord(occurred_at=datetime.now(timezone.utc),
+                                                      user_id=user_id,
+                                                      success=success,
+                                                      ip_address=request.client.host if request.client else None,
+                                                      user_agent=user_agent[:USER_AGENT_MAX_LENGTH]
+                                                      if user_agent else None))
@@ -0,0 +1,97 @@
+"""
+Refresh token grace window.
+
+Clients often send the same refresh token twice (retries after a timeout,
+several tabs refreshing at once). Refresh tokens are single use, so the second
+call used to fail with 'Refresh token revoked' and force a full login. For a
+short window after a rotation, the token pair issued for a 'jti' is kept in
+memory and handed out again, and duplicates that arrive while the rotation is
+still running wait for it instead of racing it. The window is per worker
+process: a duplicate routed to another worker is still rejected.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.utils.ttl_cache import TTLCache
+from uuid import UUID
+
+import asyncio
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+
+
+# --- GLOBALS ---
+TokenPair = Dict[str, Any]
+
+
+# --- CODE ---
+class RefreshGraceCache:
+    """
+    Coalesces rotations of the same refresh token and replays their result for a short window.
+    """
+
+    def __init__(self, grace_sec: float, max_size: int) -> None:
+        """
+        Initializes the cache.
+
+        :param grace_sec: Seconds a rotated token keeps returning the same pair (0 disables the window).
+        :param max_size: Maximum number of rotations remembered.
+
+        :returns: None.
+        """
+        self.__grace_sec = grace_sec
+        self.__issued: TTLCache[UUID, TokenPair] = TTLCache(ttl_sec=grace_sec, max_size=max_size)
+
+        # Rotations running on this worker's event loop
+        self.__in_flight: Dict[UUID, 'asyncio.Future[TokenPair]'] = {}
+
+
+    async def rotate(self, jti: UUID, rotation: Callable[[], Awaitable[TokenPair]]) -> TokenPair:
+        """
+        Rotate a refresh token once, sharing the result with duplicate requests.
+
+        :param jti: Unique JWT identifier of the refresh token.
+        :param rotation: Coroutine function revoking the token and issuing a new pair.
+
+        :raises Exception: Whatever the rotation raised, for the request running it and every duplicate.
+
+        :returns: Token pair issued for this jti.
+        """
+        # If the token was just rotated: replay the pair it got
+        issued = self.__issued.get(jti)
+        if issued is not None:
+            return issued
+
+        # If the token is being rotated: wait for that rotation
+        in_flight = self.__in_flight.get(jti)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        # Rotate the token, letting duplicates wait on our result
+        future: 'asyncio.Future[TokenPair]' = asyncio.get_running_loop().create_future()
+        self.__in_flight[jti] = future
+        try:
+            issued = await rotation()
+
+        # If the rotation failed: fail duplicates the same way
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when no duplicate is waiting
+            raise
+
+        # Remember the pair for the grace window and hand it to duplicates
+        else:
+            if self.__grace_sec > 0:
+                self.__issued.set(jti, issued)
+            future.set_result(issued)
+            return issued
+
+        # If the rotation was cancelled: release duplicates rather than leave them waiting
+        finally:
+            del self.__in_flight[jti]
+            if not future.done():
+                future.cancel()
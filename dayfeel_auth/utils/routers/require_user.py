@@ -0,0 +1,42 @@
+"""
+Dependency to restrict FastAPI routes to authenticated users.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.utils.auth import CLIENT_SUBJECT_PREFIX
+from dayfeel_auth.utils.auth import decode_token
+from dayfeel_auth.utils.routers.require_admin import OAUTH2_SCHEME
+from fastapi import Depends
+from fastapi import HTTPException
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Dict
+
+
+# --- code ---
+def require_user(token: str = Depends(OAUTH2_SCHEME)) -> Dict[str, Any]:
+    """
+    Restrict route access to users holding a valid access token.
+
+    :param token: JWT access token extracted from the Authorization header.
+
+    :returns: Decoded token payload.
+
+    :raises HTTPException 401: If the token is not an access token.
+    :raises HTTPException 403: If the token was issued to a service client.
+    """
+    # Decoded JWT token
+    decoded_token = decode_token(token)
+
+    # Only access tokens carry a role: raise 'HTTP' Error
+    if decoded_token.get("role") is None:
+        raise HTTPException(status_code=401, detail="Access token required")
+
+    # Service client tokens have no user behind them: raise 'HTTP' Error
+    if decoded_token.get("sub", "").startswith(CLIENT_SUBJECT_PREFIX):
+        raise HTTPException(status_code=403, detail="Users only")
+
+    # Return decoded token
+    return decoded_token
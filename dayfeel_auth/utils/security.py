@@ -1,23 +1,59 @@
 """
 Password hashing using Argon2id.
+
+Request handlers hash through 'hash_password_async' / 'verify_password_async',
+which run Argon2 on a dedicated pool of PASSWORD_HASHING_THREADS threads: the
+event loop keeps serving other requests meanwhile, the database calls sharing
+FastAPI's thread pool are not starved by a login burst, and excess hashing
+calls wait in the pool's queue, where the health monitor can see them.
 """
 
 # --- IMPORTS ---
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from concurrent.futures import ThreadPoolExecutor
+from dayfeel_auth.app import container
+from dayfeel_auth.utils.in_flight_counter import InFlightCounter
+from functools import lru_cache
+
+import asyncio
+import os
+
+
+# --- TYPES ---
+from typing import TYPE_CHECKING
+
+
+if TYPE_CHECKING:
+    from argon2 import PasswordHasher
 
 
 # --- GLOBALS ---
-PASSWORD_HASHER = PasswordHasher(
-    time_cost=3,
-    memory_cost=64 * 1024,
-    parallelism=4,
-    hash_len=32,
-    salt_len=16
-)
+# Hash/verify calls of request handlers currently queued or running (reported by the health monitor)
+HASHING_IN_FLIGHT = InFlightCounter()
 
 
 # --- CODE ---
+@lru_cache(maxsize=1)
+def get_password_hasher() -> 'PasswordHasher':
+    """
+    Build the Argon2id password hasher on first use.
+
+    argon2 (and its cffi bindings) is imported lazily so that importing the
+    service does not pay for it until a password is actually hashed or verified.
+
+    :returns: Shared PasswordHasher instance.
+    """
+    # Import argon2 only when it is first needed
+    from argon2 import PasswordHasher  # pylint: disable=C0415
+
+    return PasswordHasher(
+        time_cost=3,
+        memory_cost=64 * 1024,
+        parallelism=4,
+        hash_len=32,
+        salt_len=16
+    )
+
+
 def hash_password(password: str) -> str:
     """
     Generate hash from a password.
@@ -26,7 +62,7 @@ def hash_password(password: str) -> str:
 
     :returns: Password hash.
     """
-    return PASSWORD_HASHER.hash(password)
+    return get_password_hasher().hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
@@ -38,7 +74,58 @@ def verify_password(password: str, password_hash: str) -> bool:
 
     :returns: True if the password matches the hash, False otherwise.
     """
+    # Import argon2 errors only when a password is verified
+    from argon2.exceptions import VerifyMismatchError  # pylint: disable=C0415
+
     try:
-        return PASSWORD_HASHER.verify(password_hash, password)
+        return get_password_hasher().verify(password_hash, password)
     except VerifyMismatchError:
         return False
+
+
+@lru_cache(maxsize=1)
+def get_hashing_executor() -> ThreadPoolExecutor:
+    """
+    Build the thread pool password hashing runs on, on first use.
+
+    :returns: Shared executor with PASSWORD_HASHING_THREADS threads (one per CPU when 0).
+    """
+    return ThreadPoolExecutor(max_workers=container['config'].PASSWORD_HASHING_THREADS or os.cpu_count(),
+                              thread_name_prefix='password-hashing')
+
+
+def shutdown_hashing_executor() -> None:
+    """
+    Stop the password hashing threads, if any were started.
+
+    :returns: None.
+    """
+    # Never build an executor just to shut it down
+    if get_hashing_executor.cache_info().currsize:  # pylint: disable=E1121
+        get_hashing_executor().shutdown(wait=False)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Generate hash from a password on the hashing pool, without blocking the event loop.
+
+    :param password: The user's password.
+
+    :returns: Password hash.
+    """
+    with HASHING_IN_FLIGHT:
+        return await asyncio.get_running_loop().run_in_executor(get_hashing_executor(), hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """
+    Verify a password on the hashing pool, without blocking the event loop.
+
+    :param password: The user's password.
+    :param password_hash: The password hash previously stored in the database.
+
+    :returns: True if the password matches the hash, False otherwise.
+    """
+    with HASHING_IN_FLIGHT:
+        return await asyncio.get_running_loop().run_in_executor(get_hashing_executor(), verify_password,
+                                                                password, password_hash)
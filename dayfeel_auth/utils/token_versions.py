@@ -0,0 +1,113 @@
+"""
+Per-user token version cache.
+
+Every issued token carries the user's token version in its 'ver' claim;
+incrementing the version in the database revokes all older tokens at once.
+Versions are cached in memory so validating a token does not hit the database.
+
+Versions only ever grow, so the cache keeps the highest version it has seen:
+a version read from the database just before another worker's revocation
+event arrives can never overwrite the newer version the event carried.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
+from dayfeel_auth.utils.ttl_cache import TTLCache
+from threading import Lock
+
+
+# --- TYPES ---
+from typing import Optional
+
+
+# --- CODE ---
+class TokenVersionCache:
+    """
+    Caches the current token version of each user.
+    """
+
+    def __init__(self, users_repository: UsersRepository, ttl_sec: float, max_size: int) -> None:
+        """
+        Initializes the cache.
+
+        :param users_repository: Repository used on cache misses.
+        :param ttl_sec: Seconds a cached version is trusted.
+        :param max_size: Maximum number of cached users.
+
+        :returns: None.
+        """
+        self.__users_repository = users_repository
+        self.__cache: TTLCache[int, int] = TTLCache(ttl_sec=ttl_sec, max_size=max_size)
+
+        # Compare-and-set of versions, and a counter of flushes so reads started before one are not cached
+        self.__lock = Lock()
+        self.__generation = 0
+
+
+    def get(self, user_id: int) -> Optional[int]:
+        """
+        Get the current token version of a user.
+
+        :param user_id: User's unique identificator.
+
+        :returns: Token version or None if user not found.
+        """
+        # Get cached version
+        token_version = self.__cache.get(user_id)
+
+        # If version not cached: load it from database
+        if token_version is None:
+            generation = self.__generation
+            token_version = self.__users_repository.get_token_version(user_id)
+
+            # Cache version of existing users, unless the cache was flushed during the read
+            if token_version is not None:
+                self.__set(user_id, token_version, generation)
+
+        return token_version
+
+
+    def set(self, user_id: int, token_version: int) -> None:
+        """
+        Cache a known token version (e.g. right after incrementing it), unless a higher one is cached.
+
+        :param user_id: User's unique identificator.
+        :param token_version: Current token version.
+
+        :returns: None.
+        """
+        self.__set(user_id, token_version, self.__generation)
+
+
+    def clear(self) -> None:
+        """
+        Forget every cached token version, including versions being read from the database.
+
+        :returns: None.
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__cache.clear()
+
+
+# --- Private helpers ---
+    def __set(self, user_id: int, token_version: int, generation: int) -> None:
+        """
+        Cache a token version, keeping the highest one.
+
+        :param user_id: User's unique identificator.
+        :param token_version: Token version.
+        :param generation: Flush counter when the version was read.
+
+        :returns: None.
+        """
+        with self.__lock:
+
+            # If the cache was flushed since the version was read: it may be stale, do not cache it
+            if generation != self.__generation:
+                return
+
+            # Versions only grow: never replace a newer version with an older one
+            cached_version = self.__cache.get(user_id)
+            if cached_version is None or token_version >= cached_version:
+                self.__cache.set(user_id, token_version)
@@ -0,0 +1,106 @@
+"""
+Small in-process cache with per-entry expiration.
+"""
+
+# --- IMPORTS ---
+from threading import Lock
+
+import time
+
+
+# --- TYPES ---
+from typing import Dict
+from typing import Generic
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+
+# --- GLOBALS ---
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+# --- CODE ---
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe cache whose entries expire after a fixed time-to-live.
+
+    When full, the oldest inserted entry is dropped.
+    """
+
+    def __init__(self, ttl_sec: float, max_size: int) -> None:
+        """
+        Initializes the cache.
+
+        :param ttl_sec: Seconds an entry stays valid.
+        :param max_size: Maximum number of entries kept.
+
+        :returns: None.
+        """
+        self.__ttl_sec = ttl_sec
+        self.__max_size = max_size
+        self.__entries: Dict[K, Tuple[float, V]] = {}
+        self.__lock = Lock()
+
+
+    def get(self, key: K) -> Optional[V]:
+        """
+        Get a cached value.
+
+        :param key: Cache key.
+
+        :returns: Cached value, or None if absent or expired.
+        """
+        # Get entry
+        entry = self.__entries.get(key)
+
+        # If entry not found or expired: report missing
+        if entry is None or entry[0] < time.monotonic():
+            return None
+
+        return entry[1]
+
+
+    def set(self, key: K, value: V) -> None:
+        """
+        Cache a value.
+
+        :param key: Cache key.
+        :param value: Value to cache.
+
+        :returns: None.
+        """
+        with self.__lock:
+
+            # Re-inserting moves the key to the end, so the first key is always the oldest
+            self.__entries.pop(key, None)
+
+            # If cache is full: drop the oldest entry
+            if len(self.__entries) >= self.__max_size:
+                self.__entries.pop(next(iter(self.__entries)))
+
+            self.__entries[key] = (time.monotonic() + self.__ttl_sec, value)
+
+
+    def evict(self, key: K) -> None:
+        """
+        Remove a cached value.
+
+        :param key: Cache key.
+
+        :returns: None.
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+
+    def clear(self) -> None:
+        """
+        Remove every cached value.
+
+        :returns: None.
+        """
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,123 @@
+"""
+Service warmup.
+
+Pays the first-use costs (database connections, Argon2 and JWT setup) before
+the service reports itself as ready, so real requests never absorb them.
+"""
+
+# --- IMPORTS ---
+from contextlib import ExitStack
+from dayfeel_auth.app import container
+from dayfeel_auth.app import readiness
+from dayfeel_auth.utils.auth import decode_token
+from dayfeel_auth.utils.auth import generate_refresh_token
+from dayfeel_auth.utils.security import hash_password
+from dayfeel_auth.utils.security import verify_password
+from sqlalchemy import Engine
+from sqlalchemy import text
+from threading import Thread
+
+import time
+
+
+# --- GLOBALS ---
+WARMUP_PASSWORD = 'Warmup-Password-1!'
+
+
+# --- CODE ---
+def warmup_database_pool(engine: Engine, connections: int) -> None:
+    """
+    Open pool connections up front so they are kept idle in the pool.
+
+    :param engine: SQLAlchemy engine.
+    :param connections: Number of connections to open.
+
+    :returns: None.
+    """
+    # Never open more connections than the pool keeps idle
+    if hasattr(engine.pool, 'size'):
+        connections = min(connections, engine.pool.size())
+
+    # Hold all connections at once, otherwise the pool would hand back the same one
+    with ExitStack() as stack:
+        for _ in range(connections):
+            connection = stack.enter_context(engine.connect())
+            connection.execute(text('SELECT 1'))
+
+
+def warmup_password_hashing() -> None:
+    """
+    Run one Argon2 hash and verify to load the library and allocate its memory.
+
+    :returns: None.
+    """
+    # Hash and verify a throwaway password
+    password_hash = hash_password(password=WARMUP_PASSWORD)
+    verify_password(password=WARMUP_PASSWORD, password_hash=password_hash)
+
+
+def warmup_tokens() -> None:
+    """
+    Sign and decode one token to load PyJWT and its HMAC setup.
+
+    :returns: None.
+    """
+    # Sign and decode a throwaway token
+    refresh_token = generate_refresh_token(user_id=0, token_version=0)
+    decode_token(refresh_token['token'])
+
+
+def run_warmup(engine: Engine) -> None:
+    """
+    Run every warmup stage and mark the service as ready.
+
+    The database stage is retried until it succeeds, so a replica started
+    while Postgres is still unreachable becomes ready as soon as it recovers.
+
+    :param engine: SQLAlchemy engine.
+
+    :returns: None.
+    """
+    # Get config and logger
+    config = container['config']
+    logger = container['logger']
+
+    # Pre-open pool connections
+    while True:
+        try:
+            warmup_database_pool(engine, config.WARMUP_DB_CONNECTIONS)
+            break
+
+        # If database is unavailable: retry after a while
+        except Exception as e:  # pylint: disable=W0718
+            logger.warning(f'Warmup could not open database connections: {e}')
+            time.sleep(config.WARMUP_RETRY_INTERVAL_SEC)
+
+    # Exercise Argon2 and JWT once (best effort: a failure only leaves the first real request to pay for it)
+    for stage in (warmup_password_hashing, warmup_tokens):
+        try:
+            stage()
+
+        # If a stage failed: log it and become ready anyway, rather than never
+        except Exception as e:  # pylint: disable=W0718
+            logger.error(f'Warmup stage {stage.__name__} failed: {e}')
+
+    # Set app readiness
+    readiness.ready = True
+
+    # Log warmup end
+    logger.info('Warmup completed, service is ready')
+
+
+def start_warmup(engine: Engine) -> Thread:
+    """
+    Run the warmup in a background thread, keeping liveness probes responsive.
+
+    :param engine: SQLAlchemy engine.
+
+    :returns: Started warmup thread.
+    """
+    # Start warmup thread
+    thread = Thread(target=run_warmup, args=(engine,), name='warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,144 @@
+"""
+Session store tests: the insert-only sessions and their revocation ledger.
+
+Run against a migrated Postgres database given by TEST_POSTGRES_URL (a scratch
+user is created and deleted with its sessions), skipped otherwise.
+"""
+
+# --- IMPORTS ---
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions
+from dayfeel_auth.db.sqlalchemy.models.revoked_sessions import RevokedSessions
+from dayfeel_auth.db.sqlalchemy.models.users import Users
+from dayfeel_auth.db.sqlalchemy.repository.auth_sessions import AuthSessionsRepository
+from dayfeel_auth.enums.user_role import UserRole
+from sqlalchemy import create_engine
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import select
+from uuid import uuid4
+
+import os
+import unittest
+
+
+# --- TYPES ---
+from typing import List
+from uuid import UUID
+
+
+# --- GLOBALS ---
+TEST_POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+
+# --- CODE ---
+@unittest.skipUnless(TEST_POSTGRES_URL, 'TEST_POSTGRES_URL is not set')
+class TestAuthSessions(unittest.TestCase):
+    """
+    Session revocation through the ledger against Postgres.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a scratch user and a repository.
+
+        :returns: None.
+        """
+        self.engine = create_engine(TEST_POSTGRES_URL)
+        self.addCleanup(self.engine.dispose)
+        self.repository = AuthSessionsRepository(self.engine)
+        self.jtis: List[UUID] = []
+
+        with self.engine.begin() as connection:
+            self.user_id = connection.execute(insert(Users).values(email=f'{uuid4()}@sessions.test', password_hash='-',
+                                                                   name='Sessions', role=UserRole.USER)
+                                              .returning(Users.id)).scalar_one()
+        self.addCleanup(self.__delete_user)
+
+
+    def test_revoke_once(self) -> None:
+        """
+        A session is revoked by the first call only, and reported as revoked from then on.
+        """
+        jti = self.__insert_session()
+        self.assertFalse(self.repository.get_by_jti(jti).revoked)
+
+        self.assertTrue(self.repository.revoke_session(jti))
+        self.assertFalse(self.repository.revoke_session(jti))
+
+        record = self.repository.get_by_jti(jti)
+        self.assertEqual((record.jti, record.user_id, record.revoked), (jti, self.user_id, True))
+
+
+    def test_revoke_unknown_session(self) -> None:
+        """
+        Revoking a jti without a session writes nothing to the ledger.
+        """
+        jti = uuid4()
+        self.jtis.append(jti)
+
+        self.assertFalse(self.repository.revoke_session(jti))
+        with self.engine.connect() as connection:
+            self.assertIsNone(connection.execute(select(RevokedSessions.jti)
+                                                 .where(RevokedSessions.jti == jti)).scalar())
+
+
+    def test_concurrent_revocations(self) -> None:
+        """
+        Of several requests revoking the same session at once, exactly one succeeds.
+        """
+        jti = self.__insert_session()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self.repository.revoke_session, [jti] * 8))
+
+        self.assertEqual(results.count(True), 1)
+        self.assertTrue(self.repository.get_by_jti(jti).revoked)
+
+
+    def test_expired_revocations_are_pruned(self) -> None:
+        """
+        Expired sessions are deleted along with their ledger entries, live ones are kept.
+        """
+        expired, live = self.__insert_session(expires_in=timedelta(seconds=-1)), self.__insert_session()
+        for jti in (expired, live):
+            self.repository.revoke_session(jti)
+
+        self.repository.delete_expired_sessions()
+
+        self.assertIsNone(self.repository.get_by_jti(expired))
+        self.assertTrue(self.repository.get_by_jti(live).revoked)
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(select(RevokedSessions.jti)
+                                                .where(RevokedSessions.jti.in_([expired, live]))).scalars().all(),
+                             [live])
+
+
+# --- Private helpers ---
+    def __insert_session(self, expires_in: timedelta = timedelta(hours=1)) -> UUID:
+        """
+        Insert a session of the scratch user.
+
+        :param expires_in: Time before the session expires (negative if already expired).
+
+        :returns: Session jti.
+        """
+        jti = uuid4()
+        self.jtis.append(jti)
+        self.repository.insert_session(AuthSessions(user_id=self.user_id, jti=jti,
+                                                    expires_at=datetime.now(timezone.utc) + expires_in))
+        return jti
+
+
+    def __delete_user(self) -> None:
+        """
+        Delete the scratch user, its sessions and their ledger entries.
+
+        :returns: None.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(delete(RevokedSessions).where(RevokedSessions.jti.in_(self.jtis)))
+            connection.execute(delete(Users).where(Users.id == self.user_id))
@@ -0,0 +1,187 @@
+"""
+Bloom filter and email filter tests.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.utils.bloom_filter import BloomFilter
+from dayfeel_auth.utils.email_filter import EmailFilter
+from unittest import mock
+
+import time
+import unittest
+
+
+# --- TYPES ---
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+
+# --- CODE ---
+class TestBloomFilter(unittest.TestCase):
+    """
+    Bloom filter answers and sizing.
+    """
+
+    def test_added_items_are_always_found(self) -> None:
+        """
+        No false negatives, even past capacity.
+        """
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        items = [f'user{i}@example.com' for i in range(2000)]
+        for item in items:
+            bloom_filter.add(item)
+
+        self.assertTrue(all(item in bloom_filter for item in items))
+
+
+    def test_false_positive_rate(self) -> None:
+        """
+        Items never added are reported present at about the error rate, at capacity.
+        """
+        bloom_filter = BloomFilter(capacity=20_000, error_rate=0.01)
+        for i in range(20_000):
+            bloom_filter.add(f'user{i}@example.com')
+
+        false_positives = sum(f'unknown{i}@example.com' in bloom_filter for i in range(20_000))
+        self.assertLess(false_positives / 20_000, 0.02)
+
+
+    def test_length_counts_distinct_items(self) -> None:
+        """
+        Adding an item twice counts it once.
+        """
+        bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+        for item in ('a@example.com', 'b@example.com', 'a@example.com'):
+            bloom_filter.add(item)
+
+        self.assertEqual(len(bloom_filter), 2)
+        self.assertNotIn('c@example.com', bloom_filter)
+
+
+    def test_size(self) -> None:
+        """
+        The bit array takes about 1.2MB per million items at 1%.
+        """
+        self.assertAlmostEqual(BloomFilter(capacity=1_000_000, error_rate=0.01).size_bytes / 1_000_000, 1.2,
+                               delta=0.05)
+
+
+class TestEmailFilter(unittest.TestCase):
+    """
+    Email filter loading, and when its misses are trusted.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a filter over a fake users table, followed by a connected fake listener.
+
+        :returns: None.
+        """
+        patcher = mock.patch.dict(container, {'logger': mock.Mock()})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.users: List[Tuple[int, str]] = [(1, 'ana@example.com'), (2, 'bob@example.com')]
+        self.repository = mock.Mock()
+        self.repository.get_emails_after.side_effect = lambda after_id, limit: [
+            user for user in sorted(self.users) if user[0] > after_id][:limit]
+
+        self.listener = mock.Mock(connected_since=time.monotonic())
+        self.email_filter = EmailFilter(users_repository=self.repository, capacity=1000, error_rate=0.01,
+                                        refresh_interval_sec=0.01)
+        self.email_filter.follow(self.listener)
+        self.email_filter.start()
+        self.addCleanup(self.email_filter.stop)
+
+
+    def test_misses_are_trusted_once_current(self) -> None:
+        """
+        Once loaded while listening, unknown emails are rejected and known ones (normalized) are not.
+        """
+        self.__wait_until(lambda: self.email_filter.current)
+
+        self.assertTrue(self.email_filter.might_exist('Ana@Example.com'))
+        self.assertFalse(self.email_filter.might_exist('nobody@example.com'))
+
+
+    def test_misses_are_not_trusted_without_listener(self) -> None:
+        """
+        Without a connected listener, users registered elsewhere may be missing: every email may exist.
+        """
+        self.__wait_until(lambda: self.email_filter.current)
+        self.listener.connected_since = None
+
+        self.assertTrue(self.email_filter.loaded)
+        self.assertFalse(self.email_filter.current)
+        self.assertTrue(self.email_filter.might_exist('nobody@example.com'))
+
+
+    def test_reconnection_requires_a_full_read(self) -> None:
+        """
+        A user committed late, below the highest id read, while the listener was down, is found again.
+        """
+        self.__wait_until(lambda: self.email_filter.current)
+
+        # Reconnect after a user committed late, far below the ids already read
+        self.users += [(id_, f'user{id_}@example.com') for id_ in range(1000, 1300)]
+        self.__wait_until(lambda: self.email_filter.might_exist('user1299@example.com'))
+        self.users.append((3, 'late@example.com'))
+        self.listener.connected_since = time.monotonic()
+
+        # Misses are not trusted until the filter has read every user again
+        self.assertTrue(self.email_filter.might_exist('late@example.com'))
+        self.__wait_until(lambda: self.email_filter.current)
+        self.assertTrue(self.email_filter.might_exist('late@example.com'))
+
+
+    def test_missed_event_requires_a_full_read(self) -> None:
+        """
+        After an event may have been missed, misses are not trusted until every user is read again.
+        """
+        self.__wait_until(lambda: self.email_filter.current)
+
+        # Fail reads, so the filter cannot become current again
+        self.users.append((3, 'late@example.com'))
+        read_users = self.repository.get_emails_after.side_effect
+        self.repository.get_emails_after.side_effect = ConnectionError('Database down')
+        self.email_filter.invalidate()
+        time.sleep(0.05)
+        self.assertFalse(self.email_filter.current)
+        self.assertTrue(self.email_filter.might_exist('nobody@example.com'))
+
+        # Once reads succeed again, the filter is read again in full
+        self.repository.get_emails_after.side_effect = read_users
+        self.__wait_until(lambda: self.email_filter.current)
+        self.assertTrue(self.email_filter.might_exist('late@example.com'))
+
+
+    def test_disabled_filter_lets_everything_through(self) -> None:
+        """
+        A filter with no capacity never rejects an email.
+        """
+        email_filter = EmailFilter(users_repository=mock.Mock(), capacity=0, error_rate=0.01, refresh_interval_sec=1)
+        email_filter.follow(self.listener)
+        email_filter.start()
+        email_filter.stop()
+
+        self.assertTrue(email_filter.might_exist('nobody@example.com'))
+
+
+# --- Private helpers ---
+    @staticmethod
+    def __wait_until(condition: Callable[[], bool], timeout_sec: float = 5.0) -> None:
+        """
+        Wait for the loader thread to reach a state.
+
+        :param condition: Function telling whether the state is reached.
+        :param timeout_sec: Seconds before failing.
+
+        :returns: None.
+        """
+        deadline = time.monotonic() + timeout_sec
+        while not condition():
+            if time.monotonic() > deadline:
+                raise AssertionError('Condition not reached in time')
+            time.sleep(0.01)
@@ -0,0 +1,165 @@
+"""
+Breached-password list tests: lookups and the file builder.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.cli.breached_passwords import build
+from dayfeel_auth.utils.breached_passwords import BreachedPasswords
+
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+
+# --- TYPES ---
+from typing import List
+
+
+# --- GLOBALS ---
+PREFIX_BYTES = 10
+
+PASSWORDS = [f'password{number}' for number in range(9)]
+
+
+# --- CODE ---
+def sha1(password: str) -> bytes:
+    """
+    Hash a password as the HIBP dataset does.
+
+    :param password: Plain text password.
+
+    :returns: SHA-1 digest.
+    """
+    return hashlib.sha1(password.encode('utf-8'), usedforsecurity=False).digest()
+
+
+class TestBreachedPasswords(unittest.TestCase):
+    """
+    Binary search over a sorted prefix file.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a scratch directory and the prefixes of PASSWORDS, in file order.
+
+        :returns: None.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.ordered = sorted(PASSWORDS, key=sha1)
+
+
+    def test_hits_anywhere_in_the_file(self) -> None:
+        """
+        The first, middle and last prefixes of the file are all found.
+        """
+        breached_passwords = self.__load(self.ordered)
+
+        self.assertEqual(len(breached_passwords), len(PASSWORDS))
+        for password in (self.ordered[0], self.ordered[len(self.ordered) // 2], self.ordered[-1]):
+            self.assertTrue(breached_passwords.contains(password), password)
+
+
+    def test_absent_password(self) -> None:
+        """
+        Passwords missing from the file are not reported, including ones between listed neighbours.
+        """
+        breached_passwords = self.__load(self.ordered[::2])
+
+        for password in self.ordered[1::2] + ['correct horse battery staple']:
+            self.assertFalse(breached_passwords.contains(password), password)
+
+
+    def test_empty_file(self) -> None:
+        """
+        An empty list contains nothing.
+        """
+        breached_passwords = self.__load([])
+
+        self.assertEqual(len(breached_passwords), 0)
+        self.assertFalse(breached_passwords.contains(PASSWORDS[0]))
+
+
+    def test_truncated_file_is_rejected(self) -> None:
+        """
+        A file that is not a whole number of prefixes fails at load, not at lookup.
+        """
+        path = os.path.join(self.directory, 'truncated.bin')
+        with open(path, 'wb') as file:
+            file.write(b''.join(sha1(password)[:PREFIX_BYTES] for password in self.ordered) + b'\x00')
+
+        with self.assertRaises(ValueError):
+            BreachedPasswords(path, PREFIX_BYTES)
+
+
+# --- Private helpers ---
+    def __load(self, passwords: List[str]) -> BreachedPasswords:
+        """
+        Write the prefixes of passwords, in the given order, and map them.
+
+        :param passwords: Plain text passwords.
+
+        :returns: Mapped list.
+        """
+        path = os.path.join(self.directory, 'breached.bin')
+        with open(path, 'wb') as file:
+            file.write(b''.join(sha1(password)[:PREFIX_BYTES] for password in passwords))
+        return BreachedPasswords(path, PREFIX_BYTES)
+
+
+class TestBuildBreachedPasswords(unittest.TestCase):
+    """
+    Conversion of the HIBP text dataset into the binary prefix file.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a scratch directory.
+
+        :returns: None.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.source = os.path.join(self.directory, 'hibp.txt')
+        self.target = os.path.join(self.directory, 'breached.bin')
+
+
+    def test_unsorted_input_round_trip(self) -> None:
+        """
+        Unsorted input with duplicates gives a sorted, deduplicated file that finds every password.
+        """
+        lines = [f'{sha1(password).hex().upper()}:{count}'
+                 for count, password in enumerate(reversed(PASSWORDS + PASSWORDS[:3]), start=1)]
+        with open(self.source, 'w', encoding='ascii') as file:
+            file.write('\n'.join(lines) + '\n')
+
+        # Small runs, so several are merged
+        written = build(self.source, self.target, PREFIX_BYTES, min_count=1, run_size=2)
+
+        with open(self.target, 'rb') as file:
+            content = file.read()
+        expected = sorted({sha1(password)[:PREFIX_BYTES] for password in PASSWORDS})
+        self.assertEqual(written, len(PASSWORDS))
+        self.assertEqual(content, b''.join(expected))
+
+        breached_passwords = BreachedPasswords(self.target, PREFIX_BYTES)
+        self.assertTrue(all(breached_passwords.contains(password) for password in PASSWORDS))
+
+        # Only the output is left behind
+        self.assertEqual(sorted(os.listdir(self.directory)), ['breached.bin', 'hibp.txt'])
+
+
+    def test_rare_hashes_are_skipped(self) -> None:
+        """
+        Hashes seen in fewer breaches than 'min_count' are left out.
+        """
+        with open(self.source, 'w', encoding='ascii') as file:
+            file.write(f'{sha1(PASSWORDS[0]).hex().upper()}:1\n{sha1(PASSWORDS[1]).hex().upper()}:5\n')
+
+        self.assertEqual(build(self.source, self.target, PREFIX_BYTES, min_count=2), 1)
+
+        breached_passwords = BreachedPasswords(self.target, PREFIX_BYTES)
+        self.assertFalse(breached_passwords.contains(PASSWORDS[0]))
+        self.assertTrue(breached_passwords.contains(PASSWORDS[1]))
@@ -0,0 +1,142 @@
+"""
+Cache invalidation listener tests.
+
+Run against a Postgres database given by TEST_POSTGRES_URL, skipped otherwise.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.setup import notifications
+from dayfeel_auth.utils.cache_invalidation import CacheInvalidationListener
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from unittest import mock
+
+import os
+import time
+import unittest
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+
+
+# --- GLOBALS ---
+TEST_POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+
+# --- CODE ---
+@unittest.skipUnless(TEST_POSTGRES_URL, 'TEST_POSTGRES_URL is not set')
+class TestCacheInvalidationListener(unittest.TestCase):
+    """
+    Events published in a transaction reach a listener on its own connection.
+    """
+
+    def setUp(self) -> None:
+        """
+        Starts a listener recording the events it receives.
+
+        :returns: None.
+        """
+        patcher = mock.patch.dict(container, {'logger': mock.Mock()})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.engine = create_engine(TEST_POSTGRES_URL)
+        self.addCleanup(self.engine.dispose)
+
+        self.events: List[Dict[str, Any]] = []
+        self.gaps = 0
+        self.listener = CacheInvalidationListener(engine=self.engine,
+                                                  handlers={notifications.USER_CREATED: self.__apply},
+                                                  on_gap=self.__on_gap,
+                                                  reconnect_max_sec=1.0)
+        self.listener.start()
+        self.addCleanup(self.listener.stop)
+        self.__wait_until(lambda: self.listener.connected)
+
+
+    def test_committed_events_are_applied(self) -> None:
+        """
+        An event reaches the listener once its transaction commits, and not before.
+        """
+        self.assertLessEqual(self.listener.connected_since, time.monotonic())
+
+        with Session(self.engine) as session:
+            notifications.publish(session, notifications.USER_CREATED, user_id=1, email='ana@example.com')
+            time.sleep(0.2)
+            self.assertEqual(self.events, [])
+            session.commit()
+
+        self.__wait_until(lambda: self.events)
+        self.assertEqual(self.events, [{'event': notifications.USER_CREATED, 'user_id': 1, 'email': 'ana@example.com'}])
+
+
+    def test_rolled_back_events_are_not_applied(self) -> None:
+        """
+        An event of a rolled back transaction is never delivered.
+        """
+        with Session(self.engine) as session:
+            notifications.publish(session, notifications.USER_CREATED, user_id=1, email='ana@example.com')
+            session.rollback()
+        with Session(self.engine) as session:
+            notifications.publish(session, notifications.USER_CREATED, user_id=2, email='bob@example.com')
+            session.commit()
+
+        self.__wait_until(lambda: self.events)
+        self.assertEqual([event['user_id'] for event in self.events], [2])
+
+
+    def test_failed_event_reports_a_gap(self) -> None:
+        """
+        An event that cannot be applied flushes the caches.
+        """
+        with Session(self.engine) as session:
+            notifications.publish(session, notifications.USER_CREATED, user_id=1)
+            session.commit()
+
+        self.__wait_until(lambda: self.gaps)
+        self.assertTrue(self.listener.connected)
+
+
+# --- Private helpers ---
+    def __apply(self, event: Dict[str, Any]) -> None:
+        """
+        Record an event, failing like a real handler on an incomplete one.
+
+        :param event: Event.
+
+        :returns: None.
+        """
+        if 'email' not in event:
+            raise KeyError('email')
+        self.events.append(event)
+
+
+    def __on_gap(self) -> None:
+        """
+        Count flushes.
+
+        :returns: None.
+        """
+        self.gaps += 1
+
+
+    @staticmethod
+    def __wait_until(condition: Callable[[], Any], timeout_sec: float = 5.0) -> None:
+        """
+        Wait for the listener thread to reach a state.
+
+        :param condition: Function telling whether the state is reached.
+        :param timeout_sec: Seconds before failing.
+
+        :returns: None.
+        """
+        deadline = time.monotonic() + timeout_sec
+        while not condition():
+            if time.monotonic() > deadline:
+                raise AssertionError('Condition not reached in time')
+            time.sleep(0.01)
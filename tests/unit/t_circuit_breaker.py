@@ -0,0 +1,163 @@
+"""
+Database circuit breaker tests.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.setup.circuit_breaker import CircuitBreaker
+from dayfeel_auth.err.circuit_open_error import CircuitOpenError
+from unittest import mock
+
+import unittest
+
+
+# --- CODE ---
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Circuit breaker states and transitions.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a breaker on a controlled clock.
+
+        :returns: None.
+        """
+        self.now = 1000.0
+        patcher = mock.patch('dayfeel_auth.db.sqlalchemy.setup.circuit_breaker.time.monotonic',
+                             side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_rate=0.5, window_size=10, min_calls=4, open_sec=5.0)
+
+
+    def test_stays_closed_below_min_calls(self) -> None:
+        """
+        Failures do not open the circuit before the window holds enough calls.
+        """
+        for _ in range(3):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, 'closed')
+        self.breaker.before_call()
+
+
+    def test_stays_closed_below_failure_rate(self) -> None:
+        """
+        Failures mixed with enough successes keep the circuit closed.
+        """
+        for _ in range(10):
+            self.breaker.record_success()
+            self.breaker.record_success()
+            self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, 'closed')
+
+
+    def test_opens_at_failure_rate(self) -> None:
+        """
+        Crossing the failure rate opens the circuit, and calls then fail fast.
+        """
+        self.__open()
+
+        self.assertEqual(self.breaker.state, 'open')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+
+    def test_single_probe_after_cool_down(self) -> None:
+        """
+        After the cool-down, one probe is let through while other calls still fail fast.
+        """
+        self.__open()
+        self.now += 5.0
+
+        self.assertEqual(self.breaker.state, 'half_open')
+        self.breaker.before_call()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+
+    def test_probe_success_closes(self) -> None:
+        """
+        A successful probe closes the circuit with a fresh window.
+        """
+        self.__open()
+        self.now += 5.0
+        probe = self.breaker.before_call()
+        self.breaker.record_success(probe=probe)
+
+        self.assertTrue(probe)
+        self.assertEqual(self.breaker.state, 'closed')
+
+        # Earlier failures are forgotten
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, 'closed')
+
+
+    def test_probe_failure_reopens(self) -> None:
+        """
+        A failed probe opens the circuit for another cool-down.
+        """
+        self.__open()
+        self.now += 5.0
+        self.breaker.record_failure(probe=self.breaker.before_call())
+
+        self.assertEqual(self.breaker.state, 'open')
+        self.now += 4.9
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+        self.now += 0.1
+        self.breaker.before_call()
+
+
+    def test_late_outcomes_do_not_decide(self) -> None:
+        """
+        Calls let through before the circuit opened and finishing late neither close nor reopen it.
+        """
+        in_flight = self.breaker.before_call()
+        self.__open()
+        self.now += 5.0
+        probe = self.breaker.before_call()
+
+        # A late success does not close the half-open circuit
+        self.breaker.record_success(probe=in_flight)
+        self.assertFalse(in_flight)
+        self.assertEqual(self.breaker.state, 'half_open')
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        # Nor does a late failure reopen it
+        self.breaker.record_failure(probe=in_flight)
+        self.assertEqual(self.breaker.state, 'half_open')
+
+        # The probe still decides
+        self.breaker.record_success(probe=probe)
+        self.assertEqual(self.breaker.state, 'closed')
+
+
+    def test_late_outcomes_while_open_are_ignored(self) -> None:
+        """
+        Calls finishing while the circuit is open do not restart its cool-down.
+        """
+        self.__open()
+        self.now += 4.0
+        for _ in range(4):
+            self.breaker.record_failure()
+        self.now += 1.0
+
+        self.assertEqual(self.breaker.state, 'half_open')
+
+
+# --- Private helpers ---
+    def __open(self) -> None:
+        """
+        Fail enough calls to open the circuit.
+
+        :returns: None.
+        """
+        for _ in range(2):
+            self.breaker.record_success()
+        for _ in range(2):
+            self.breaker.record_failure()
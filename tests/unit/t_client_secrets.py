@@ -0,0 +1,172 @@
+"""
+Service client credential tests: secret hashing, client lookups and client tokens.
+
+Lookup tests run against a migrated Postgres database given by
+TEST_POSTGRES_URL (a scratch client is created and deleted), skipped otherwise.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.models.service_clients import ServiceClients
+from dayfeel_auth.db.sqlalchemy.repository.service_clients import ServiceClientsRepository
+from dayfeel_auth.utils.auth import generate_access_token
+from dayfeel_auth.utils.client_secrets import generate_client_credentials
+from dayfeel_auth.utils.client_secrets import hash_client_secret
+from dayfeel_auth.utils.client_secrets import verify_client_secret
+from sqlalchemy import create_engine
+from sqlalchemy import delete
+from unittest import mock
+
+import hashlib
+import hmac
+import os
+import unittest
+
+
+# --- GLOBALS ---
+TEST_POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+SECRET = 'jwt-secret-for-tests-at-least-32-bytes'
+
+
+# --- CODE ---
+class TestClientSecrets(unittest.TestCase):
+    """
+    Client secrets hashed with a key of their own.
+    """
+
+    def setUp(self) -> None:
+        """
+        Configures a known JWT secret and no dedicated client secret key.
+
+        :returns: None.
+        """
+        self.config = container['config'].model_copy(update={'JWT_SECRET_KEY': SECRET,
+                                                             'CLIENT_SECRET_HMAC_KEY': None})
+        patcher = mock.patch.dict(container, {'config': self.config})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.client_secret = generate_client_credentials()[1]
+
+
+    def test_right_secret_verifies(self) -> None:
+        """
+        A secret verifies against its own hash, and a wrong secret is rejected.
+        """
+        secret_hash = hash_client_secret(self.client_secret)
+
+        self.assertTrue(verify_client_secret(self.client_secret, secret_hash))
+        self.assertFalse(verify_client_secret(generate_client_credentials()[1], secret_hash))
+        self.assertFalse(verify_client_secret(self.client_secret[:-1], secret_hash))
+
+
+    def test_raw_jwt_secret_hash_is_rejected(self) -> None:
+        """
+        A hash keyed with the JWT secret itself does not verify: the key is derived from it.
+        """
+        raw_hash = hmac.new(SECRET.encode('utf-8'), self.client_secret.encode('utf-8'), hashlib.sha256).hexdigest()
+
+        self.assertNotEqual(hash_client_secret(self.client_secret), raw_hash)
+        self.assertFalse(verify_client_secret(self.client_secret, raw_hash))
+
+
+    def test_dedicated_key_is_used(self) -> None:
+        """
+        A dedicated key replaces the derived one, so hashes made without it no longer verify.
+        """
+        derived_hash = hash_client_secret(self.client_secret)
+
+        with mock.patch.dict(container, {'config': self.config.model_copy(
+                update={'CLIENT_SECRET_HMAC_KEY': 'dedicated-client-secret-key'})}):
+            self.assertFalse(verify_client_secret(self.client_secret, derived_hash))
+            self.assertTrue(verify_client_secret(self.client_secret, hash_client_secret(self.client_secret)))
+
+
+@unittest.skipUnless(TEST_POSTGRES_URL, 'TEST_POSTGRES_URL is not set')
+class TestServiceClientLookup(unittest.TestCase):
+    """
+    Client credentials checked through the client id lookup against Postgres.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a scratch client.
+
+        :returns: None.
+        """
+        config = container['config'].model_copy(update={'JWT_SECRET_KEY': SECRET, 'CLIENT_SECRET_HMAC_KEY': None})
+        patcher = mock.patch.dict(container, {'config': config})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.engine = create_engine(TEST_POSTGRES_URL)
+        self.addCleanup(self.engine.dispose)
+        self.repository = ServiceClientsRepository(self.engine)
+
+        self.client_id, self.client_secret = generate_client_credentials()
+        self.repository.insert_client(ServiceClients(client_id=self.client_id, name='Lookup tests',
+                                                     secret_hash=hash_client_secret(self.client_secret)))
+        self.addCleanup(self.__delete_client)
+
+
+    def test_lookup_and_verify(self) -> None:
+        """
+        The stored hash found by client id verifies the right secret only.
+        """
+        record = self.repository.get_by_client_id(self.client_id)
+
+        self.assertEqual((record.client_id, record.active), (self.client_id, True))
+        self.assertTrue(verify_client_secret(self.client_secret, record.secret_hash))
+        self.assertFalse(verify_client_secret(generate_client_credentials()[1], record.secret_hash))
+        self.assertIsNone(self.repository.get_by_client_id(generate_client_credentials()[0]))
+
+
+    def test_raw_jwt_secret_hash_is_rejected(self) -> None:
+        """
+        A client stored with a hash keyed by the raw JWT secret cannot authenticate.
+        """
+        raw_hash = hmac.new(SECRET.encode('utf-8'), self.client_secret.encode('utf-8'), hashlib.sha256).hexdigest()
+        with self.engine.begin() as connection:
+            connection.execute(ServiceClients.__table__.update()
+                               .where(ServiceClients.client_id == self.client_id).values(secret_hash=raw_hash))
+
+        record = self.repository.get_by_client_id(self.client_id)
+        self.assertFalse(verify_client_secret(self.client_secret, record.secret_hash))
+
+
+# --- Private helpers ---
+    def __delete_client(self) -> None:
+        """
+        Delete the scratch client.
+
+        :returns: None.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(delete(ServiceClients).where(ServiceClients.client_id == self.client_id))
+
+
+class TestClientAccessToken(unittest.TestCase):
+    """
+    Access token lifetimes given by the caller.
+    """
+
+    def setUp(self) -> None:
+        """
+        Configures a known JWT secret and access token lifetime.
+
+        :returns: None.
+        """
+        config = container['config'].model_copy(update={'JWT_SECRET_KEY': SECRET, 'JWT_ACCESS_TOKEN_EXP_MIN': 15})
+        patcher = mock.patch.dict(container, {'config': config, 'logger': mock.Mock()})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+    def test_lifetime(self) -> None:
+        """
+        A given lifetime is used as is, zero included, and the configured one applies otherwise.
+        """
+        for exp_min, lifetime_sec in ((None, 15 * 60), (5, 5 * 60), (0, 0)):
+            claims = generate_access_token('client:svc_test', None, 'Client', 'service', 0, exp_min=exp_min)['claims']
+            self.assertEqual(claims['exp'] - claims['iat'], lifetime_sec, exp_min)
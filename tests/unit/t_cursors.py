@@ -0,0 +1,62 @@
+"""
+Pagination cursor tests.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.utils.cursors import decode_cursor
+from dayfeel_auth.utils.cursors import encode_cursor
+
+import base64
+import unittest
+
+
+# --- CODE ---
+def raw_cursor(text: str) -> str:
+    """
+    Encode arbitrary text the way cursors are encoded.
+
+    :param text: Cursor payload.
+
+    :returns: Cursor string.
+    """
+    return base64.urlsafe_b64encode(text.encode('utf-8')).decode('ascii')
+
+
+class TestCursors(unittest.TestCase):
+    """
+    Cursor encoding, decoding and validation.
+    """
+
+    def test_round_trip(self) -> None:
+        """
+        Decoding returns the values that were encoded.
+        """
+        for values in ({'order_by': 'id', 'id': 7},
+                       {'order_by': 'created_at', 'id': 2 ** 40, 'created_at': '2025-10-10T09:26:48.517203+00:00'}):
+            self.assertEqual(decode_cursor(encode_cursor(values)), values)
+
+
+    def test_cursor_is_url_safe(self) -> None:
+        """
+        Cursors can be passed in a query string as they are.
+        """
+        cursor = encode_cursor({'order_by': 'created_at', 'id': 1, 'created_at': '???>>>~~~'})
+        self.assertRegex(cursor, r'^[A-Za-z0-9_\-=]+$')
+
+
+    def test_rejects_malformed_cursor(self) -> None:
+        """
+        Cursors that are not base64 JSON objects are rejected.
+        """
+        for cursor in ('', 'not base64!', 'é', raw_cursor('{"id": 1'), raw_cursor('[1]'), raw_cursor('1')):
+            with self.assertRaises(ValueError, msg=cursor):
+                decode_cursor(cursor)
+
+
+    def test_rejects_cursor_without_integer_id(self) -> None:
+        """
+        Cursors whose id is missing or not an integer are rejected.
+        """
+        for payload in ('{}', '{"id":"x"}', '{"id":"1"}', '{"id":1.5}', '{"id":true}', '{"id":null}', '{"id":[1]}'):
+            with self.assertRaises(ValueError, msg=payload):
+                decode_cursor(raw_cursor(payload))
@@ -0,0 +1,238 @@
+"""
+Request deadline tests: middleware, transaction timeouts, circuit breaker wiring and config.
+"""
+
+# --- IMPORTS ---
+from contextlib import contextmanager
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.setup.circuit_breaker import CircuitBreaker
+from dayfeel_auth.db.sqlalchemy.setup.circuit_breaker import attach_circuit_breaker
+from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import SET_TIMEOUTS
+from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import DbConnectionHandler
+from dayfeel_auth.db.sqlalchemy.setup.db_connection_handler import apply_request_deadline
+from dayfeel_auth.err.circuit_open_error import CircuitOpenError
+from dayfeel_auth.err.deadline_exceeded_error import DeadlineExceededError
+from dayfeel_auth.middlewares.deadlines import DeadlineMiddleware
+from dayfeel_auth.models import Config
+from dayfeel_auth.utils.deadlines import REQUEST_DEADLINE
+from dayfeel_auth.utils.deadlines import remaining_sec
+from pydantic import ValidationError
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from unittest import mock
+
+import time
+import unittest
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+
+# --- CODE ---
+@contextmanager
+def request_deadline(timeout_sec: float) -> Iterator[None]:
+    """
+    Set a request deadline for the duration of a block, as the middleware does.
+
+    :param timeout_sec: Seconds left (negative once exceeded).
+
+    :returns: Context manager.
+    """
+    token = REQUEST_DEADLINE.set(time.monotonic() + timeout_sec)
+    try:
+        yield
+    finally:
+        REQUEST_DEADLINE.reset(token)
+
+
+class TestDeadlineMiddleware(unittest.IsolatedAsyncioTestCase):
+    """
+    Each request runs with the deadline of its most specific route.
+    """
+
+    def setUp(self) -> None:
+        """
+        Configures route timeouts and an app recording the time left.
+
+        :returns: None.
+        """
+        config = container['config'].model_copy(update={'REQUEST_TIMEOUT_SEC': 10.0,
+                                                        'REQUEST_TIMEOUTS': {'/auth': 5.0, '/auth/login': 3.0,
+                                                                             '/export': 0}})
+        patcher = mock.patch.dict(container, {'config': config})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.remaining: List[Optional[float]] = []
+
+        async def app(scope: Dict[str, Any], receive: Any, send: Any) -> None:  # pylint: disable=W0613
+            self.remaining.append(remaining_sec())
+
+        self.middleware = DeadlineMiddleware(app)
+
+
+    async def test_longest_prefix_wins(self) -> None:
+        """
+        Routes get their own timeout, the most specific prefix first, and others the default.
+        """
+        for path in ('/auth/login', '/auth/refresh', '/users'):
+            await self.middleware({'type': 'http', 'path': path}, None, None)
+
+        for remaining, timeout in zip(self.remaining, (3.0, 5.0, 10.0)):
+            self.assertAlmostEqual(remaining, timeout, delta=0.5)
+
+
+    async def test_disabled_and_non_http(self) -> None:
+        """
+        A zero timeout, or a non-HTTP connection, runs without deadline.
+        """
+        await self.middleware({'type': 'http', 'path': '/export/users'}, None, None)
+        await self.middleware({'type': 'lifespan'}, None, None)
+
+        self.assertEqual(self.remaining, [None, None])
+
+
+    async def test_deadline_is_reset(self) -> None:
+        """
+        The deadline does not outlive its request.
+        """
+        await self.middleware({'type': 'http', 'path': '/auth/login'}, None, None)
+
+        self.assertIsNone(remaining_sec())
+
+
+class TestTransactionDeadline(unittest.TestCase):
+    """
+    Transactions and sessions are bounded by the time left.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a fake Postgres connection.
+
+        :returns: None.
+        """
+        self.connection = mock.Mock()
+        self.connection.dialect.name = 'postgresql'
+
+
+    def test_timeouts_set_from_remaining_budget(self) -> None:
+        """
+        statement_timeout and lock_timeout are set to the milliseconds left.
+        """
+        with request_deadline(2.0):
+            apply_request_deadline(mock.Mock(), mock.Mock(), self.connection)
+
+        statement, parameters = self.connection.execute.call_args.args
+        self.assertIs(statement, SET_TIMEOUTS)
+        self.assertTrue(parameters['timeout'].endswith('ms'))
+        self.assertTrue(1500 < int(parameters['timeout'][:-2]) <= 2000, parameters)
+
+
+    def test_no_timeouts_without_deadline_or_postgres(self) -> None:
+        """
+        Outside requests, or on other databases, transactions are left alone.
+        """
+        apply_request_deadline(mock.Mock(), mock.Mock(), self.connection)
+
+        self.connection.dialect.name = 'sqlite'
+        with request_deadline(2.0):
+            apply_request_deadline(mock.Mock(), mock.Mock(), self.connection)
+
+        self.connection.execute.assert_not_called()
+
+
+    def test_expired_deadline_fails_transaction(self) -> None:
+        """
+        A transaction beginning after the deadline fails without running anything.
+        """
+        with request_deadline(-0.1), self.assertRaises(DeadlineExceededError):
+            apply_request_deadline(mock.Mock(), mock.Mock(), self.connection)
+
+        self.connection.execute.assert_not_called()
+
+
+    def test_expired_deadline_never_reaches_engine(self) -> None:
+        """
+        A session opened after the deadline fails before the engine or the breaker is used.
+        """
+        engine = mock.Mock()
+        breaker = mock.Mock()
+        attach_circuit_breaker(engine, breaker)
+
+        with request_deadline(-0.1), self.assertRaises(DeadlineExceededError):
+            with DbConnectionHandler(engine):
+                pass
+
+        self.assertEqual(engine.mock_calls, [])
+        self.assertEqual(breaker.mock_calls, [])
+
+
+class TestCircuitBreakerWiring(unittest.TestCase):
+    """
+    Sessions report their outcome to the engine's breaker, and fail fast while it is open.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a SQLite engine guarded by a breaker.
+
+        :returns: None.
+        """
+        self.engine = create_engine('sqlite://')
+        self.addCleanup(self.engine.dispose)
+        self.breaker = mock.Mock(wraps=CircuitBreaker(failure_rate=0.5, window_size=4, min_calls=2, open_sec=60))
+        attach_circuit_breaker(self.engine, self.breaker)
+
+
+    def test_outcomes_are_recorded(self) -> None:
+        """
+        Successes and non-database errors count as successes, transient errors as failures.
+        """
+        with DbConnectionHandler(self.engine) as db:
+            db.session.execute(text('SELECT 1'))
+        with self.assertRaises(ValueError), DbConnectionHandler(self.engine):
+            raise ValueError('Not a database error')
+        with self.assertRaises(OperationalError), DbConnectionHandler(self.engine):
+            raise OperationalError('SELECT 1', {}, Exception('server closed the connection'),
+                                   connection_invalidated=True)
+
+        self.assertEqual(self.breaker.record_success.call_count, 2)
+        self.assertEqual(self.breaker.record_failure.call_count, 1)
+
+
+    def test_open_circuit_fails_fast(self) -> None:
+        """
+        Once open, sessions fail before opening a connection.
+        """
+        for _ in range(2):
+            self.breaker.record_failure()
+
+        with mock.patch.object(self.engine, 'connect') as connect:
+            with self.assertRaises(CircuitOpenError), DbConnectionHandler(self.engine):
+                pass
+            connect.assert_not_called()
+
+
+class TestPoolTimeoutConfig(unittest.TestCase):
+    """
+    The pool checkout timeout must fit in every request deadline.
+    """
+
+    def test_pool_timeout_below_deadlines(self) -> None:
+        """
+        A checkout that can outlast the shortest route deadline is rejected, disabled deadlines are ignored.
+        """
+        base = container['config'].model_dump()
+
+        Config(**{**base, 'DB_POOL_TIMEOUT_SEC': 1.0, 'REQUEST_TIMEOUTS': {'/auth/refresh': 2.0, '/export': 0}})
+        with self.assertRaises(ValidationError):
+            Config(**{**base, 'DB_POOL_TIMEOUT_SEC': 5.0, 'REQUEST_TIMEOUTS': {'/auth/refresh': 2.0}})
+        with self.assertRaises(ValidationError):
+            Config(**{**base, 'DB_POOL_TIMEOUT_SEC': 10.0, 'REQUEST_TIMEOUT_SEC': 10.0, 'REQUEST_TIMEOUTS': {}})
@@ -0,0 +1,130 @@
+"""
+Export formatting and streaming tests.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from datetime import timezone
+from dayfeel_auth.db.sqlalchemy.repository import exports
+from dayfeel_auth.db.sqlalchemy.repository.exports import ExportsRepository
+from dayfeel_auth.enums.user_role import UserRole
+from dayfeel_auth.utils.exports import format_batches
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from unittest import mock
+from uuid import UUID
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+
+# --- TYPES ---
+from typing import List
+
+
+# --- GLOBALS ---
+COLUMNS = ['id', 'name', 'role', 'jti', 'created_at']
+JTI = UUID('12345678-1234-5678-1234-567812345678')
+CREATED_AT = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+
+# --- CODE ---
+class TestFormatBatches(unittest.TestCase):
+    """
+    Batches of rows formatted as CSV and NDJSON.
+    """
+
+    def test_csv_quotes_values(self) -> None:
+        """
+        CSV has a header, and values with separators, quotes or newlines survive a round trip.
+        """
+        batches = [[(1, 'Ana, "the admin"', UserRole.ADMIN, JTI, CREATED_AT)],
+                   [(2, 'Line\nbreak', UserRole.USER, None, None)]]
+        chunks = list(format_batches(batches, columns=COLUMNS, export_format='csv'))
+
+        self.assertEqual(len(chunks), 3)
+        rows = list(csv.reader(io.StringIO(''.join(chunks))))
+        self.assertEqual(rows, [COLUMNS,
+                                ['1', 'Ana, "the admin"', 'admin', str(JTI), CREATED_AT.isoformat()],
+                                ['2', 'Line\nbreak', 'user', '', '']])
+
+
+    def test_ndjson_one_object_per_line(self) -> None:
+        """
+        NDJSON has one JSON object per row, one chunk per batch, with exported values.
+        """
+        batches = [[(1, 'Ana', UserRole.ADMIN, JTI, CREATED_AT), (2, 'Bob', UserRole.USER, None, None)]]
+        chunks = list(format_batches(batches, columns=COLUMNS, export_format='ndjson'))
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual([json.loads(line) for line in chunks[0].splitlines()],
+                         [{'id': 1, 'name': 'Ana', 'role': 'admin', 'jti': str(JTI),
+                           'created_at': CREATED_AT.isoformat()},
+                          {'id': 2, 'name': 'Bob', 'role': 'user', 'jti': None, 'created_at': None}])
+
+
+    def test_empty_result(self) -> None:
+        """
+        An empty table gives a header only in CSV, nothing in NDJSON, and reports zero rows.
+        """
+        on_done = mock.Mock()
+
+        self.assertEqual(''.join(format_batches([], columns=COLUMNS, export_format='csv', on_done=on_done)),
+                         'id,name,role,jti,created_at\r\n')
+        self.assertEqual(''.join(format_batches([], columns=COLUMNS, export_format='ndjson', on_done=on_done)), '')
+        self.assertEqual([call.args[0] for call in on_done.call_args_list], [0, 0])
+
+
+class TestExportsStream(unittest.TestCase):
+    """
+    Streaming a table in batches, outside the request pool.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a SQLite database file with a numbered table.
+
+        :returns: None.
+        """
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.engine = create_engine(f"sqlite:///{os.path.join(directory, 'exports.db')}")
+        self.addCleanup(self.engine.dispose)
+
+        with self.engine.begin() as connection:
+            connection.execute(text('CREATE TABLE items (id integer PRIMARY KEY)'))
+            connection.execute(text('WITH RECURSIVE n(id) AS (SELECT 1 UNION ALL SELECT id + 1 FROM n WHERE id < 25) '
+                                    'INSERT INTO items SELECT id FROM n'))
+
+        # Export the numbered table in place of users
+        patcher = mock.patch.dict(exports.EXPORT_STATEMENTS, {'users': text('SELECT id FROM items ORDER BY id')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(exports.get_export_engine.cache_clear)
+
+
+    def test_batches_continue_where_the_last_ended(self) -> None:
+        """
+        Every row is streamed once, in order, in batches of the requested size.
+        """
+        batches = list(ExportsRepository(self.engine).stream('users', batch_size=10))
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual([row[0] for batch in batches for row in batch], list(range(1, 26)))
+
+
+    def test_export_does_not_hold_pooled_connections(self) -> None:
+        """
+        While an export is streaming, the request engine's pool has no connection checked out.
+        """
+        checked_out: List[int] = []
+        for _ in ExportsRepository(self.engine).stream('users', batch_size=10):
+            checked_out.append(self.engine.pool.checkedout())
+
+        self.assertEqual(checked_out, [0, 0, 0])
+        self.assertIsNot(exports.get_export_engine(self.engine), self.engine)
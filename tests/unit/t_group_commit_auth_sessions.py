@@ -0,0 +1,190 @@
+"""
+Group commit session store tests.
+"""
+
+# --- IMPORTS ---
+from concurrent.futures import ThreadPoolExecutor
+from dayfeel_auth.db.sqlalchemy.repository.auth_sessions import AuthSessionsRepository
+from dayfeel_auth.db.sqlalchemy.repository.group_commit_auth_sessions import GroupCommitAuthSessionsRepository
+from dayfeel_auth.err.deadline_exceeded_error import DeadlineExceededError
+from dayfeel_auth.utils.deadlines import REQUEST_DEADLINE
+from threading import Event
+from unittest import mock
+
+import time
+import unittest
+
+
+# --- TYPES ---
+from typing import Any
+from typing import List
+from typing import Optional
+
+
+# --- CODE ---
+class StubGroupCommitRepository(GroupCommitAuthSessionsRepository):
+    """
+    Group commit store writing batches to a list instead of the database.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        """
+        Initializes the store over a fake engine.
+
+        :param kwargs: Batching options.
+
+        :returns: None.
+        """
+        super().__init__(engine=mock.Mock(), **kwargs)
+        self.batches: List[List[Any]] = []
+        self.error: Optional[Exception] = None
+
+        # Set to hold the writer inside its next batch
+        self.blocked = Event()
+        self.writing = Event()
+        self.release = Event()
+
+
+    def insert_sessions(self, sessions: List[Any]) -> None:
+        """
+        Record a batch, or fail it.
+
+        :param sessions: Sessions of the batch.
+
+        :returns: None.
+        """
+        if self.blocked.is_set():
+            self.writing.set()
+            self.release.wait()
+        if self.error is not None:
+            raise self.error
+        self.batches.append(sessions)
+
+
+class TestGroupCommitAuthSessions(unittest.TestCase):
+    """
+    Batching of concurrent inserts, deadlines, failures and shutdown.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates and starts a store.
+
+        :returns: None.
+        """
+        self.repository = StubGroupCommitRepository(max_wait_ms=200, max_batch=4)
+        self.repository.start()
+        self.addCleanup(self.repository.release.set)
+        self.addCleanup(self.repository.stop)
+        self.executor = ThreadPoolExecutor(max_workers=20)
+        self.addCleanup(self.executor.shutdown)
+
+
+    def test_concurrent_inserts_share_a_commit(self) -> None:
+        """
+        Inserts arriving together are written in one batch, and each request gets its own session back.
+        """
+        sessions = [mock.Mock() for _ in range(3)]
+        results = list(self.executor.map(self.repository.insert_session, sessions))
+
+        self.assertEqual(results, sessions)
+        self.assertEqual(len(self.repository.batches), 1)
+        self.assertCountEqual(self.repository.batches[0], sessions)
+
+
+    def test_batches_are_capped(self) -> None:
+        """
+        No batch holds more than the maximum, and every session is written once.
+        """
+        sessions = [mock.Mock() for _ in range(10)]
+        list(self.executor.map(self.repository.insert_session, sessions))
+
+        self.assertTrue(all(len(batch) <= 4 for batch in self.repository.batches))
+        self.assertCountEqual([session for batch in self.repository.batches for session in batch], sessions)
+
+
+    def test_batch_failure_reaches_every_request(self) -> None:
+        """
+        A failed batch fails each request waiting on it with the same error.
+        """
+        self.repository.error = RuntimeError('Database down')
+        futures = [self.executor.submit(self.repository.insert_session, mock.Mock()) for _ in range(3)]
+
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+
+
+    def test_expired_deadline_queues_nothing(self) -> None:
+        """
+        A request already past its deadline fails without queueing its session.
+        """
+        token = REQUEST_DEADLINE.set(time.monotonic() - 1)
+        try:
+            with self.assertRaises(DeadlineExceededError):
+                self.repository.insert_session(mock.Mock())
+        finally:
+            REQUEST_DEADLINE.reset(token)
+
+        self.repository.stop()
+        self.assertEqual(self.repository.batches, [])
+
+
+    def test_timed_out_session_is_not_written(self) -> None:
+        """
+        A request whose deadline passes while it waits fails, and its session is withdrawn from the batch.
+        """
+        # Hold the writer in a first batch
+        self.repository.blocked.set()
+        first = self.executor.submit(self.repository.insert_session, mock.Mock())
+        self.assertTrue(self.repository.writing.wait(timeout=5))
+
+        # Queue a session behind it with a short deadline
+        late = mock.Mock()
+        with self.assertRaises(DeadlineExceededError):
+            self.executor.submit(self.__insert_with_deadline, late, 0.05).result(timeout=5)
+
+        # Once released, the writer commits the first batch only
+        self.repository.blocked.clear()
+        self.repository.release.set()
+        first.result(timeout=5)
+        self.repository.stop()
+        self.assertNotIn(late, [session for batch in self.repository.batches for session in batch])
+
+
+    def test_inserts_racing_stop_are_all_written(self) -> None:
+        """
+        Inserts made while stopping are written by the writer, the final drain or directly, never lost.
+        """
+        direct: List[Any] = []
+        with mock.patch.object(AuthSessionsRepository, 'insert_session',
+                               lambda _, session: direct.append(session) or session):
+            sessions = [mock.Mock() for _ in range(50)]
+            futures = [self.executor.submit(self.repository.insert_session, session) for session in sessions]
+            self.repository.stop()
+            results = [future.result(timeout=5) for future in futures]
+
+            # After stopping, inserts go straight to the database
+            after_stop = mock.Mock()
+            self.repository.insert_session(after_stop)
+
+        self.assertEqual(results, sessions)
+        self.assertCountEqual([session for batch in self.repository.batches for session in batch] + direct,
+                              sessions + [after_stop])
+
+
+# --- Private helpers ---
+    def __insert_with_deadline(self, session: Any, timeout_sec: float) -> Any:
+        """
+        Insert a session as a request with a deadline would.
+
+        :param session: Session.
+        :param timeout_sec: Seconds before the deadline.
+
+        :returns: The session.
+        """
+        token = REQUEST_DEADLINE.set(time.monotonic() + timeout_sec)
+        try:
+            return self.repository.insert_session(session)
+        finally:
+            REQUEST_DEADLINE.reset(token)
@@ -0,0 +1,179 @@
+"""
+HS256 codec tests.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.app import container
+from dayfeel_auth.err.invalid_token_error import InvalidTokenError
+from dayfeel_auth.utils import auth
+from dayfeel_auth.utils.hs256 import HS256Codec
+from unittest import mock
+from uuid import uuid4
+
+import jwt
+import time
+import unittest
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Dict
+
+
+# --- GLOBALS ---
+SECRET = 'test-secret-key-of-a-reasonable-length!!'
+
+
+# --- CODE ---
+def make_claims(**overrides: Any) -> Dict[str, Any]:
+    """
+    Build the claims of an access token, as the service writes them.
+
+    :param overrides: Claims to replace or add (None removes the claim).
+
+    :returns: Claims.
+    """
+    now = int(time.time())
+    claims = {'iss': auth.ISSUER, 'sub': '42', 'exp': now + 900, 'iat': now, 'nbf': now, 'jti': str(uuid4()),
+              'name': 'Ana', 'email': 'ana@example.com', 'role': 'USER', 'ver': 3}
+    claims.update(overrides)
+    return {claim: value for claim, value in claims.items() if value is not None}
+
+
+class TestHS256Codec(unittest.TestCase):
+    """
+    Codec output and checks, compared with PyJWT.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a codec.
+
+        :returns: None.
+        """
+        self.codec = HS256Codec(SECRET)
+
+
+    def test_encode_matches_pyjwt(self) -> None:
+        """
+        Tokens are byte-for-byte what PyJWT produces for the same claims.
+        """
+        for claims in (make_claims(), make_claims(email=None, sub='client:svc_1', role='service'), {'a': 'é'}):
+            self.assertEqual(self.codec.encode(claims), jwt.encode(claims, SECRET, algorithm='HS256'))
+
+
+    def test_decode_valid_token(self) -> None:
+        """
+        Valid tokens, from the codec or from PyJWT, decode to their claims.
+        """
+        claims = make_claims()
+        for token in (self.codec.encode(claims), jwt.encode(claims, SECRET, algorithm='HS256')):
+            self.assertEqual(self.__decode(token), claims)
+
+
+    def test_decode_rejects_malformed_token(self) -> None:
+        """
+        Malformed tokens are left to PyJWT.
+        """
+        token = self.codec.encode(make_claims())
+        header, payload, _ = token.split('.')
+        for malformed in ('', 'abc', token + '.x', f'{header}.{payload}', f'{header}.!!!.{payload}', 'é.é.é',
+                          self.codec.encode(['not', 'an', 'object'])):  # type: ignore[arg-type]
+            self.assertIsNone(self.__decode(malformed), malformed)
+
+
+    def test_decode_rejects_invalid_claims(self) -> None:
+        """
+        Expired, future, wrong-issuer, incomplete or unusual tokens are left to PyJWT.
+        """
+        now = int(time.time())
+        for claims in (make_claims(exp=now - 10), make_claims(iat=now + 60), make_claims(nbf=now + 60),
+                       make_claims(iss='someone-else'), make_claims(iss=None), make_claims(jti=None),
+                       make_claims(aud='api'), make_claims(exp=float(now + 900)), make_claims(sub=42)):
+            self.assertIsNone(self.__decode(self.codec.encode(claims)), claims)
+
+
+    def test_decode_tolerates_leeway(self) -> None:
+        """
+        Clock skew within the leeway is accepted, like PyJWT does.
+        """
+        now = int(time.time())
+        claims = make_claims(exp=now - 2, iat=now + 2, nbf=now + 2)
+        self.assertEqual(self.__decode(self.codec.encode(claims)), claims)
+
+
+    def test_decode_rejects_tampering(self) -> None:
+        """
+        Changed payloads, signatures, headers or secrets fail verification.
+        """
+        token = self.codec.encode(make_claims())
+        header, payload, signature = token.split('.')
+        forged_payload = self.codec.encode(make_claims(role='ADMIN')).split('.')[1]
+        forged_signature = ('A' if signature[0] != 'A' else 'B') + signature[1:]
+        none_header = jwt.utils.base64url_encode(b'{"alg":"none","typ":"JWT"}').decode()
+
+        for tampered in (f'{header}.{forged_payload}.{signature}', f'{header}.{payload}.{forged_signature}',
+                         f'{none_header}.{payload}.', f'{none_header}.{payload}.{signature}',
+                         HS256Codec('another-secret').encode(make_claims())):
+            self.assertIsNone(self.__decode(tampered), tampered)
+            with self.assertRaises(jwt.InvalidTokenError):
+                jwt.decode(tampered, SECRET, algorithms=['HS256'], issuer=auth.ISSUER)
+
+
+# --- Private helpers ---
+    def __decode(self, token: str) -> Any:
+        """
+        Decode a token with the service's checks.
+
+        :param token: Encoded token.
+
+        :returns: Decoded claims, or None.
+        """
+        return self.codec.decode(token, issuer=auth.ISSUER, required=auth.REQUIRED_CLAIMS, leeway=auth.LEEWAY_SEC)
+
+
+class TestDecodeTokenFallback(unittest.TestCase):
+    """
+    decode_token takes the fast path when it can, and falls back to PyJWT's errors otherwise.
+    """
+
+    def setUp(self) -> None:
+        """
+        Configures the secret, silences logs and spies on the PyJWT fallback.
+
+        :returns: None.
+        """
+        config = container['config'].model_copy(update={'JWT_SECRET_KEY': SECRET})
+        for patcher in (mock.patch.dict(container, {'config': config, 'logger': mock.Mock()}),
+                        mock.patch.object(auth, 'decode_token_with_pyjwt', wraps=auth.decode_token_with_pyjwt)):
+            self.addCleanup(patcher.stop)
+            patcher.start()
+
+
+    def test_valid_token_skips_pyjwt(self) -> None:
+        """
+        A valid token is decoded without PyJWT.
+        """
+        claims = make_claims()
+        self.assertEqual(auth.decode_token(jwt.encode(claims, SECRET, algorithm='HS256')), claims)
+        auth.decode_token_with_pyjwt.assert_not_called()  # pylint: disable=E1101
+
+
+    def test_invalid_tokens_report_pyjwt_errors(self) -> None:
+        """
+        Rejected tokens raise the same errors as before the codec.
+        """
+        now = int(time.time())
+        cases = {'Expired token': jwt.encode(make_claims(exp=now - 60), SECRET, algorithm='HS256'),
+                 'Invalid issuer': jwt.encode(make_claims(iss='someone-else'), SECRET, algorithm='HS256'),
+                 'Invalid signature': jwt.encode(make_claims(), 'another-secret-of-a-reasonable-length!',
+                                                 algorithm='HS256'),
+                 'Missing required claim: jti': jwt.encode(make_claims(jti=None), SECRET, algorithm='HS256'),
+                 'Failed to validate token': 'not-a-token'}
+
+        for message, token in cases.items():
+            with self.assertRaises(InvalidTokenError) as raised:
+                auth.decode_token(token)
+            self.assertIn(message, str(raised.exception.args[-1]))
+
+        self.assertEqual(auth.decode_token_with_pyjwt.call_count, len(cases))  # pylint: disable=E1101
@@ -0,0 +1,190 @@
+"""
+Login audit trail tests: the event buffer and monthly partitions.
+
+Partition tests run against a migrated Postgres database given by
+TEST_POSTGRES_URL (they use a far-future month and clean it up), skipped otherwise.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from datetime import timezone
+from dayfeel_auth.app import container
+from dayfeel_auth.db.sqlalchemy.repository.login_events import LoginEventsRepository
+from dayfeel_auth.schemas.records.login_events import LoginEventRecord
+from dayfeel_auth.utils.login_events import LoginEventBuffer
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from unittest import mock
+
+import os
+import unittest
+
+
+# --- GLOBALS ---
+TEST_POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+# Month no migration or running service creates
+MONTH = datetime(2099, 5, 1, tzinfo=timezone.utc)
+PARTITION = 'auth.login_events_y2099m05'
+
+
+# --- CODE ---
+def make_event(occurred_at: datetime = MONTH, user_id: int = 1) -> LoginEventRecord:
+    """
+    Build a successful login event.
+
+    :param occurred_at: Instant of the attempt.
+    :param user_id: User's unique identificator.
+
+    :returns: Login event.
+    """
+    return LoginEventRecord(occurred_at=occurred_at, user_id=user_id, success=True,
+                            ip_address='127.0.0.1', user_agent='tests')
+
+
+class TestLoginEventBuffer(unittest.TestCase):
+    """
+    Buffering, batching and dropping of login events.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a fake repository and silences logs.
+
+        :returns: None.
+        """
+        self.logger = mock.Mock()
+        patcher = mock.patch.dict(container, {'logger': self.logger})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.repository = mock.Mock()
+
+
+    def test_full_buffer_drops_events(self) -> None:
+        """
+        Events past the capacity are dropped and counted, and the drops are logged on the next flush.
+        """
+        buffer = LoginEventBuffer(self.repository, capacity=2, flush_interval_ms=250, max_batch=10,
+                                  partitions_ahead=0)
+        events = [make_event(user_id=user_id) for user_id in range(3)]
+        for event in events:
+            buffer.record(event)
+
+        self.assertEqual(buffer.dropped, 1)
+        buffer.flush()
+        self.repository.insert_events.assert_called_once_with(events[:2])
+        self.logger.warning.assert_called_once()
+
+        # Drops are reported once
+        buffer.flush()
+        self.logger.warning.assert_called_once()
+
+
+    def test_flush_writes_in_batches(self) -> None:
+        """
+        A flush writes every buffered event, in order, in inserts of at most 'max_batch' events.
+        """
+        buffer = LoginEventBuffer(self.repository, capacity=10, flush_interval_ms=250, max_batch=2,
+                                  partitions_ahead=0)
+        events = [make_event(user_id=user_id) for user_id in range(5)]
+        for event in events:
+            buffer.record(event)
+        buffer.flush()
+
+        batches = [call.args[0] for call in self.repository.insert_events.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual([event for batch in batches for event in batch], events)
+
+
+    def test_failed_write_drops_batch(self) -> None:
+        """
+        A batch that cannot be written is dropped and counted, the next batches are still written.
+        """
+        buffer = LoginEventBuffer(self.repository, capacity=10, flush_interval_ms=250, max_batch=2,
+                                  partitions_ahead=0)
+        self.repository.insert_events.side_effect = [RuntimeError('Database down'), None]
+        for user_id in range(4):
+            buffer.record(make_event(user_id=user_id))
+        buffer.flush()
+
+        self.assertEqual(self.repository.insert_events.call_count, 2)
+        self.assertEqual(buffer.dropped, 2)
+
+
+    def test_stop_flushes_remaining_events(self) -> None:
+        """
+        Events buffered between flushes are written when the buffer stops.
+        """
+        buffer = LoginEventBuffer(self.repository, capacity=10, flush_interval_ms=60_000, max_batch=10,
+                                  partitions_ahead=0)
+        buffer.start()
+        event = make_event()
+        buffer.record(event)
+        buffer.stop()
+
+        self.repository.insert_events.assert_called_once_with([event])
+
+
+    def test_disabled_buffer_records_nothing(self) -> None:
+        """
+        With no capacity, events are ignored without counting as drops.
+        """
+        buffer = LoginEventBuffer(self.repository, capacity=0, flush_interval_ms=250, max_batch=10,
+                                  partitions_ahead=0)
+        buffer.start()
+        buffer.record(make_event())
+        buffer.stop()
+
+        self.assertEqual(buffer.dropped, 0)
+        self.repository.insert_events.assert_not_called()
+
+
+@unittest.skipUnless(TEST_POSTGRES_URL, 'TEST_POSTGRES_URL is not set')
+class TestLoginEventPartitions(unittest.TestCase):
+    """
+    Monthly partitions created after their events arrived.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a repository over the test database.
+
+        :returns: None.
+        """
+        self.engine = create_engine(TEST_POSTGRES_URL)
+        self.repository = LoginEventsRepository(self.engine)
+        self.addCleanup(self.engine.dispose)
+        self.addCleanup(self.__drop_month)
+
+
+    def test_partition_takes_over_default_rows(self) -> None:
+        """
+        Events that landed in the default partition move into their month once it is created.
+        """
+        self.repository.insert_events([make_event(MONTH), make_event(MONTH.replace(day=31, hour=23))])
+
+        self.repository.ensure_partitions(now=MONTH, months_ahead=0)
+        # Creating it again is a no-op
+        self.repository.ensure_partitions(now=MONTH, months_ahead=0)
+
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text(f'SELECT count(*) FROM {PARTITION}')).scalar(), 2)
+            self.assertEqual(connection.execute(text('SELECT count(*) FROM auth.login_events_default '
+                                                     'WHERE occurred_at >= :start'), {'start': MONTH}).scalar(), 0)
+
+            # The default partition is attached again
+            self.assertTrue(connection.execute(text("SELECT relispartition FROM pg_class "
+                                                    "WHERE oid = 'auth.login_events_default'::regclass")).scalar())
+
+
+# --- Private helpers ---
+    def __drop_month(self) -> None:
+        """
+        Remove the test month and its events, wherever they are.
+
+        :returns: None.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text(f'DROP TABLE IF EXISTS {PARTITION}'))
+            connection.execute(text('DELETE FROM auth.login_events WHERE occurred_at >= :start'), {'start': MONTH})
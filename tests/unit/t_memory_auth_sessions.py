@@ -0,0 +1,138 @@
+"""
+In-memory session store tests.
+"""
+
+# --- IMPORTS ---
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from dayfeel_auth.app import container
+from dayfeel_auth.db.memory.repository.auth_sessions import MemoryAuthSessionsRepository
+from unittest import mock
+from uuid import uuid4
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+
+# --- TYPES ---
+from typing import Any
+
+
+# --- CODE ---
+def make_session(user_id: int = 1, expires_in_sec: float = 3600) -> Any:
+    """
+    Build a session as the routers insert it.
+
+    :param user_id: User's unique identificator.
+    :param expires_in_sec: Seconds before the session expires (negative if already expired).
+
+    :returns: Session.
+    """
+    return mock.Mock(jti=uuid4(), user_id=user_id, revoked=False,
+                     expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in_sec))
+
+
+class TestMemoryAuthSessions(unittest.TestCase):
+    """
+    Sessions kept in memory, their expiry and their snapshots.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a scratch directory for snapshots and silences logs.
+
+        :returns: None.
+        """
+        self.logger = mock.Mock()
+        patcher = mock.patch.dict(container, {'logger': self.logger})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.snapshot_path = os.path.join(self.directory, 'sessions.jsonl')
+
+
+    def test_insert_get_revoke(self) -> None:
+        """
+        Inserted sessions are found, and revoked exactly once.
+        """
+        repository = MemoryAuthSessionsRepository()
+        session = make_session(user_id=7)
+        repository.insert_session(session)
+
+        record = repository.get_by_jti(session.jti)
+        self.assertEqual((record.jti, record.user_id, record.revoked), (session.jti, 7, False))
+
+        self.assertTrue(repository.revoke_session(session.jti))
+        self.assertFalse(repository.revoke_session(session.jti))
+        self.assertFalse(repository.revoke_session(uuid4()))
+        self.assertTrue(repository.get_by_jti(session.jti).revoked)
+        self.assertIsNone(repository.get_by_jti(uuid4()))
+
+
+    def test_expired_sessions_are_swept(self) -> None:
+        """
+        Expired sessions are deleted, by hand or by the expiry thread, live ones are kept.
+        """
+        repository = MemoryAuthSessionsRepository(expiry_interval_sec=0.01)
+        expired, live = make_session(expires_in_sec=-1), make_session()
+        for session in (expired, live):
+            repository.insert_session(session)
+
+        self.assertEqual(repository.delete_expired_sessions(), 1)
+        self.assertIsNone(repository.get_by_jti(expired.jti))
+        self.assertIsNotNone(repository.get_by_jti(live.jti))
+
+        # Sessions expiring later are swept in the background
+        repository.insert_session(expired)
+        repository.start()
+        self.addCleanup(repository.stop)
+        deadline = time.monotonic() + 5
+        while repository.get_by_jti(expired.jti) is not None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(repository.get_by_jti(expired.jti))
+
+
+    def test_snapshot_round_trip(self) -> None:
+        """
+        Live sessions, revoked or not, survive a snapshot and reload; expired ones are dropped.
+        """
+        repository = MemoryAuthSessionsRepository(snapshot_path=self.snapshot_path)
+        sessions = [make_session(user_id=1), make_session(user_id=2), make_session(expires_in_sec=-1)]
+        for session in sessions:
+            repository.insert_session(session)
+        repository.revoke_session(sessions[1].jti)
+        repository.stop()
+
+        # Written through a temporary file renamed over the snapshot
+        self.assertEqual(os.listdir(self.directory), ['sessions.jsonl'])
+
+        reloaded = MemoryAuthSessionsRepository(snapshot_path=self.snapshot_path)
+        for session in sessions[:2]:
+            self.assertEqual(reloaded.get_by_jti(session.jti), repository.get_by_jti(session.jti))
+        self.assertTrue(reloaded.get_by_jti(sessions[1].jti).revoked)
+        self.assertIsNone(reloaded.get_by_jti(sessions[2].jti))
+
+
+    def test_failed_snapshot_does_not_break_stop(self) -> None:
+        """
+        A snapshot that cannot be written is logged on stop, and retried by the next snapshot.
+        """
+        repository = MemoryAuthSessionsRepository(snapshot_path=self.snapshot_path)
+        session = make_session()
+        repository.insert_session(session)
+
+        with mock.patch('dayfeel_auth.db.memory.repository.auth_sessions.os.replace',
+                        side_effect=OSError('No space left on device')):
+            repository.stop()
+        self.logger.error.assert_called_once()
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+        # The changes are still pending
+        repository.snapshot()
+        self.assertIsNotNone(MemoryAuthSessionsRepository(snapshot_path=self.snapshot_path).get_by_jti(session.jti))
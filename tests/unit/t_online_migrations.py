@@ -0,0 +1,213 @@
+"""
+Online migration helper tests.
+
+Run against a scratch Postgres database given by TEST_POSTGRES_URL (its
+'online_migrations_test' schema is dropped and recreated), skipped otherwise.
+"""
+
+# --- IMPORTS ---
+# 'op' is a proxy bound to the running migration, its members only exist at run time
+# pylint: disable=E1101
+from alembic import op
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from dayfeel_auth.db.sqlalchemy.setup import online_migrations
+from sqlalchemy import Column
+from sqlalchemy import Integer
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.exc import OperationalError
+from threading import Timer
+from unittest import mock
+
+import os
+import unittest
+
+
+# --- TYPES ---
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+
+# --- GLOBALS ---
+TEST_POSTGRES_URL = os.environ.get('TEST_POSTGRES_URL')
+
+# Scratch schema the helpers work in
+SCHEMA = 'online_migrations_test'
+
+
+# --- CODE ---
+@unittest.skipUnless(TEST_POSTGRES_URL, 'TEST_POSTGRES_URL is not set')
+class TestOnlineMigrations(unittest.TestCase):
+    """
+    Online migration helpers against Postgres.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a scratch table with a few rows.
+
+        :returns: None.
+        """
+        self.engine = create_engine(TEST_POSTGRES_URL)
+        with self.engine.begin() as connection:
+            connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+            connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+            connection.execute(text(f'CREATE TABLE {SCHEMA}.items (id serial PRIMARY KEY, code integer)'))
+            connection.execute(text(f'INSERT INTO {SCHEMA}.items (code) SELECT n FROM generate_series(1, 100) n'))
+
+
+    def tearDown(self) -> None:
+        """
+        Drops the scratch schema.
+
+        :returns: None.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+        self.engine.dispose()
+
+
+    def test_create_index_rebuilds_invalid_index(self) -> None:
+        """
+        An invalid index left by a failed concurrent build is rebuilt, not kept by IF NOT EXISTS.
+        """
+        # Fail a unique build on duplicates: Postgres leaves the index behind, invalid
+        self.__execute(f'UPDATE {SCHEMA}.items SET code = 1 WHERE id = 2')
+        with self.assertRaises(IntegrityError):
+            self.__migrate(self.__create_index)
+        self.assertTrue(self.__migrate(lambda: online_migrations.is_invalid_index('ix_items_code', SCHEMA)))
+
+        # Rerun once the data is fixed
+        self.__execute(f'UPDATE {SCHEMA}.items SET code = 2 WHERE id = 2')
+        self.__migrate(self.__create_index)
+        self.assertFalse(self.__migrate(lambda: online_migrations.is_invalid_index('ix_items_code', SCHEMA)))
+        with self.assertRaises(IntegrityError):
+            self.__execute(f'INSERT INTO {SCHEMA}.items (code) VALUES (1)')
+
+
+    def test_lock_timeout_is_retried(self) -> None:
+        """
+        A statement whose lock is not granted in time is retried once the lock is released.
+        """
+        blocker = self.engine.connect()
+        try:
+
+            # Hold a conflicting lock for a few lock timeouts
+            blocker.execute(text(f'LOCK TABLE {SCHEMA}.items IN ACCESS EXCLUSIVE MODE'))
+            Timer(0.5, blocker.rollback).start()
+
+            # Add a column: the first attempts time out, a later one gets the lock
+            with mock.patch.object(online_migrations, 'LOCK_RETRY_SLEEP_SEC', 0.2), \
+                 self.assertLogs(online_migrations.LOGGER, 'WARNING'):
+                self.__migrate(lambda: online_migrations.run_with_lock_timeout(
+                    lambda: op.add_column('items', Column('flag', Integer()), schema=SCHEMA),
+                    lock_timeout='100ms', attempts=10))
+
+        finally:
+            blocker.close()
+
+        self.assertEqual(self.__migrate(lambda: online_migrations.get_column_type('items', 'flag', SCHEMA)),
+                         'integer')
+
+
+    def test_lock_timeout_gives_up(self) -> None:
+        """
+        A statement whose lock is never granted fails after its attempts, and atomic operations roll back.
+        """
+        blocker = self.engine.connect()
+        try:
+
+            # Hold a conflicting lock for longer than all attempts
+            blocker.execute(text(f'LOCK TABLE {SCHEMA}.items IN ACCESS EXCLUSIVE MODE'))
+
+            # Create a table, then alter the locked one
+            def operation() -> None:
+                op.execute(f'CREATE TABLE {SCHEMA}.other (id integer)')
+                op.execute(f'ALTER TABLE {SCHEMA}.items ADD COLUMN flag integer')
+
+            with mock.patch.object(online_migrations, 'LOCK_RETRY_SLEEP_SEC', 0), \
+                 self.assertRaises(OperationalError):
+                self.__migrate(lambda: online_migrations.run_with_lock_timeout(
+                    operation, lock_timeout='50ms', attempts=2, atomic=True))
+
+        finally:
+            blocker.close()
+
+        # Nothing of the operation was committed
+        self.assertIsNone(self.__migrate(lambda: online_migrations.get_column_type('other', 'id', SCHEMA)))
+        self.assertIsNone(self.__migrate(lambda: online_migrations.get_column_type('items', 'flag', SCHEMA)))
+
+
+    def test_atomic_operation_rolls_back_on_error(self) -> None:
+        """
+        An atomic operation failing for another reason than a lock is not retried, and commits nothing.
+        """
+        # Create a table, then fail
+        def operation() -> None:
+            op.execute(f'CREATE TABLE {SCHEMA}.other (id integer)')
+            raise RuntimeError('Step failed')
+
+        with self.assertRaises(RuntimeError):
+            self.__migrate(lambda: online_migrations.run_with_lock_timeout(operation, atomic=True))
+        self.assertIsNone(self.__migrate(lambda: online_migrations.get_column_type('other', 'id', SCHEMA)))
+
+
+    def test_steps_can_be_rerun(self) -> None:
+        """
+        Column, backfill and NOT NULL steps succeed again on top of their own committed work.
+        """
+        def steps() -> None:
+            online_migrations.add_column('items', Column('doubled', Integer()), SCHEMA)
+            online_migrations.backfill_in_batches('items', 'doubled = code * 2', 'doubled IS NULL', SCHEMA,
+                                                  batch_size=30, pause_sec=0)
+            online_migrations.set_not_null('items', 'doubled', SCHEMA)
+
+        # Run the steps twice, the second time on top of the first
+        self.__migrate(steps)
+        self.__migrate(steps)
+
+        # Every row is backfilled, and the column is NOT NULL
+        self.assertEqual(self.__execute(f'SELECT count(*) FROM {SCHEMA}.items WHERE doubled = code * 2'), 100)
+        with self.assertRaises(IntegrityError):
+            self.__execute(f'INSERT INTO {SCHEMA}.items (code) VALUES (0)')
+
+
+# --- Private helpers ---
+    @staticmethod
+    def __create_index() -> None:
+        """
+        Build the unique index of the tests.
+
+        :returns: None.
+        """
+        online_migrations.create_index_concurrently('ix_items_code', 'items', 'code', SCHEMA, unique=True)
+
+
+    def __migrate(self, steps: Callable[[], Any]) -> Any:
+        """
+        Run steps in a migration context, as Alembic does for 'upgrade()'.
+
+        :param steps: Function using 'op' and the online migration helpers.
+
+        :returns: What the steps return.
+        """
+        with self.engine.connect() as connection:
+            context = MigrationContext.configure(connection)
+            with Operations.context(context), context.begin_transaction():
+                return steps()
+
+
+    def __execute(self, statement: str) -> Optional[Any]:
+        """
+        Run a statement in its own transaction, outside the migration context.
+
+        :param statement: SQL statement.
+
+        :returns: First column of the first row, if the statement returns rows.
+        """
+        with self.engine.begin() as connection:
+            result = connection.execute(text(statement))
+            return result.scalar() if result.returns_rows else None
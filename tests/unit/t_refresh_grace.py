@@ -0,0 +1,149 @@
+"""
+Refresh token grace window tests.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.utils.refresh_grace import RefreshGraceCache
+from dayfeel_auth.utils.refresh_grace import TokenPair
+from uuid import uuid4
+
+import asyncio
+import unittest
+
+
+# --- TYPES ---
+from typing import Awaitable
+from typing import Callable
+
+
+# --- CODE ---
+class TestRefreshGraceCache(unittest.IsolatedAsyncioTestCase):
+    """
+    Coalescing and replay of refresh token rotations.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a cache and a rotation counter.
+
+        :returns: None.
+        """
+        self.cache = RefreshGraceCache(grace_sec=10.0, max_size=100)
+        self.rotations = 0
+
+
+    async def test_concurrent_duplicates_share_one_rotation(self) -> None:
+        """
+        Duplicates arriving while a rotation runs wait for it and get the same pair.
+        """
+        jti = uuid4()
+        pairs = await asyncio.gather(*(self.cache.rotate(jti, self.__rotation(delay_sec=0.05)) for _ in range(10)))
+
+        self.assertEqual(self.rotations, 1)
+        self.assertTrue(all(pair is pairs[0] for pair in pairs))
+
+
+    async def test_duplicate_within_window_is_replayed(self) -> None:
+        """
+        A duplicate arriving after the rotation, within the window, gets the same pair without rotating.
+        """
+        jti = uuid4()
+        first = await self.cache.rotate(jti, self.__rotation())
+        second = await self.cache.rotate(jti, self.__rotation())
+
+        self.assertEqual(self.rotations, 1)
+        self.assertIs(second, first)
+
+
+    async def test_tokens_are_rotated_separately(self) -> None:
+        """
+        Different tokens never share a rotation.
+        """
+        first = await self.cache.rotate(uuid4(), self.__rotation())
+        second = await self.cache.rotate(uuid4(), self.__rotation())
+
+        self.assertEqual(self.rotations, 2)
+        self.assertNotEqual(first, second)
+
+
+    async def test_window_disabled_still_coalesces(self) -> None:
+        """
+        With no window, concurrent duplicates still share a rotation, but later ones rotate again.
+        """
+        self.cache = RefreshGraceCache(grace_sec=0, max_size=100)
+        jti = uuid4()
+        await asyncio.gather(*(self.cache.rotate(jti, self.__rotation(delay_sec=0.05)) for _ in range(3)))
+        self.assertEqual(self.rotations, 1)
+
+        await self.cache.rotate(jti, self.__rotation())
+        self.assertEqual(self.rotations, 2)
+
+
+    async def test_failure_is_shared_and_not_remembered(self) -> None:
+        """
+        A failed rotation fails its duplicates the same way, and the next request tries again.
+        """
+        jti = uuid4()
+        results = await asyncio.gather(*(self.cache.rotate(jti, self.__rotation(delay_sec=0.05, fail=True))
+                                         for _ in range(3)), return_exceptions=True)
+
+        self.assertEqual(self.rotations, 1)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+        await self.cache.rotate(jti, self.__rotation())
+        self.assertEqual(self.rotations, 2)
+
+
+    async def test_cancelled_rotation_releases_duplicates(self) -> None:
+        """
+        Cancelling the request running a rotation does not leave its duplicates waiting forever.
+        """
+        jti = uuid4()
+        leader = asyncio.ensure_future(self.cache.rotate(jti, self.__rotation(delay_sec=10)))
+        await asyncio.sleep(0.01)
+        duplicate = asyncio.ensure_future(self.cache.rotate(jti, self.__rotation()))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(duplicate, timeout=1)
+
+        # The token can be rotated again
+        await self.cache.rotate(jti, self.__rotation())
+        self.assertEqual(self.rotations, 2)
+
+
+    async def test_cancelled_duplicate_does_not_cancel_rotation(self) -> None:
+        """
+        A duplicate that gives up does not cancel the rotation it waits on.
+        """
+        jti = uuid4()
+        leader = asyncio.ensure_future(self.cache.rotate(jti, self.__rotation(delay_sec=0.05)))
+        await asyncio.sleep(0.01)
+        duplicate = asyncio.ensure_future(self.cache.rotate(jti, self.__rotation()))
+        await asyncio.sleep(0.01)
+
+        duplicate.cancel()
+        pair = await leader
+        self.assertEqual(pair['rotation'], 1)
+
+
+# --- Private helpers ---
+    def __rotation(self, delay_sec: float = 0.0, fail: bool = False) -> Callable[[], Awaitable[TokenPair]]:
+        """
+        Build a rotation that counts its runs.
+
+        :param delay_sec: Seconds the rotation takes.
+        :param fail: Whether the rotation fails.
+
+        :returns: Coroutine function issuing a new pair.
+        """
+        async def rotation() -> TokenPair:
+            self.rotations += 1
+            rotation_number = self.rotations
+            await asyncio.sleep(delay_sec)
+            if fail:
+                raise RuntimeError('Rotation failed')
+            return {'access_token': f'access-{rotation_number}', 'rotation': rotation_number}
+
+        return rotation
@@ -0,0 +1,116 @@
+"""
+Read replica routing tests.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
+from dayfeel_auth.db.sqlalchemy.setup.replica_set import ReplicaSet
+from sqlalchemy import Engine
+from sqlalchemy import create_engine
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from unittest import mock
+
+import contextlib
+import unittest
+
+
+# --- CODE ---
+def fail(replica: Engine, statement: str = 'SELECT 1') -> None:
+    """
+    Run a statement on a replica, expecting it to fail.
+
+    :param replica: Replica engine.
+    :param statement: SQL to run (valid SQL fails on an unreachable replica).
+
+    :returns: None.
+    """
+    with contextlib.suppress(DBAPIError), replica.connect() as connection:
+        connection.execute(text(statement))
+
+
+class TestReplicaSet(unittest.TestCase):
+    """
+    Replica selection, cool-down of failed replicas and fallback to the primary.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a primary and three replicas on a controlled clock; the second replica is unreachable.
+
+        :returns: None.
+        """
+        self.now = 1000.0
+        patcher = mock.patch('dayfeel_auth.db.sqlalchemy.setup.replica_set.time.monotonic',
+                             side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.primary = create_engine('sqlite://')
+        self.replicas = [create_engine('sqlite://'), create_engine('sqlite:////nonexistent/replica.db'),
+                         create_engine('sqlite://')]
+        self.replica_set = ReplicaSet(self.primary, self.replicas, retry_interval_sec=30.0)
+
+
+    def test_round_robin(self) -> None:
+        """
+        Reads cycle over every replica in turn, never the primary.
+        """
+        readers = [self.replica_set.reader() for _ in range(6)]
+
+        self.assertEqual(readers, self.replicas * 2)
+        self.assertEqual(self.replica_set.healthy_count, 3)
+
+
+    def test_failed_replica_cools_down(self) -> None:
+        """
+        A replica that lost a connection is skipped until its cool-down is over.
+        """
+        fail(self.replicas[1])
+
+        self.assertEqual(self.replica_set.healthy_count, 2)
+        self.assertNotIn(self.replicas[1], [self.replica_set.reader() for _ in range(6)])
+
+        self.now += 30.0
+        self.assertEqual(self.replica_set.healthy_count, 3)
+        self.assertIn(self.replicas[1], [self.replica_set.reader() for _ in range(3)])
+
+
+    def test_statement_errors_keep_replica(self) -> None:
+        """
+        Errors of the statement itself, on a live connection, leave the replica in rotation.
+        """
+        fail(self.replicas[0], 'SELECT * FROM missing_table')
+
+        self.assertEqual(self.replica_set.healthy_count, 3)
+
+
+    def test_fallback_to_primary(self) -> None:
+        """
+        With every replica down, or none configured, reads go to the primary.
+        """
+        unreachable = [create_engine(f'sqlite:////nonexistent/replica{index}.db') for index in range(2)]
+        replica_set = ReplicaSet(self.primary, unreachable)
+        for replica in unreachable:
+            fail(replica)
+
+        self.assertEqual(replica_set.healthy_count, 0)
+        self.assertIs(replica_set.reader(), self.primary)
+        self.assertIs(ReplicaSet(self.primary, []).reader(), self.primary)
+
+
+    def test_read_your_writes_uses_primary(self) -> None:
+        """
+        Lookups that must see the request's own writes read from the primary, others from a replica.
+        """
+        repository = UsersRepository(self.primary, replicas=self.replica_set)
+
+        with mock.patch('dayfeel_auth.db.sqlalchemy.repository.users.DbConnectionHandler') as handler:
+            handler.return_value.__enter__.return_value.session.execute.return_value.one_or_none.return_value = None
+            repository.get_by_email('ana@example.com', primary=True)
+            repository.get_by_id(1, primary=True)
+            repository.get_by_email('ana@example.com')
+
+        engines = [call.args[0] for call in handler.call_args_list]
+        self.assertEqual(engines[:2], [self.primary, self.primary])
+        self.assertIn(engines[2], self.replicas)
@@ -0,0 +1,111 @@
+"""
+Graceful shutdown tests: SIGTERM draining and the shutdown sequence.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth import events
+from dayfeel_auth.app import container
+from dayfeel_auth.app import readiness
+from dayfeel_auth.middlewares.draining import DRAINING
+from dayfeel_auth.utils.security import get_hashing_executor
+from unittest import mock
+
+import signal
+import time
+import unittest
+
+
+# --- TYPES ---
+from types import FrameType
+from typing import List
+from typing import Optional
+
+
+# --- CODE ---
+class TestDrainSignalHandler(unittest.TestCase):
+    """
+    SIGTERM reports unready right away, and reaches the server's own handler after the grace delay.
+    """
+
+    def setUp(self) -> None:
+        """
+        Installs a recording handler standing for Uvicorn's, then the drain handler on top.
+
+        :returns: None.
+        """
+        self.forwarded: List[float] = []
+
+        def uvicorn_handler(sig: int, frame: Optional[FrameType]) -> None:  # pylint: disable=W0613
+            self.forwarded.append(time.monotonic())
+
+        previous = signal.signal(signal.SIGTERM, uvicorn_handler)
+        self.addCleanup(signal.signal, signal.SIGTERM, previous)
+        self.addCleanup(DRAINING.clear)
+        self.addCleanup(setattr, readiness, 'ready', readiness.ready)
+
+        logger = mock.patch.dict(container, {'logger': mock.Mock()})
+        logger.start()
+        self.addCleanup(logger.stop)
+
+        readiness.ready = True
+        events.install_drain_signal_handler(grace_delay_sec=0.2)
+        self.handler = signal.getsignal(signal.SIGTERM)
+
+
+    def test_first_sigterm_drains_then_forwards(self) -> None:
+        """
+        The first SIGTERM flips readiness and starts draining, and is forwarded once the grace delay is over.
+        """
+        self.assertIsNot(self.handler, signal.SIG_DFL)
+        received_at = time.monotonic()
+        self.handler(signal.SIGTERM, None)
+
+        self.assertFalse(readiness.ready)
+        self.assertTrue(DRAINING.is_set())
+        self.assertEqual(self.forwarded, [])
+
+        deadline = time.monotonic() + 5
+        while not self.forwarded and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.forwarded), 1)
+        self.assertGreaterEqual(self.forwarded[0] - received_at, 0.2)
+
+
+    def test_second_sigterm_forwards_now(self) -> None:
+        """
+        A second SIGTERM while draining stops the server without waiting.
+        """
+        self.handler(signal.SIGTERM, None)
+        self.handler(signal.SIGTERM, None)
+
+        self.assertEqual(len(self.forwarded), 1)
+
+
+class TestShutdown(unittest.IsolatedAsyncioTestCase):
+    """
+    Every shutdown step runs, whatever the others do.
+    """
+
+    async def test_failing_step_does_not_stop_shutdown(self) -> None:
+        """
+        A session store failing to stop still lets the login events flush and the databases close.
+        """
+        components = {name: mock.Mock() for name in ('health_monitor', 'cache_invalidation', 'email_filter',
+                                                       'auth_sessions_reposository', 'login_events', 'replicas')}
+        components['auth_sessions_reposository'].stop.side_effect = OSError('Read-only file system')
+        logger = mock.Mock(complete=mock.AsyncMock())
+        get_hashing_executor.cache_clear()
+
+        with mock.patch.dict(container, {**components, 'logger': logger}):
+            await events.on_shutdown(mock.Mock())
+        self.addCleanup(DRAINING.clear)
+
+        for name in ('health_monitor', 'cache_invalidation', 'email_filter', 'login_events'):
+            components[name].stop.assert_called_once()
+        components['replicas'].dispose.assert_called_once()
+        components['replicas'].primary.dispose.assert_called_once()
+        logger.error.assert_called_once()
+        logger.complete.assert_awaited_once()
+
+        # No hashing executor was built just to be shut down
+        self.assertEqual(get_hashing_executor.cache_info().currsize, 0)  # pylint: disable=E1121
@@ -0,0 +1,88 @@
+"""
+Token version cache tests.
+"""
+
+# --- IMPORTS ---
+from dayfeel_auth.utils.token_versions import TokenVersionCache
+from unittest import mock
+
+import unittest
+
+
+# --- CODE ---
+class TestTokenVersionCache(unittest.TestCase):
+    """
+    Cached versions never go back down, even when database reads race with invalidation events.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a cache over a fake users repository.
+
+        :returns: None.
+        """
+        self.repository = mock.Mock()
+        self.repository.get_token_version.return_value = 1
+        self.cache = TokenVersionCache(users_repository=self.repository, ttl_sec=60.0, max_size=100)
+
+
+    def test_miss_is_loaded_and_cached(self) -> None:
+        """
+        A version is read from the database once, then served from the cache.
+        """
+        self.assertEqual(self.cache.get(7), 1)
+        self.assertEqual(self.cache.get(7), 1)
+        self.repository.get_token_version.assert_called_once_with(7)
+
+
+    def test_event_during_read_is_kept(self) -> None:
+        """
+        A revocation event applied while an older version is read from the database wins.
+        """
+        # The event carrying version 2 lands between the read of version 1 and its caching
+        def read_then_event(user_id: int) -> int:
+            self.cache.set(user_id, 2)
+            return 1
+        self.repository.get_token_version.side_effect = read_then_event
+
+        self.assertEqual(self.cache.get(7), 1)
+        self.assertEqual(self.cache.get(7), 2)
+
+
+    def test_set_keeps_highest_version(self) -> None:
+        """
+        Events arriving out of order, or an older version, never replace a newer one.
+        """
+        self.cache.set(7, 3)
+        self.cache.set(7, 2)
+        self.assertEqual(self.cache.get(7), 3)
+
+        self.cache.set(7, 4)
+        self.assertEqual(self.cache.get(7), 4)
+
+
+    def test_read_during_flush_is_not_cached(self) -> None:
+        """
+        A version read before a flush may predate missed events, so it is not cached.
+        """
+        # The flush lands between the read and its caching
+        def read_then_flush(user_id: int) -> int:  # pylint: disable=W0613
+            self.cache.clear()
+            return 1
+        self.repository.get_token_version.side_effect = read_then_flush
+
+        self.assertEqual(self.cache.get(7), 1)
+        self.repository.get_token_version.side_effect = None
+        self.assertEqual(self.cache.get(7), 1)
+        self.assertEqual(self.repository.get_token_version.call_count, 2)
+
+
+    def test_unknown_user_is_not_cached(self) -> None:
+        """
+        Users without a version are looked up again.
+        """
+        self.repository.get_token_version.return_value = None
+
+        self.assertIsNone(self.cache.get(7))
+        self.assertIsNone(self.cache.get(7))
+        self.assertEqual(self.repository.get_token_version.call_count, 2)
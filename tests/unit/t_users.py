@@ -0,0 +1,69 @@
+"""
+Users repository tests: prebuilt statements.
+"""
+
+# --- IMPORTS ---
+# The Users mapper resolves its sessions relationship by name
+from dayfeel_auth.db.sqlalchemy.models.auth_sessions import AuthSessions  # pylint: disable=W0611
+from dayfeel_auth.db.sqlalchemy.models.users import Users
+from dayfeel_auth.db.sqlalchemy.repository.users import UsersRepository
+from dayfeel_auth.enums.user_role import UserRole
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import insert
+
+import unittest
+
+
+# --- TYPES ---
+from typing import Any
+
+
+# --- CODE ---
+def attach_auth_schema(dbapi_connection: Any, connection_record: Any) -> None:  # pylint: disable=W0613
+    """
+    Give a SQLite connection an 'auth' schema, as tables live there on Postgres.
+
+    :param dbapi_connection: SQLite connection.
+    :param connection_record: Pool record of the connection.
+
+    :returns: None.
+    """
+    dbapi_connection.execute("ATTACH DATABASE ':memory:' AS auth")
+
+
+class TestUserLookups(unittest.TestCase):
+    """
+    Statements built once at import bind their parameters on each call.
+    """
+
+    def setUp(self) -> None:
+        """
+        Creates a SQLite users table with two users.
+
+        :returns: None.
+        """
+        self.engine = create_engine('sqlite://')
+        event.listen(self.engine, 'connect', attach_auth_schema)
+        self.addCleanup(self.engine.dispose)
+
+        Users.__table__.create(self.engine)
+        with self.engine.begin() as connection:
+            connection.execute(insert(Users), [
+                {'email': 'ana@example.com', 'password_hash': '-', 'name': 'Ana', 'role': UserRole.USER},
+                {'email': 'bob@example.com', 'password_hash': '-', 'name': 'Bob', 'role': UserRole.ADMIN},
+            ])
+        self.repository = UsersRepository(self.engine)
+
+
+    def test_lookups_bind_per_call(self) -> None:
+        """
+        Successive lookups with different values each return their own row.
+        """
+        for email, name in (('ana@example.com', 'Ana'), ('bob@example.com', 'Bob'), ('ANA@example.com', 'Ana')):
+            self.assertEqual(self.repository.get_by_email(email).name, name, email)
+        for user_id, name in ((2, 'Bob'), (1, 'Ana')):
+            self.assertEqual(self.repository.get_by_id(user_id).name, name, user_id)
+
+        self.assertIsNone(self.repository.get_by_email('carol@example.com'))
+        self.assertIsNone(self.repository.get_by_id(3))